@@ -1,18 +1,83 @@
+import os
+import hmac
 import dash
 from dash import callback
+from flask import jsonify, request
 from components.layout import create_layout
-from src.data_processor import DataProcessor
+from src.dataset_loader import DatasetLoader, READY
+from src.shared_catalog import MANIFEST_ENV
+from visualizations.figure_cache import DEFAULT_MAX_BYTES, figure_cache
 import globals
 import warnings
 warnings.filterwarnings('ignore')
 
 app = dash.Dash(__name__, title="Earthquake Data Visualization")
 app.config.suppress_callback_exceptions = True
-globals.data_processor = DataProcessor()
-data_processor = globals.data_processor
-app.layout = create_layout(data_processor)
+# Load the dataset in the background so the server answers while the CSV is parsed;
+# attach to a catalog published by `python -m src.shared_catalog` when one is named
+globals.data_loader = DatasetLoader(shared_catalog=os.environ.get(MANIFEST_ENV)).start()
+app.layout = create_layout()
+
+# Seconds between checks of the dataset file for changes; 0 disables hot reload on change
+WATCH_INTERVAL = float(os.environ.get("EARTHQUAKE_WATCH_INTERVAL", 0))
+# Token required by /admin/reload; the endpoint is disabled when unset
+ADMIN_TOKEN = os.environ.get("EARTHQUAKE_ADMIN_TOKEN")
+# Under gunicorn the master reloads for every worker: it republishes each new dataset
+# at RELOAD_MANIFEST, and workers pass reload requests to it by touching RELOAD_REQUEST
+RELOAD_MANIFEST = os.path.join("data", "cache", "reloaded_catalog.json")
+RELOAD_REQUEST = os.path.join("data", "cache", "reload_request")
+# Seconds between checks of RELOAD_REQUEST when the dataset file itself is not watched
+RELOAD_REQUEST_INTERVAL = 1.0
+# Directory where built figures are also written, per dataset version, so warm views
+# survive a restart; unset keeps them in memory only
+FIGURE_CACHE_DIR = os.environ.get("EARTHQUAKE_FIGURE_CACHE_DIR") or None
+# Memory budget of the figure cache in megabytes
+FIGURE_CACHE_MB = float(os.environ.get("EARTHQUAKE_FIGURE_CACHE_MB", DEFAULT_MAX_BYTES / 2 ** 20))
+figure_cache.configure(max_bytes=int(FIGURE_CACHE_MB * 2 ** 20), cache_dir=FIGURE_CACHE_DIR)
+
+
+def evict_replaced_dataset(old, new):
+    """Drop figures built from a dataset version that a reload replaced."""
+    if old is not None and old.dataset_version != new.dataset_version:
+        evicted = figure_cache.evict_version(old.dataset_version)
+        print(f"Evicted {evicted} cached figures of dataset version {old.dataset_version}")
+
+
+globals.data_loader.on_publish(evict_replaced_dataset)
+
+
+@app.server.route('/healthz')
+def healthz():
+    """Liveness probe: 200 whenever the server is up, with the loading state."""
+    return jsonify(status='ok', dataset=globals.data_loader.status()), 200
+
+
+@app.server.route('/readyz')
+def readyz():
+    """Readiness probe: 200 once the catalog is loaded with data, 503 with the loading progress before."""
+    status = globals.data_loader.status()
+    ready = status['state'] == READY and status['records'] > 0
+    return jsonify(status), 200 if ready else 503
+
+
+@app.server.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Rebuild the dataset in the background and swap it in when done. Under
+    gunicorn the request is passed to the master, which reloads once for
+    every worker.
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN:
+        return jsonify(error='reload endpoint disabled'), 404
+    if not hmac.compare_digest(token, ADMIN_TOKEN):
+        return jsonify(error='forbidden'), 403
+    started = globals.data_loader.request_reload()
+    return jsonify(started=started, dataset=globals.data_loader.status()), 202 if started else 409
+
 
 # Register callbacks
-from callbacks import layout_toggle, navigation, map_callbacks, scatter_callbacks, timeseries_callbacks , riskmap_callbacks, content_switch , timeseries_toggle , country_options_callbacks, country_focus_callbacks , country_focus_toggle
+from callbacks import layout_toggle, navigation, map_callbacks, scatter_callbacks, timeseries_callbacks , riskmap_callbacks, content_switch , timeseries_toggle , country_options_callbacks, country_focus_callbacks , country_focus_toggle, dataset_status_callbacks
 if __name__ == '__main__':
+    globals.data_loader.watch(WATCH_INTERVAL)
     app.run(debug=True, host='0.0.0.0', port=8050)
@@ -1,28 +1,45 @@
-from dash import callback, Output, Input, callback_context
+from dash import callback, Output, Input, State, callback_context, no_update
 from components.global_map_section import get_global_map
 from components.scatter_section import get_scatter_section
 from components.timeseries_section import get_timeseries_section
 from components.risk_map_section import get_risk_map
 from components.country_focus_section import get_country_focus_section
+from components.loading_section import get_loading_section
 import globals
 
 button_ids = globals.button_ids
 @callback(
     Output("main-plot-content", "children"),
-    [Input(btn_id, "n_clicks") for btn_id in button_ids]
+    Output("active-view", "data"),
+    *[Input(btn_id, "n_clicks") for btn_id in button_ids],
+    Input("dataset-status-poll", "disabled"),
+    State("active-view", "data")
 )
 def update_main_content(*args):
+    active_view = args[-1]
     ctx = callback_context
     triggered = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else 'btn-map'
-    data_processor = globals.data_processor  # Access the global data processor
+
+    if triggered == "dataset-status-poll":
+        # The poll's own initial call (nothing rendered yet) shows the default view;
+        # later, once loading finishes, rebuild the current view if it was built without data
+        if not active_view:
+            triggered = 'btn-map'
+        elif not active_view.get('placeholder'):
+            return no_update, no_update
+        else:
+            triggered = active_view['view']
+
+    data_processor = globals.get_data_processor()  # None while the dataset is still loading
+    view = {'view': triggered, 'placeholder': data_processor is None}
 
     if triggered == "btn-scatter":
-        return get_scatter_section(data_processor)
+        return (get_scatter_section(data_processor) if data_processor else get_loading_section()), view
     elif triggered == "btn-timeseries":
-        return get_timeseries_section(data_processor)
+        return (get_timeseries_section(data_processor) if data_processor else get_loading_section()), view
     elif triggered == "btn-riskmap":
-        return get_risk_map(data_processor)
-    elif ctx.triggered_id == "btn-country-focus":
-        return get_country_focus_section()
+        return (get_risk_map(data_processor) if data_processor else get_loading_section()), view
+    elif triggered == "btn-country-focus":
+        return get_country_focus_section(), view
     else:
-        return get_global_map()
+        return get_global_map(), {'view': 'btn-map', 'placeholder': view['placeholder']}
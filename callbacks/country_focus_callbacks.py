@@ -1,16 +1,22 @@
-from dash import Output, Input, State, callback
+from dash import Output, Input, State, callback, ctx
 import pandas as pd
-from visualizations.plots.country_focus import create_country_focus_view
-from globals import data_processor
+from visualizations.plots.country_focus import create_country_focus_view, patch_country_focus_view
+from visualizations.plots.placeholder import create_loading_figure, has_trace
+import globals
 
 @callback(
     Output('country-focus-map', 'figure'),
     Input('country-focus-dropdown', 'value'),
     Input('year-mode-toggle', 'value'),
     Input('country-focus-year-slider', 'value'),
-    Input('country-focus-year-range-slider', 'value')
+    Input('country-focus-year-range-slider', 'value'),
+    State('country-focus-map', 'figure')
 )
-def update_country_focus_map(selected_country, mode, single_year, year_range):
+def update_country_focus_map(selected_country, mode, single_year, year_range, figure):
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return create_loading_figure()
+
     # Set default start and end dates
     start_date, end_date = None, None
 
@@ -22,6 +28,16 @@ def update_country_focus_map(selected_country, mode, single_year, year_range):
         start_date = pd.to_datetime(f"{start_year}-01-01").tz_localize("UTC")
         end_date = pd.to_datetime(f"{end_year}-12-31").tz_localize("UTC")
 
+    # A date change for the same country only replaces the epicentre trace data of a full figure
+    triggered = set(ctx.triggered_prop_ids.values())
+    if triggered and 'country-focus-dropdown' not in triggered and has_trace(figure, 0):
+        return patch_country_focus_view(
+            data_processor=data_processor,
+            country=selected_country or None,
+            start_date=start_date,
+            end_date=end_date
+        )
+
     # If no country is selected, still filter by date
     if not selected_country:
         return create_country_focus_view(
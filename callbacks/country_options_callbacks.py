@@ -1,5 +1,5 @@
 from dash import Output, Input, callback
-from globals import data_processor
+import globals
 
 @callback(
     Output('country-focus-dropdown', 'options'),
@@ -8,13 +8,17 @@ from globals import data_processor
     Input('country-focus-year-range-slider', 'value')
 )
 def update_country_dropdown(mode, single_year, year_range):
-    df = data_processor.get_filtered_data()
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return []
+    metadata = data_processor.metadata
 
     if mode == 'single' and single_year:
-        df = df[df['year'] == single_year]
+        countries = metadata.countries_in_year(single_year)
     elif mode == 'range' and year_range:
         start_year, end_year = year_range
-        df = df[(df['year'] >= start_year) & (df['year'] <= end_year)]
+        countries = metadata.countries_between(start_year, end_year)
+    else:
+        countries = metadata.countries
 
-    countries = df['country'].dropna().unique()
-    return [{'label': c, 'value': c} for c in sorted(countries)]
+    return [{'label': c, 'value': c} for c in countries]
@@ -0,0 +1,32 @@
+from dash import callback, Output, Input
+import globals
+
+STATUS_STYLE = {
+    'textAlign': 'center',
+    'padding': '10px',
+    'marginBottom': '15px',
+    'backgroundColor': '#f8f9fa',
+    'border': '1px solid #dee2e6',
+    'borderRadius': '5px',
+    'color': '#6c757d'
+}
+
+@callback(
+    Output('dataset-status', 'children'),
+    Output('dataset-status', 'style'),
+    Output('dataset-status-poll', 'disabled'),
+    Input('dataset-status-poll', 'n_intervals')
+)
+def update_dataset_status(_):
+    loader = globals.data_loader
+    if loader is None:
+        return None, {'display': 'none'}, True
+
+    status = loader.status()
+    if status['state'] == 'loading':
+        return (f"Loading earthquake catalog: {status['stage']} ({status['elapsed_seconds']:.0f}s)",
+                STATUS_STYLE, False)
+    if status['state'] == 'failed':
+        return f"Failed to load the earthquake catalog: {status['error']}", STATUS_STYLE, True
+    # Disabling the poll also tells content_switch to replace any loading placeholder
+    return None, {'display': 'none'}, True
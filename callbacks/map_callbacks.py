@@ -1,12 +1,19 @@
-from dash import callback, Output, Input
-from visualizations.plots.world_map import create_global_earthquake_map
+from dash import callback, Output, Input, State, ctx
+from visualizations.plots.world_map import EPICENTRE_TRACE, create_global_earthquake_map, patch_global_earthquake_map
+from visualizations.plots.placeholder import create_loading_figure, has_trace
 import globals
 
-data_processor = globals.data_processor  # Access the global data processor
-
 @callback(
     Output('global-map', 'figure'),
-    Input('year-slider', 'value')
+    Input('year-slider', 'value'),
+    State('global-map', 'figure')
 )
-def update_map(year):
-    return create_global_earthquake_map(data_processor, selected_year=year)
+def update_map(year, figure):
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return create_loading_figure()
+
+    # Full figure on first render or over the loading figure, afterwards only the point traces change
+    if ctx.triggered_id is None or not has_trace(figure, EPICENTRE_TRACE):
+        return create_global_earthquake_map(data_processor, selected_year=year)
+    return patch_global_earthquake_map(data_processor, selected_year=year)
@@ -1,13 +1,21 @@
-from dash import callback, Output, Input
-from visualizations.plots.risk_map import create_global_risk_map
+from dash import callback, Output, Input, State, ctx
+from visualizations.plots.risk_map import FAULT_TRACE_INDICES, create_global_risk_map, patch_fault_line_visibility
+from visualizations.plots.placeholder import create_loading_figure, has_trace
 import globals
 
-data_processor = globals.data_processor  # Use global DataProcessor
-
 @callback(
     Output('global-risk-map', 'figure'),
-    Input('toggle-faultlines', 'value')
+    Input('toggle-faultlines', 'value'),
+    State('global-risk-map', 'figure')
 )
-def update_risk_map(selected_options):
+def update_risk_map(selected_options, figure):
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return create_loading_figure()
+
     show_fault_lines = 'fault' in selected_options if selected_options else False
-    return create_global_risk_map(data_processor, metric='count', show_fault_lines=show_fault_lines)
+    # Full figure on first render or over the loading figure, afterwards the toggle only flips trace visibility
+    if (ctx.triggered_id is None or not has_trace(figure, max(FAULT_TRACE_INDICES))
+            or data_processor.get_risk_map_data('count').empty):
+        return create_global_risk_map(data_processor, metric='count', show_fault_lines=show_fault_lines)
+    return patch_fault_line_visibility(show_fault_lines)
@@ -2,10 +2,9 @@ from dash import callback, Output, Input , html
 import plotly.express as px
 import plotly.graph_objects as go
 from visualizations.plots.scatter import create_scatter_plot
+from visualizations.plots.placeholder import LOADING_MESSAGE, create_loading_figure
 import globals
 
-data_processor = globals.data_processor  # Access the global data processor
-
 @callback(
     Output('scatter-plot', 'figure'),
     Output('depth-summary', 'children'),
@@ -13,6 +12,10 @@ data_processor = globals.data_processor  # Access the global data processor
      Input('scatter-country-filter', 'value')]
 )
 def update_scatter_plot(year_range, country_filter):
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return create_loading_figure(), LOADING_MESSAGE
+
     start_year, end_year = year_range if year_range else (None, None)
 
     fig, counts = create_scatter_plot(
@@ -1,10 +1,31 @@
 from dash import callback, Output, Input
 from visualizations.plots.time_series import create_count_time_series_plot, create_magnitude_time_series_plot
+from visualizations.plots.placeholder import create_loading_figure
 import globals
 import calendar
 import pandas as pd
 
-data_processor = globals.data_processor
+def get_date_window(mode, year, month, year_range):
+    """
+    Date window shared by the count and magnitude plots. Both callbacks fire
+    on the same inputs, so they resolve to the same window and the time series
+    behind it is computed once by the data processor.
+    """
+    if mode == 'single':
+        if month == "all":
+            start_str = f"{year}-01-01"
+            end_str = f"{year}-12-31"
+        else:
+            last_day = calendar.monthrange(year, int(month))[1]
+            start_str = f"{year}-{int(month):02d}-01"
+            end_str = f"{year}-{int(month):02d}-{last_day}"
+    else:
+        start_str = f"{year_range[0]}-01-01"
+        end_str = f"{year_range[1]}-12-31"
+
+    start_date = pd.to_datetime(start_str).tz_localize("UTC")
+    end_date = pd.to_datetime(end_str).tz_localize("UTC")
+    return start_date, end_date
 
 @callback(
     Output('timeseries-count-plot', 'figure'),
@@ -18,23 +39,14 @@ data_processor = globals.data_processor
     ]
 )
 def update_count_timeseries_plot(mode, year, month, year_range, country, options):
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return create_loading_figure()
+
     show_cumulative = 'cumulative' in options
     show_moving_avg = 'moving_avg' in options
 
-    if mode == 'single':
-        if month == "all":
-            start_str = f"{year}-01-01"
-            end_str = f"{year}-12-31"
-        else:
-            last_day = calendar.monthrange(year, int(month))[1]
-            start_str = f"{year}-{int(month):02d}-01"
-            end_str = f"{year}-{int(month):02d}-{last_day}"
-    else:
-        start_str = f"{year_range[0]}-01-01"
-        end_str = f"{year_range[1]}-12-31"
-
-    start_date = pd.to_datetime(start_str).tz_localize("UTC")
-    end_date = pd.to_datetime(end_str).tz_localize("UTC")
+    start_date, end_date = get_date_window(mode, year, month, year_range)
 
     return create_count_time_series_plot(
         data_processor=data_processor,
@@ -58,22 +70,13 @@ def update_count_timeseries_plot(mode, year, month, year_range, country, options
     ]
 )
 def update_magnitude_timeseries_plot(mode, year, month, year_range, country, options):
-    show_moving_avg = 'moving_avg' in options
+    data_processor = globals.get_data_processor()
+    if data_processor is None:
+        return create_loading_figure()
 
-    if mode == 'single':
-        if month == "all":
-            start_str = f"{year}-01-01"
-            end_str = f"{year}-12-31"
-        else:
-            last_day = calendar.monthrange(year, int(month))[1]
-            start_str = f"{year}-{int(month):02d}-01"
-            end_str = f"{year}-{int(month):02d}-{last_day}"
-    else:
-        start_str = f"{year_range[0]}-01-01"
-        end_str = f"{year_range[1]}-12-31"
+    show_moving_avg = 'moving_avg' in options
 
-    start_date = pd.to_datetime(start_str).tz_localize("UTC")
-    end_date = pd.to_datetime(end_str).tz_localize("UTC")
+    start_date, end_date = get_date_window(mode, year, month, year_range)
 
     return create_magnitude_time_series_plot(
         data_processor=data_processor,
@@ -1,7 +1,7 @@
-from dash import html
+from dash import html, dcc
 from components.sidebar import get_sidebar
 
-def create_layout(data_processor):
+def create_layout():
     return html.Div([
         html.Button("☰", id="sidebar-toggle", style={
             'position': 'fixed',
@@ -18,7 +18,11 @@ def create_layout(data_processor):
             'boxShadow': '0 2px 4px rgba(0,0,0,0.2)'
         }),
         get_sidebar(),
+        # Polls the background dataset load; disabled once the dataset is ready
+        dcc.Interval(id="dataset-status-poll", interval=1000, disabled=False),
+        dcc.Store(id="active-view"),
         html.Div([
+            html.Div(id="dataset-status", style={'display': 'none'}),
             html.Div(id="main-plot-content"),
 
             html.Div("CS661 Project - Group 15", style={
@@ -0,0 +1,10 @@
+from dash import html
+from visualizations.plots.placeholder import LOADING_MESSAGE
+
+def get_loading_section():
+    return html.Div([
+        html.H3(LOADING_MESSAGE, style={'color': '#95a5a6', 'textAlign': 'center'}),
+        html.P("This view opens as soon as the dataset is ready.", style={
+            'textAlign': 'center', 'fontSize': '15px', 'color': '#6c757d'
+        })
+    ], style={'padding': '80px 20px'})
@@ -3,11 +3,7 @@ from dash import html, dcc
 def get_scatter_section(data_processor):
     countries = [{'label': 'All Countries', 'value': 'all'}] + [
     {'label': country, 'value': country}
-    for country in sorted(
-        data_processor.get_filtered_data()['country']
-        .dropna()
-        .unique()
-    )
+    for country in data_processor.metadata.countries
 ]
 
 
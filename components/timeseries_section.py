@@ -2,9 +2,8 @@ from dash import html, dcc
 import pandas as pd
 import numpy as np
 def get_timeseries_section(data_processor):
-    df = data_processor.get_filtered_data()
-    years = sorted(df['year'].dropna().unique())
-    countries = sorted(df['country'].dropna().unique())
+    years = data_processor.metadata.years
+    countries = data_processor.metadata.countries
     year_max = max(years) if years else 2023 
     year_min = min(years) if years else 1900
     num_marks = 7
@@ -1,3 +1,18 @@
 # globals.py
 data_processor = None
-button_ids = ['btn-map', 'btn-scatter', 'btn-timeseries', 'btn-riskmap', 'btn-country-focus']
\ No newline at end of file
+# DatasetLoader holding the current dataset snapshot (set by app.py); data_processor
+# is only used when no loader is set
+data_loader = None
+button_ids = ['btn-map', 'btn-scatter', 'btn-timeseries', 'btn-riskmap', 'btn-country-focus']
+
+
+def get_data_processor(timeout=0):
+    """
+    The current DataProcessor snapshot, waiting up to timeout seconds (forever
+    if None) for the first background load. Returns None while the dataset is
+    still loading. Fetch it once per request and use that reference
+    throughout, so a reload mid-request cannot mix two datasets.
+    """
+    if data_loader is None:
+        return data_processor
+    return data_loader.wait(timeout)
@@ -0,0 +1,76 @@
+import gc
+import multiprocessing
+import os
+
+# Every setting can be overridden from the environment of the deployment
+bind = os.environ.get("EARTHQUAKE_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("EARTHQUAKE_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.environ.get("EARTHQUAKE_TIMEOUT", 120))
+
+# Load the dataset and indexes in the master, before forking, so workers share the pages.
+# EARTHQUAKE_PRELOAD=0 trades that for each worker loading in the background.
+preload_app = os.environ.get("EARTHQUAKE_PRELOAD", "1") != "0"
+
+
+def _reloads_enabled() -> bool:
+    """Whether the master reloads for the workers: preloaded, reloads configured, not attached to a shared catalog."""
+    if not preload_app:
+        # Importing app would start loading in the master, and the loader thread does not survive the fork
+        return False
+    from app import ADMIN_TOKEN, WATCH_INTERVAL
+    from src.shared_catalog import MANIFEST_ENV
+
+    return preload_app and (WATCH_INTERVAL > 0 or bool(ADMIN_TOKEN)) and not os.environ.get(MANIFEST_ENV)
+
+
+def when_ready(server):
+    """
+    Runs in the master before any worker is forked. With preload_app the
+    app is loaded by then: freezing the loaded objects keeps the workers'
+    garbage collector from writing to them, which would copy the shared
+    pages into every worker. When reloads are enabled the master is the one
+    process that reloads: it watches the dataset and the reload request
+    file, and republishes each new dataset to shared memory for the workers.
+    Without preload_app the master never imports the app.
+    """
+    if not preload_app:
+        server.log.info("Preloading disabled; forking %s workers with %s threads each, each loading the dataset",
+                        workers, threads)
+        return
+
+    gc.collect()
+    gc.freeze()
+    if _reloads_enabled():
+        import globals
+        from app import RELOAD_MANIFEST, RELOAD_REQUEST, RELOAD_REQUEST_INTERVAL, WATCH_INTERVAL
+
+        globals.data_loader.republish(RELOAD_MANIFEST)
+        globals.data_loader.watch(WATCH_INTERVAL or RELOAD_REQUEST_INTERVAL, request_path=RELOAD_REQUEST,
+                                  watch_source=WATCH_INTERVAL > 0)
+    server.log.info("Dataset loaded; forking %s workers with %s threads each", workers, threads)
+
+
+def post_worker_init(worker):
+    """
+    Workers follow the master's republished dataset when it reloads for
+    them; otherwise (no preload, or attached to a shared catalog) each
+    watches the dataset itself, since the master's threads do not survive
+    the fork.
+    """
+    import globals
+    from app import RELOAD_MANIFEST, RELOAD_REQUEST, RELOAD_REQUEST_INTERVAL, WATCH_INTERVAL
+
+    if _reloads_enabled():
+        globals.data_loader.follow(RELOAD_MANIFEST, RELOAD_REQUEST, WATCH_INTERVAL or RELOAD_REQUEST_INTERVAL)
+    else:
+        globals.data_loader.watch(WATCH_INTERVAL)
+
+
+def on_exit(server):
+    """Remove the shared memory the master republished reloads to."""
+    import globals
+
+    if globals.data_loader is not None:
+        globals.data_loader.unpublish()
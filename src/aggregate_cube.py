@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Magnitude bands of the time-series filters. The gaps the filters leave
+# (5.9 < mag < 6.0 and 6.9 < mag < 7.0) fall into 'other'.
+MAGNITUDE_BANDS = ['minor', 'moderate', 'strong', 'major', 'other']
+BAND_CODES: Dict[str, int] = {band: code for code, band in enumerate(MAGNITUDE_BANDS)}
+
+# Month key for rows without a time; sorts before every real month
+NO_MONTH = np.iinfo(np.int64).min
+
+CELL_COLUMNS = ['month_key', 'country', 'band', 'count', 'mag_sum', 'mag_max', 'depth_sum']
+
+
+def magnitude_bands(mag: np.ndarray) -> np.ndarray:
+    """Band code of each magnitude, using the same bounds as the time-series filters."""
+    return np.select(
+        [mag < 4.0, (mag >= 4.0) & (mag <= 5.9), (mag >= 6.0) & (mag <= 6.9), mag >= 7.0],
+        [BAND_CODES['minor'], BAND_CODES['moderate'], BAND_CODES['strong'], BAND_CODES['major']],
+        default=BAND_CODES['other']
+    ).astype(np.int8)
+
+
+def month_keys(time_ns: np.ndarray) -> np.ndarray:
+    """Months since 1970-01 (the pandas monthly Period ordinal) of epoch-nanosecond times."""
+    keys = time_ns.view('M8[ns]').astype('M8[M]').astype(np.int64)
+    keys[time_ns == np.iinfo(np.int64).min] = NO_MONTH
+    return keys
+
+
+def month_start_ns(month_key: int) -> int:
+    """Epoch nanoseconds of the first instant of a month key."""
+    return int(np.datetime64(int(month_key), 'M').astype('M8[ns]').astype(np.int64))
+
+
+class AggregateCube:
+    """
+    Pre-aggregated earthquake counts and magnitude/depth sums by
+    (month, country code, magnitude band). Cells are sorted by month so
+    a month range resolves to a contiguous block.
+    """
+
+    def __init__(self, cells: pd.DataFrame):
+        self.cells = cells.sort_values('month_key', kind='stable').reset_index(drop=True)
+        self._months = self.cells['month_key'].to_numpy()
+
+    @classmethod
+    def from_rows(cls, keys: np.ndarray, country_codes: np.ndarray,
+                  mag: np.ndarray, depth: np.ndarray) -> 'AggregateCube':
+        """Aggregate per-row month keys, country codes, magnitudes and depths into cells."""
+        return cls(aggregate_cells(keys, country_codes, mag, depth))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def _select(self, month_lo: Optional[int], month_hi: Optional[int],
+                country_codes: Optional[np.ndarray], bands: Optional[List[int]]) -> pd.DataFrame:
+        lo = np.searchsorted(self._months, NO_MONTH + 1 if month_lo is None else month_lo, side='left')
+        hi = len(self._months) if month_hi is None else np.searchsorted(self._months, month_hi, side='right')
+        cells = self.cells.iloc[lo:hi]
+        if country_codes is not None:
+            cells = cells[np.isin(cells['country'].to_numpy(), country_codes)]
+        if bands is not None:
+            cells = cells[np.isin(cells['band'].to_numpy(), bands)]
+        return cells
+
+    def by_month(self, month_lo: Optional[int] = None, month_hi: Optional[int] = None,
+                 country_codes: Optional[np.ndarray] = None,
+                 bands: Optional[List[int]] = None) -> pd.DataFrame:
+        """Totals per month over an inclusive month range; open bounds cover all timed rows."""
+        cells = self._select(month_lo, month_hi, country_codes, bands)
+        return combine_months([cells])
+
+    def by_country(self) -> pd.DataFrame:
+        """Totals per country code over every row with a known country."""
+        cells = self.cells[self.cells['country'] >= 0]
+        return cells.groupby('country', sort=False).agg(
+            count=('count', 'sum'),
+            mag_sum=('mag_sum', 'sum'),
+            mag_max=('mag_max', 'max'),
+            depth_sum=('depth_sum', 'sum')
+        ).reset_index()
+
+
+def aggregate_cells(keys: np.ndarray, countries, mag: np.ndarray, depth: np.ndarray) -> pd.DataFrame:
+    """
+    Cube cells of a set of rows. Countries may be codes or names, so cells of
+    separately processed chunks can be merged before codes are assigned.
+    """
+    rows = pd.DataFrame({
+        'month_key': keys,
+        'country': countries,
+        'band': magnitude_bands(mag),
+        'mag': mag.astype(np.float64),
+        'depth': depth.astype(np.float64)
+    })
+    cells = rows.groupby(['month_key', 'country', 'band'], sort=True, dropna=False).agg(
+        count=('mag', 'size'),
+        mag_sum=('mag', 'sum'),
+        mag_max=('mag', 'max'),
+        depth_sum=('depth', 'sum')
+    ).reset_index()
+    return cells[CELL_COLUMNS]
+
+
+def merge_cells(pieces: List[pd.DataFrame]) -> pd.DataFrame:
+    """Merge cube cells computed from disjoint sets of rows."""
+    cells = pd.concat(pieces, ignore_index=True)
+    cells = cells.groupby(['month_key', 'country', 'band'], sort=True, dropna=False).agg(
+        count=('count', 'sum'),
+        mag_sum=('mag_sum', 'sum'),
+        mag_max=('mag_max', 'max'),
+        depth_sum=('depth_sum', 'sum')
+    ).reset_index()
+    return cells[CELL_COLUMNS]
+
+
+def combine_months(pieces: List[pd.DataFrame]) -> pd.DataFrame:
+    """Merge per-month totals from several cube or raw-row pieces."""
+    cells = pd.concat(pieces, ignore_index=True) if pieces else pd.DataFrame(columns=CELL_COLUMNS)
+    return cells.groupby('month_key', sort=True).agg(
+        count=('count', 'sum'),
+        mag_sum=('mag_sum', 'sum'),
+        mag_max=('mag_max', 'max'),
+        depth_sum=('depth_sum', 'sum')
+    ).reset_index()
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+import pandas as pd
+
+# Schema metadata key under which the source fingerprint is stored in the Parquet file
+FINGERPRINT_KEY = b"catalog_fingerprint"
+
+
+def file_fingerprint(path: str, chunk_size: int = 1 << 20) -> Dict:
+    """Return size, mtime and SHA-256 content hash of a file."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    }
+
+
+def catalog_fingerprint(source_path: str, preprocess_version: int, **options) -> Dict:
+    """
+    Build the cache key for a processed catalog: the source file fingerprint,
+    the preprocessing version and any options that change the processed output.
+    """
+    return {
+        'source': file_fingerprint(source_path),
+        'preprocess_version': preprocess_version,
+        'options': options
+    }
+
+
+def fingerprint_token(fingerprint: Dict) -> str:
+    """Short stable token identifying a fingerprint, used as the dataset version."""
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def load_cached_catalog(cache_path: str, fingerprint: Dict) -> Optional[pd.DataFrame]:
+    """Load the cached processed frame if it exists and matches the fingerprint."""
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_schema(cache_path).metadata or {}
+        stored = metadata.get(FINGERPRINT_KEY)
+        # Compare in JSON form so tuples and lists in the fingerprint compare equal
+        if stored is None or json.loads(stored) != json.loads(json.dumps(fingerprint)):
+            print("Catalog cache is stale, rebuilding")
+            return None
+
+        return pq.read_table(cache_path).to_pandas()
+    except ImportError:
+        print("pyarrow is not installed, catalog cache disabled")
+    except Exception as e:
+        print(f"Error reading catalog cache: {e}")
+    return None
+
+
+def save_cached_catalog(frame: pd.DataFrame, cache_path: str, fingerprint: Dict):
+    """
+    Write the processed frame to Parquet with the fingerprint embedded in the
+    schema metadata. The file is written to a temporary path and renamed so
+    concurrent workers never read a partial cache.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame)
+        metadata = dict(table.schema.metadata or {})
+        metadata[FINGERPRINT_KEY] = json.dumps(fingerprint).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, cache_path)
+        print(f"Catalog cache written to {cache_path}")
+    except ImportError:
+        print("pyarrow is not installed, catalog cache disabled")
+    except Exception as e:
+        print(f"Error writing catalog cache: {e}")
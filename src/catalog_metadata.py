@@ -0,0 +1,90 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+def _year_values(years) -> np.ndarray:
+    return pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(dtype=np.float64)
+
+
+class CatalogMetadata:
+    """
+    Summary of the catalog built once at load time: the sorted country list,
+    the year span and which countries occur in which years. Section builders
+    and dropdowns read from it instead of scanning rows.
+    """
+
+    def __init__(self, years: pd.Series, country_codes: np.ndarray, country_names: np.ndarray):
+        years = _year_values(years)
+        codes = np.asarray(country_codes)
+        countries = set(country_names[np.unique(codes[codes >= 0])])
+        year_list = [int(y) for y in np.unique(years[~np.isnan(years)])]
+
+        # presence[y, c]: country c has an event in year year_min + y
+        presence = np.zeros((year_list[-1] - year_list[0] + 1 if year_list else 0, len(country_names)),
+                            dtype=np.int32)
+        self._mark(presence, year_list, years, codes)
+        self._set(countries, year_list, presence, country_names)
+
+    @staticmethod
+    def _mark(presence: np.ndarray, year_list: List[int], years: np.ndarray, codes: np.ndarray):
+        rows = ~np.isnan(years) & (codes >= 0)
+        if year_list:
+            presence[years[rows].astype(np.int64) - year_list[0], codes[rows]] = 1
+
+    def _set(self, countries, year_list: List[int], presence: np.ndarray, country_names: np.ndarray):
+        self.countries: List[str] = sorted(countries)
+        self.years: List[int] = year_list
+        self.year_min = self.years[0] if self.years else None
+        self.year_max = self.years[-1] if self.years else None
+
+        # The running sum of presence over years answers any year range with one subtraction
+        self._cumulative = np.vstack([np.zeros((1, len(country_names)), dtype=np.int32),
+                                      np.cumsum(presence, axis=0, dtype=np.int32)])
+        self._names = np.asarray(country_names, dtype=object)
+
+        # Sorted country list per year, the common dropdown query
+        self.countries_by_year = {
+            year: sorted(self._names[presence[year - self.year_min] > 0])
+            for year in self.years
+        }
+
+    def inserted(self, years: pd.Series, country_codes: np.ndarray, code_map: np.ndarray,
+                 country_names: np.ndarray) -> 'CatalogMetadata':
+        """
+        The metadata of this catalog plus new rows, given their years and codes
+        into country_names; code_map takes this catalog's codes to the same
+        names (see CountryIndex.inserted). Costs one pass over the new rows
+        and the year-by-country table, not the catalog.
+        """
+        years = _year_values(years)
+        codes = np.asarray(country_codes)
+        countries = set(self.countries) | set(country_names[np.unique(codes[codes >= 0])])
+        year_list = sorted(set(self.years) | {int(y) for y in np.unique(years[~np.isnan(years)])})
+
+        presence = np.zeros((year_list[-1] - year_list[0] + 1 if year_list else 0, len(country_names)),
+                            dtype=np.int32)
+        if self.years:
+            start = self.year_min - year_list[0]
+            presence[start:start + len(self._cumulative) - 1, code_map[:len(self._names)]] = \
+                np.diff(self._cumulative, axis=0)
+        self._mark(presence, year_list, years, codes)
+
+        metadata = CatalogMetadata.__new__(CatalogMetadata)
+        metadata._set(countries, year_list, presence, country_names)
+        return metadata
+
+    def countries_in_year(self, year: int) -> List[str]:
+        """Sorted countries with at least one event in the given year."""
+        return self.countries_by_year.get(int(year), [])
+
+    def countries_between(self, start_year: int, end_year: int) -> List[str]:
+        """Sorted countries with at least one event between two years, inclusive."""
+        if not self.years:
+            return []
+        lo = min(max(int(start_year), self.year_min), self.year_max + 1) - self.year_min
+        hi = min(max(int(end_year) + 1, self.year_min), self.year_max + 1) - self.year_min
+        if hi <= lo:
+            return []
+        return sorted(self._names[(self._cumulative[hi] - self._cumulative[lo]) > 0])
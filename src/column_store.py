@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import decode_frame, decode_objects, encode_column, encode_objects, untrusted_reason
+
+# Manifest at the root of a store directory: column specs and the dataset version
+STORE_MANIFEST = "manifest.json"
+
+# Bump when the on-disk layout changes so old stores are rejected instead of misread
+STORE_FORMAT = 2
+
+# Pickled index object whose arrays are the index buffer files (see src.columnar.encode_objects)
+INDEX_HEADER = "indexes.pickle"
+
+
+def _array_filename(index: int, part: str) -> str:
+    return f"col{index:03d}.{part}.npy"
+
+
+def _index_filename(index: int) -> str:
+    return f"index{index:03d}.npy"
+
+
+def _write_indexes(store_dir: str, indexes) -> List[str]:
+    """Write an index object as a pickle header plus one .npy file per buffer; returns the buffer files."""
+    header, buffers = encode_objects(indexes)
+    header_path = os.path.join(store_dir, INDEX_HEADER)
+    with open(header_path, 'wb') as f:
+        f.write(header)
+    # Only this user may write it, whatever the umask, or readers will not unpickle it
+    os.chmod(header_path, 0o644)
+    index_files = [_index_filename(index) for index in range(len(buffers))]
+    for filename, buffer in zip(index_files, buffers):
+        np.save(os.path.join(store_dir, filename), buffer, allow_pickle=False)
+    return index_files
+
+
+def _write_manifest(store_dir: str, manifest: Dict):
+    # Write then rename so a reader never sees a partial manifest
+    tmp_path = os.path.join(store_dir, f"{STORE_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(store_dir, STORE_MANIFEST))
+
+
+def write_column_store(frame: pd.DataFrame, store_dir: str, dataset_version: Optional[str] = None,
+                       indexes=None):
+    """
+    Write a processed frame as one .npy file per column array (see
+    src.columnar) plus a manifest, and optionally an object holding its
+    indexes. The store is built in a sibling directory and swapped in, so
+    readers never see a partial store and processes still mapping the old
+    files keep working.
+    """
+    write_store_columns((frame[name] for name in frame.columns), store_dir, dataset_version, indexes)
+
+
+def write_store_columns(columns: Iterable[pd.Series], store_dir: str, dataset_version: Optional[str] = None,
+                        indexes=None):
+    """
+    write_column_store for columns produced one at a time; each is encoded
+    and written before the next is requested, so only one column of the
+    catalog needs to be in memory.
+    """
+    store_dir = os.path.abspath(store_dir)
+    tmp_dir = f"{store_dir}.{os.getpid()}.tmp"
+    old_dir = f"{store_dir}.{os.getpid()}.old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    specs = []
+    rows = 0
+    for index, series in enumerate(columns):
+        spec, parts = encode_column(series)
+        spec['name'] = str(series.name)
+        spec['files'] = {}
+        for part, values in parts.items():
+            filename = _array_filename(index, part)
+            np.save(os.path.join(tmp_dir, filename), np.ascontiguousarray(values), allow_pickle=False)
+            spec['files'][part] = filename
+        specs.append(spec)
+        rows = len(series)
+
+    _write_manifest(tmp_dir, {
+        'format': STORE_FORMAT,
+        'rows': rows,
+        'dataset_version': dataset_version,
+        'columns': specs,
+        'indexes': None if indexes is None else _write_indexes(tmp_dir, indexes)
+    })
+
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    print(f"Wrote {rows} earthquake records to column store {store_dir}")
+
+
+def write_store_indexes(store_dir: str, indexes):
+    """Add an index object to a store written without one (e.g. when the indexes were built from the mapped store)."""
+    with open(os.path.join(store_dir, STORE_MANIFEST)) as f:
+        manifest = json.load(f)
+    manifest['indexes'] = _write_indexes(store_dir, indexes)
+    _write_manifest(store_dir, manifest)
+
+
+def read_column_store(store_dir: str) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Open a column store as a frame over read-only memory maps of its files,
+    so opening costs no parsing and the OS page cache is shared between
+    every process reading the store. Returns the frame and the manifest.
+    """
+    with open(os.path.join(store_dir, STORE_MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != STORE_FORMAT:
+        raise ValueError(f"Unsupported column store format {manifest.get('format')} in {store_dir}")
+
+    arrays = {}
+    for spec in manifest['columns']:
+        arrays[spec['name']] = {
+            # Plain ndarray views of the maps, so pandas never sees the memmap subclass
+            part: np.load(os.path.join(store_dir, filename), mmap_mode='r', allow_pickle=False).view(np.ndarray)
+            for part, filename in spec['files'].items()
+        }
+    return decode_frame(manifest['columns'], arrays), manifest
+
+
+def read_store_indexes(store_dir: str, manifest: Dict):
+    """
+    The index object stored with the columns, its arrays mapping the store's
+    files, or None. The header is unpickled, so this is a trust boundary:
+    raises PermissionError unless the header file belongs to this user and
+    nobody else can write it. The buffer files are loaded without pickle.
+    """
+    if manifest.get('indexes') is None:
+        return None
+    header_path = os.path.join(store_dir, INDEX_HEADER)
+    with open(header_path, 'rb') as f:
+        untrusted = untrusted_reason(f.fileno(), header_path)
+        if untrusted:
+            raise PermissionError(f"Not unpickling the stored indexes: {untrusted}")
+        header = f.read()
+    return decode_objects(header, [
+        np.load(os.path.join(store_dir, filename), mmap_mode='r', allow_pickle=False).view(np.ndarray)
+        for filename in manifest['indexes']
+    ])
+
+
+def convert_csv(data_path: str, store_dir: str, compact_schema: bool = True, streaming: bool = False,
+                dataset_filename: Optional[str] = None):
+    """Preprocess the catalog CSV in data_path and write it as a column store."""
+    from src.data_processor import DATASET_FILENAME, DataProcessor
+
+    data_processor = DataProcessor(data_path, use_cache=False, compact_schema=compact_schema,
+                                   streaming=streaming, dataset_filename=dataset_filename or DATASET_FILENAME)
+    if data_processor.processed_data is None or data_processor.processed_data.empty:
+        print("No processed data to write")
+        return
+    write_column_store(data_processor.processed_data, store_dir, data_processor.dataset_version,
+                       data_processor._index_state())
+
+
+if __name__ == "__main__":
+    # python -m src.column_store [data_path] [store_dir]
+    data_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    convert_csv(data_path, sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_path, "data", "column_store"))
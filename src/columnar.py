@@ -0,0 +1,208 @@
+import os
+import pickle
+import stat
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.compact_schema import CATEGORY_MAX_UNIQUE_RATIO
+
+# Column kinds in an encoded spec
+NUMERIC = 'numeric'
+DATETIME = 'datetime'
+DICTIONARY = 'dictionary'
+TEXT = 'text'
+
+# Dictionaries are decoded into one Python string per value in every process
+# that maps the column, so only columns with a few distinct values use one
+DICTIONARY_MAX_VALUES = 4096
+
+
+def _code_dtype(n_values: int) -> np.dtype:
+    """Smallest signed integer dtype for codes into n_values, as pandas picks for categoricals."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode_dictionary(values) -> Dict[str, np.ndarray]:
+    """Strings as one UTF-8 byte array plus the offset where each one starts."""
+    encoded = [str(value).encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    return {
+        'dictionary': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+        'offsets': offsets
+    }
+
+
+def decode_dictionary(data: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Strings written by encode_dictionary."""
+    blob = np.asarray(data).tobytes()
+    bounds = np.asarray(offsets).tolist()
+    return [blob[start:end].decode('utf-8') for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _text_dtype() -> pd.StringDtype:
+    """Arrow-backed strings with NaN for missing values, like an object column."""
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        # pandas < 2.3 names the same dtype differently
+        return pd.StringDtype('pyarrow_numpy')
+
+
+def encode_text(series: pd.Series) -> Dict[str, np.ndarray]:
+    """Strings as Arrow's large_string buffers: UTF-8 bytes, row offsets and a validity bitmap if any are missing."""
+    missing = series.isna().to_numpy()
+    values = series.astype(str).to_numpy(dtype=object)
+    values[missing] = None
+    validity, offsets, data = pa.array(values, type=pa.large_string()).buffers()
+    parts = {
+        'data': np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, dtype=np.uint8),
+        'offsets': np.frombuffer(offsets, dtype=np.int64)[:len(values) + 1]
+    }
+    if validity is not None:
+        parts['validity'] = np.frombuffer(validity, dtype=np.uint8)
+    return parts
+
+
+def decode_text(parts: Dict[str, np.ndarray]):
+    """
+    A string array over encode_text's buffers. Nothing is decoded up front;
+    a string becomes a Python object only when a row is read.
+    """
+    validity = parts.get('validity')
+    array = pa.Array.from_buffers(
+        pa.large_string(), len(parts['offsets']) - 1,
+        [None if validity is None else pa.py_buffer(validity),
+         pa.py_buffer(parts['offsets']), pa.py_buffer(parts['data'])]
+    )
+    return _text_dtype().__from_arrow__(array)
+
+
+def _is_text(series: pd.Series) -> bool:
+    """True for string columns with too many distinct values for a dictionary."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return not series.dtype.ordered and len(series.dtype.categories) > DICTIONARY_MAX_VALUES
+    if series.dtype != object and not pd.api.types.is_string_dtype(series.dtype):
+        return False
+    distinct = series.nunique()
+    return distinct > DICTIONARY_MAX_VALUES or distinct > CATEGORY_MAX_UNIQUE_RATIO * len(series)
+
+
+def encode_column(series: pd.Series) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Split a column into a JSON-serializable spec and flat NumPy arrays.
+    Numbers are stored as they are, datetimes as epoch nanoseconds,
+    repetitive strings and categoricals as integer codes into a dictionary
+    of strings, and mostly distinct strings (IDs, places) as one byte
+    buffer with row offsets, since a dictionary of them would cost a Python
+    object per value to decode.
+    """
+    dtype = series.dtype
+    if _is_text(series):
+        return {'kind': TEXT}, encode_text(series)
+    if isinstance(dtype, pd.CategoricalDtype):
+        spec = {'kind': DICTIONARY, 'ordered': bool(dtype.ordered)}
+        parts = {'codes': series.cat.codes.to_numpy()}
+        parts.update(encode_dictionary(dtype.categories))
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        tz = getattr(dtype, 'tz', None)
+        spec = {'kind': DATETIME, 'tz': None if tz is None else str(tz)}
+        if tz is not None:
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        parts = {'values': series.to_numpy(dtype='datetime64[ns]').view(np.int64)}
+    elif dtype == object or pd.api.types.is_string_dtype(dtype):
+        codes, uniques = pd.factorize(series)
+        spec = {'kind': DICTIONARY, 'ordered': False}
+        parts = {'codes': codes.astype(_code_dtype(len(uniques)))}
+        parts.update(encode_dictionary(uniques))
+    else:
+        spec = {'kind': NUMERIC}
+        parts = {'values': series.to_numpy()}
+    return spec, parts
+
+
+def decode_column(spec: Dict, parts: Dict[str, np.ndarray]):
+    """
+    Rebuild a column from encode_column's output without copying the row
+    arrays. Dictionary strings come back as a categorical over the stored
+    codes, so they cost one object per distinct value, not one per row;
+    text columns come back as Arrow strings over the stored buffers.
+    """
+    kind = spec['kind']
+    if kind == NUMERIC:
+        return parts['values']
+    if kind == DATETIME:
+        values = parts['values'].view('datetime64[ns]')
+        if spec.get('tz') is None:
+            return pd.arrays.DatetimeArray._simple_new(values, dtype=values.dtype)
+        # Stored in UTC; a tz-aware array only carries the zone alongside the same values
+        return pd.arrays.DatetimeArray._simple_new(values, dtype=pd.DatetimeTZDtype(tz=spec['tz']))
+    if kind == DICTIONARY:
+        categories = decode_dictionary(parts['dictionary'], parts['offsets'])
+        return pd.Categorical.from_codes(parts['codes'], categories=categories,
+                                         ordered=spec.get('ordered', False), validate=False)
+    if kind == TEXT:
+        return decode_text(parts)
+    raise ValueError(f"Unknown column kind: {kind}")
+
+
+def encode_frame(frame: pd.DataFrame) -> Tuple[List[Dict], Dict[str, Dict[str, np.ndarray]]]:
+    """Column specs (in column order, each with its name) and arrays per column."""
+    specs = []
+    arrays = {}
+    for name in frame.columns:
+        spec, parts = encode_column(frame[name])
+        spec['name'] = str(name)
+        specs.append(spec)
+        arrays[spec['name']] = parts
+    return specs, arrays
+
+
+def decode_frame(specs: List[Dict], arrays: Dict[str, Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """A frame over the given column arrays; the row data is shared, not copied."""
+    columns = {spec['name']: decode_column(spec, arrays[spec['name']]) for spec in specs}
+    return pd.DataFrame(columns, copy=False)
+
+
+def untrusted_reason(fd: int, path: str) -> Optional[str]:
+    """
+    Why an open file may not be trusted with code, or None: it must be owned
+    by this process's user (or root) and writable by nobody else, so only
+    this user could have written what decode_objects will unpickle from it.
+    """
+    if not hasattr(os, 'getuid'):
+        return None
+    info = os.fstat(fd)
+    if info.st_uid not in (os.getuid(), 0):
+        return f"{path} is owned by another user"
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return f"{path} is writable by other users"
+    return None
+
+
+def encode_objects(obj) -> Tuple[bytes, List[np.ndarray]]:
+    """
+    Pickle an object graph of NumPy-backed structures (e.g. the lookup
+    indexes) with its array data kept out of band, so the arrays can be
+    written to shared memory or disk and mapped back without a copy.
+    Returns the pickle and the out-of-band buffers in order.
+    """
+    buffers = []
+    header = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return header, [np.frombuffer(buffer.raw(), dtype=np.uint8) for buffer in buffers]
+
+
+def decode_objects(header: bytes, buffers: List[np.ndarray]):
+    """
+    Rebuild encode_objects' object graph; its arrays are views of the given
+    buffers. The header is unpickled, which runs whatever code it names, so
+    this is a trust boundary: only pass a header read from a file that
+    untrusted_reason accepts.
+    """
+    return pickle.loads(header, buffers=[memoryview(buffer) for buffer in buffers])
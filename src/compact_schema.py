@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Raw columns that preprocessing duplicates into lower-case working columns
+REDUNDANT_COLUMNS = ['Time', 'Mag', 'Depth']
+
+COMPACT_DTYPES = {
+    'mag': 'float32',
+    'depth': 'float32',
+    'Latitude': 'float32',
+    'Longitude': 'float32',
+    'year': 'int16',
+    'month': 'uint8',
+    'day': 'uint8',
+    'country': 'category'
+}
+
+# Other string columns with at most this ratio of unique values are stored as categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Drop the redundant raw columns and downcast the working columns."""
+    frame = frame.drop(columns=[c for c in REDUNDANT_COLUMNS if c in frame.columns])
+    dtypes = {col: dtype for col, dtype in COMPACT_DTYPES.items() if col in frame.columns}
+    for col, dtype in list(dtypes.items()):
+        if pd.api.types.is_integer_dtype(dtype) and frame[col].isna().any():
+            # Rows without a time have no year, month or day; keep them missing
+            dtypes[col] = 'float32'
+    for col in frame.columns:
+        if col not in dtypes and frame[col].dtype == object and len(frame):
+            if frame[col].nunique() / len(frame) <= CATEGORY_MAX_UNIQUE_RATIO:
+                dtypes[col] = 'category'
+    return frame.astype(dtypes)
+
+
+def _inserted_values(values: pd.Series, extra: pd.Series, kept: np.ndarray, positions: np.ndarray):
+    """One column of insert_rows: values at kept, extra at positions, written once."""
+    total = len(kept) + len(positions)
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        added = extra.astype(object)
+        new_categories = pd.Index(added.dropna().unique()).difference(dtype.categories, sort=False)
+        old_codes = values.cat.codes.to_numpy()
+        if not len(new_categories):
+            categories = dtype.categories
+        elif not dtype.ordered and dtype.categories.is_monotonic_increasing:
+            # Keep sorted categories sorted, as compacting the whole frame would
+            categories = dtype.categories.append(new_categories).sort_values()
+            old_codes = np.append(categories.get_indexer(dtype.categories), -1)[old_codes]
+        else:
+            categories = dtype.categories.append(new_categories)
+        codes = np.empty(total, dtype=np.int32)
+        codes[kept] = old_codes
+        codes[positions] = categories.get_indexer(added)
+        return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(categories, ordered=dtype.ordered),
+                                         validate=False)
+
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        # Fill the UTC instants and put the time zone back without another copy
+        times = np.empty(total, dtype=f'datetime64[{dtype.unit}]')
+        times[kept] = values.to_numpy(dtype=times.dtype)
+        times[positions] = pd.to_datetime(extra, utc=True).to_numpy(dtype=times.dtype)
+        return pd.arrays.DatetimeArray._simple_new(times, dtype=dtype)
+
+    try:
+        # Keep the frame's dtype where the new values fit it
+        extra = extra.astype(dtype)
+    except (TypeError, ValueError):
+        pass
+
+    if isinstance(dtype, np.dtype) and isinstance(extra.dtype, np.dtype):
+        result = np.empty(total, dtype=np.result_type(dtype, extra.dtype))
+        result[kept] = values.to_numpy()
+        result[positions] = extra.to_numpy()
+        return result
+
+    # Extension arrays (e.g. Arrow-backed strings) have no in-place fill
+    order = np.empty(total, dtype=np.int64)
+    order[kept] = np.arange(len(kept))
+    order[positions] = len(kept) + np.arange(len(positions))
+    return pd.concat([values, extra], ignore_index=True).array.take(order)
+
+
+def insert_rows(frame: pd.DataFrame, extra: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+    """
+    A frame of frame's rows plus extra's, where extra's rows land at the
+    sorted row positions given and frame's fill the others in order. Each
+    column is written once into its final place, keeping the frame's dtypes:
+    categoricals extend their categories and other columns keep their dtype
+    where the new values fit it.
+    """
+    extra = extra.reindex(columns=frame.columns)
+    is_new = np.zeros(len(frame) + len(extra), dtype=bool)
+    is_new[positions] = True
+    kept = np.flatnonzero(~is_new)
+    return pd.DataFrame({
+        col: _inserted_values(frame[col], extra[col], kept, positions)
+        for col in frame.columns
+    }, copy=False)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Bytes per column before and after compaction, with a total row."""
+    report = pd.DataFrame({
+        'before_bytes': before.memory_usage(index=False, deep=True),
+        'after_bytes': after.memory_usage(index=False, deep=True)
+    }).reindex(before.columns).fillna(0).astype('int64')
+    report.loc['total'] = report.sum()
+    return report
+
+
+def print_memory_report(report: pd.DataFrame):
+    """Print a memory report produced by memory_report."""
+    total = report.loc['total']
+    saved = 1 - total['after_bytes'] / total['before_bytes'] if total['before_bytes'] else 0
+    print("Processed data memory by column (bytes):")
+    print(report.to_string())
+    print(f"Compact schema saved {saved:.0%} of processed data memory")
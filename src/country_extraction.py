@@ -0,0 +1,67 @@
+import json
+import os
+import re
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Keyword -> country table for named earthquakes whose Place has no ", Country" suffix.
+# Entries are matched in file order, so earlier keywords take precedence.
+NAMED_EVENTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "data", "named_event_countries.json")
+
+
+def load_named_event_table(path: str = NAMED_EVENTS_PATH) -> Dict[str, str]:
+    """Load the named-event keyword table, keeping file order."""
+    try:
+        with open(path, 'r') as f:
+            table = json.load(f)
+        return {keyword.lower(): country for keyword, country in table.items()}
+    except Exception as e:
+        print(f"Error loading named event table: {e}")
+        return {}
+
+
+def compile_named_event_pattern(table: Dict[str, str]) -> Optional[re.Pattern]:
+    """
+    Compile the keyword table into a single regex. Each keyword is its own
+    anchored alternative, so the first keyword in table order wins even when
+    a later one appears earlier in the string.
+    """
+    if not table:
+        return None
+    alternatives = '|'.join(f".*?({re.escape(keyword)})" for keyword in table)
+    return re.compile(f"^(?:{alternatives})", re.IGNORECASE | re.DOTALL)
+
+
+def extract_country(places: pd.Series, table: Optional[Dict[str, str]] = None) -> pd.Series:
+    """
+    Vectorized country extraction from the Place column.
+
+    Places of the form "..., Country" take the text after the last comma;
+    the rest are matched against the named-event keyword table in one regex pass.
+    Unmatched and non-string places map to None.
+    """
+    if table is None:
+        table = load_named_event_table()
+
+    # An all-missing column reads as float64, which has no .str accessor
+    places = places.astype(object)
+    country = np.full(len(places), None, dtype=object)
+
+    has_comma = places.str.contains(',', regex=False, na=False).to_numpy(dtype=bool)
+    if has_comma.any():
+        country[has_comma] = places[has_comma].str.rsplit(',', n=1).str[-1].str.strip().to_numpy()
+
+    pattern = compile_named_event_pattern(table)
+    named = ~has_comma & places.notna().to_numpy()
+    if pattern is not None and named.any():
+        # One column per keyword; at most one of them is non-null per row
+        matches = places[named].str.extract(pattern)
+        first = matches.notna().to_numpy().argmax(axis=1)
+        keyword = pd.Series(matches.to_numpy(dtype=object)[np.arange(len(matches)), first], dtype=object)
+        named_country = keyword.str.lower().map(table)
+        country[named] = named_country.astype(object).where(named_country.notna(), None).to_numpy()
+
+    return pd.Series(country, index=places.index, dtype=object)
@@ -0,0 +1,109 @@
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Upper bound on memoized name lookups before the memo is reset
+MAX_CACHED_LOOKUPS = 1024
+
+
+def normalize_country(name: str) -> str:
+    """Normalized form used for exact country lookups."""
+    return name.strip().casefold()
+
+
+class CountryIndex:
+    """
+    Inverted index from country/region name to the sorted row positions where
+    it occurs. Built once at load time so country filters never scan the
+    country column.
+    """
+
+    def __init__(self, countries: pd.Series):
+        codes, names = pd.factorize(countries, sort=True)
+        # Per-row code into names, -1 where the country is missing
+        codes = codes.astype(np.int32)
+
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        counts = np.bincount(codes[codes >= 0], minlength=len(names))
+        offsets = np.concatenate([[0], np.cumsum(counts)]) + int((codes < 0).sum())
+        self._set_parts(np.asarray(names, dtype=object), codes,
+                        [order[offsets[i]:offsets[i + 1]] for i in range(len(names))])
+
+    def _set_parts(self, names: np.ndarray, codes: np.ndarray, positions: List[np.ndarray]):
+        self.names = names
+        self.codes = codes
+        self.positions: List[np.ndarray] = positions
+
+        self._exact: Dict[str, List[int]] = {}
+        for code, name in enumerate(self.names):
+            self._exact.setdefault(normalize_country(str(name)), []).append(code)
+        self._lookups: Dict = {}
+
+    def inserted(self, countries: pd.Series, kept: np.ndarray,
+                 positions: np.ndarray) -> Tuple['CountryIndex', np.ndarray]:
+        """
+        The index of a frame made by inserting rows into the indexed one, where
+        old row i moved to kept[i] and the inserted rows, whose countries are
+        given, sit at positions. Only the inserted rows are grouped; the
+        existing position lists are shifted. Returns the new index and the map
+        from this index's codes to the new ones (code -1 maps to -1).
+        """
+        countries = pd.Series(countries).astype(object)
+        names = pd.Index(self.names).union(pd.Index(countries.dropna().unique()), sort=None)
+        code_map = np.append(names.get_indexer(self.names), -1).astype(np.int32)
+        new_codes = names.get_indexer(countries).astype(np.int32)
+
+        codes = np.empty(len(kept) + len(positions), dtype=np.int32)
+        codes[kept] = code_map[self.codes]
+        codes[positions] = new_codes
+
+        rows: List[np.ndarray] = [np.empty(0, dtype=np.int32)] * len(names)
+        for code, old_rows in zip(code_map, self.positions):
+            rows[code] = kept[old_rows].astype(np.int32)
+        for code in np.unique(new_codes[new_codes >= 0]):
+            added = positions[new_codes == code]
+            rows[code] = np.insert(rows[code], np.searchsorted(rows[code], added), added).astype(np.int32)
+
+        index = CountryIndex.__new__(CountryIndex)
+        index._set_parts(np.asarray(names, dtype=object), codes, rows)
+        return index, code_map
+
+    def lookup_codes(self, query: str, exact: bool = False) -> np.ndarray:
+        """
+        Codes of the names matching a query. Exact lookups compare normalized
+        names; otherwise the query is a case-insensitive pattern searched in
+        each name, like Series.str.contains(case=False).
+        """
+        key = (query, exact)
+        codes = self._lookups.get(key)
+        if codes is not None:
+            return codes
+
+        if exact:
+            codes = np.array(self._exact.get(normalize_country(query), []), dtype=np.int32)
+        else:
+            try:
+                pattern = re.compile(query, re.IGNORECASE)
+            except re.error:
+                pattern = re.compile(re.escape(query), re.IGNORECASE)
+            codes = np.array([code for code, name in enumerate(self.names)
+                              if pattern.search(str(name))], dtype=np.int32)
+
+        if len(self._lookups) >= MAX_CACHED_LOOKUPS:
+            self._lookups.clear()
+        self._lookups[key] = codes
+        return codes
+
+    def rows_for_codes(self, codes: np.ndarray) -> np.ndarray:
+        """Sorted row positions of all rows whose country code is in codes."""
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int32)
+        if len(codes) == 1:
+            return self.positions[codes[0]]
+        return np.sort(np.concatenate([self.positions[code] for code in codes]))
+
+    def rows(self, query: str, exact: bool = False) -> np.ndarray:
+        """Sorted row positions of the rows matching a country query."""
+        return self.rows_for_codes(self.lookup_codes(query, exact))
@@ -1,32 +1,175 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import copy
 import os
 import json
-from typing import List, Dict, Optional, Tuple
+import hashlib
+from typing import Callable, List, Dict, Optional, Tuple
+from src.catalog_cache import catalog_fingerprint, fingerprint_token, load_cached_catalog, save_cached_catalog
+from src.country_extraction import extract_country, load_named_event_table
+from src.compact_schema import compact_frame, insert_rows, memory_report, print_memory_report
+from src.filtered_view import FilteredView
+from src.country_index import CountryIndex
+from src.catalog_metadata import CatalogMetadata
+from src.spatial_index import SpatialIndex
+from src.top_events import TopEventIndex, top_k_positions
+from src.id_index import IdIndex
+from src.single_flight import SingleFlightCache
+from src.aggregate_cube import (AggregateCube, BAND_CODES, CELL_COLUMNS, aggregate_cells, combine_months,
+                                merge_cells, month_keys, month_start_ns)
+from src.streaming_ingest import DEFAULT_CHUNK_ROWS, ingest_csv, scan_csv, sorted_columns
+from src.shared_catalog import SharedCatalog
+from src.column_store import (STORE_MANIFEST, read_column_store, read_store_indexes, write_store_columns,
+                              write_store_indexes)
+
+DATASET_FILENAME = "Significant Earthquake Dataset 1900-2023.csv"
+
+# Bump whenever _preprocess_data changes its output so cached catalogs are rebuilt
+PREPROCESS_VERSION = 4
+
+# Attributes holding the lookup structures built by _compute_indexes
+INDEX_ATTRIBUTES = ['_time_ns', '_timed_rows', 'country_index', 'aggregate_cube', 'metadata',
+                    'spatial_index', 'top_events', 'id_index']
+
+# Bump whenever an index class changes its attributes so published indexes are rebuilt
+INDEX_FORMAT = 2
+
+def _to_epoch_ns(times: pd.Series) -> np.ndarray:
+    """Epoch nanoseconds of a datetime column; timezone-aware values are taken in UTC."""
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+    return times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _bound_to_ns(value) -> int:
+    """Epoch nanoseconds of a date bound; naive bounds are read as UTC."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(None)
+    return ts.value
 
 class DataProcessor:
     """
     Handles data loading, cleaning, and preprocessing for earthquake data.
     """
     
-    def __init__(self, data_path: str = "."):
+    def __init__(self, data_path: str = ".", cache_dir: Optional[str] = None, use_cache: bool = True,
+                 compact_schema: bool = False, streaming: bool = False,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS, dataset_filename: str = DATASET_FILENAME,
+                 shared_catalog: Optional[str] = None, column_store: Optional[str] = None,
+                 progress: Optional[Callable[[str], None]] = None):
         self.data_path = data_path
+        self.dataset_filename = dataset_filename
+        # Streaming ingest reads the CSV in chunks of chunk_rows and serves the rows
+        # memory-mapped from a column store, so catalogs larger than memory can be loaded
+        self.streaming = streaming
+        self.chunk_rows = chunk_rows
+        self.cache_dir = cache_dir or os.path.join(data_path, "data", "cache")
+        self.use_cache = use_cache
+        self.compact_schema = compact_schema
+        # Manifest of a catalog published by a loader process; when set the rows
+        # are attached from shared memory instead of loaded
+        self.shared_catalog_path = shared_catalog
+        self.shared_catalog = None
+        # Directory written by src.column_store; when set the rows are memory-mapped from it
+        self.column_store = column_store
+        # Called with a short description of each loading stage, e.g. for a readiness probe
+        self.progress = progress
         self.earthquake_data = None
         self.processed_data = None
+        self.memory_report = None
+        # Token identifying the loaded catalog, part of every derived cache key
+        self.dataset_version = None
+        # Epoch-nanosecond view of the sorted 'time' column; rows without a time sort last
+        self._time_ns = np.empty(0, dtype=np.int64)
+        self._timed_rows = 0
+        self.country_index = None
+        self.aggregate_cube = None
+        self.spatial_index = None
+        self.top_events = None
+        # Hash index from event ID to row position (first occurrence of each ID)
+        self.id_index = None
+        self.metadata = CatalogMetadata(pd.Series([], dtype=float), np.empty(0, dtype=np.int32),
+                                        np.empty(0, dtype=object))
+        # Time series shared by the count and magnitude plots, computed once per input set
+        self._time_series_memo = SingleFlightCache()
+        self.named_event_table = load_named_event_table()
         
         # Load data
         self.load_data()
     
+    def _report_progress(self, stage: str):
+        if self.progress is not None:
+            self.progress(stage)
+
+    @property
+    def source_path(self) -> str:
+        """File whose replacement means a newer catalog: the CSV, or the manifest of a shared catalog or column store."""
+        if self.shared_catalog_path:
+            return self.shared_catalog_path
+        if self.column_store:
+            return os.path.join(self.column_store, STORE_MANIFEST)
+        return os.path.join(self.data_path, self.dataset_filename)
+
+    @property
+    def streamed_store_path(self) -> str:
+        """Column store a streaming ingest writes and serves the catalog from."""
+        name = "streamed_catalog_compact" if self.compact_schema else "streamed_catalog"
+        return os.path.join(self.cache_dir, name)
+
+    @property
+    def cache_path(self) -> str:
+        """Location of the Parquet cache for the processed catalog."""
+        name = "processed_catalog_compact.parquet" if self.compact_schema else "processed_catalog.parquet"
+        return os.path.join(self.cache_dir, name)
+
     def load_data(self):
         """Load earthquake data from CSV files."""
+        if self.shared_catalog_path:
+            self._report_progress("Attaching shared catalog")
+            self._attach_shared_catalog()
+            return
+        if self.column_store:
+            self._report_progress("Mapping column store")
+            self._open_column_store(self.column_store)
+            return
+
         try:
             # Load the main earthquake dataset
-            main_file = os.path.join(self.data_path, "Significant Earthquake Dataset 1900-2023.csv")
+            main_file = os.path.join(self.data_path, self.dataset_filename)
             if os.path.exists(main_file):
+                options = dict(
+                    named_events=[[k, v] for k, v in self.named_event_table.items()],
+                    compact_schema=self.compact_schema
+                )
+                if self.streaming:
+                    options['streaming'] = True
+                fingerprint = catalog_fingerprint(main_file, PREPROCESS_VERSION, **options)
+                self.dataset_version = fingerprint_token(fingerprint)
+                if self.streaming:
+                    self._load_streaming(main_file)
+                    return
+                if self.use_cache:
+                    self._report_progress("Reading catalog cache")
+                    cached = load_cached_catalog(self.cache_path, fingerprint)
+                    if cached is not None:
+                        # Warm start: the raw rows are never needed once processed
+                        self.processed_data = cached
+                        print(f"Loaded {len(self.processed_data)} preprocessed earthquake records from cache")
+                        self._build_indexes()
+                        return
+
+                self._report_progress("Reading CSV")
                 self.earthquake_data = pd.read_csv(main_file)
                 print(f"Loaded {len(self.earthquake_data)} earthquake records")
+                self._report_progress("Preprocessing")
                 self._preprocess_data()
+
+                if self.use_cache and self.processed_data is not None:
+                    self._report_progress("Writing catalog cache")
+                    save_cached_catalog(self.processed_data, self.cache_path, fingerprint)
+                self._build_indexes()
             else:
                 print("Earthquake dataset not found.")
                 self.earthquake_data = pd.DataFrame()
@@ -35,153 +178,630 @@ class DataProcessor:
             print(f"Error loading data: {e}")
             self.earthquake_data = pd.DataFrame()
     
+    def _attach_shared_catalog(self):
+        """Serve the catalog published at shared_catalog_path, with its indexes if they were published too."""
+        try:
+            self.shared_catalog = SharedCatalog.attach(self.shared_catalog_path)
+            self.processed_data = self.shared_catalog.frame()
+            self.dataset_version = self.shared_catalog.dataset_version
+            print(f"Attached {len(self.processed_data)} earthquake records from shared memory")
+            try:
+                state = self.shared_catalog.indexes()
+            except Exception as e:
+                print(f"Error reading shared indexes: {e}")
+                state = None
+            if not self._install_index_state(state):
+                self._build_indexes()
+        except Exception as e:
+            print(f"Error attaching shared catalog: {e}")
+            self.earthquake_data = pd.DataFrame()
+
+    def _open_column_store(self, store_dir: str, dataset_version: Optional[str] = None) -> bool:
+        """
+        Memory-map the processed catalog, and its indexes if they were stored,
+        from a column store. False if it cannot be opened or, when a dataset
+        version is given, holds another version.
+        """
+        try:
+            frame, manifest = read_column_store(store_dir)
+            if dataset_version is not None and manifest.get('dataset_version') != dataset_version:
+                return False
+            self.processed_data = frame
+            self.dataset_version = manifest.get('dataset_version')
+            print(f"Mapped {len(self.processed_data)} earthquake records from column store")
+            try:
+                state = read_store_indexes(store_dir, manifest)
+            except Exception as e:
+                print(f"Error reading stored indexes: {e}")
+                state = None
+            if not self._install_index_state(state):
+                self._build_indexes()
+            return True
+        except Exception as e:
+            print(f"Error opening column store: {e}")
+            self.earthquake_data = pd.DataFrame()
+            return False
+
+    def publish_shared_catalog(self, manifest_path: str) -> Optional[SharedCatalog]:
+        """
+        Publish the processed catalog to shared memory for worker processes
+        started with shared_catalog=manifest_path. The caller owns the
+        returned block and must keep it alive while workers use it.
+        """
+        if self.processed_data is None or self.processed_data.empty:
+            print("No processed data to publish")
+            return None
+        return SharedCatalog.publish(self.processed_data, manifest_path, self.dataset_version,
+                                     self._index_state())
+
     def _preprocess_data(self):
         """Clean and preprocess the earthquake data."""
         if self.earthquake_data is None or self.earthquake_data.empty:
             return
         
         # Create a copy for processing
-        self.processed_data = self.earthquake_data.copy()
-        
+        self.processed_data = self._preprocess_frame(
+            self.earthquake_data.copy(),
+            self.earthquake_data['Mag'].median() if 'Mag' in self.earthquake_data.columns else None,
+            self.earthquake_data['Depth'].median() if 'Depth' in self.earthquake_data.columns else None
+        )
+        self._finish_preprocessing()
+
+    def _preprocess_frame(self, frame: pd.DataFrame, mag_median: Optional[float],
+                          depth_median: Optional[float]) -> pd.DataFrame:
+        """
+        Row-local preprocessing of raw rows. The missing-value medians are
+        passed in so chunks of a streamed catalog are filled like the whole.
+        """
         # Convert time column to datetime
-        if 'Time' in self.processed_data.columns:
-            self.processed_data['time'] = pd.to_datetime(self.processed_data['Time'])
+        if 'Time' in frame.columns:
+            frame['time'] = pd.to_datetime(frame['Time'])
         
         # Handle missing values
-        if 'Mag' in self.processed_data.columns:
-            self.processed_data['mag'] = self.processed_data['Mag']
-        if 'Depth' in self.processed_data.columns:
-            self.processed_data['depth'] = self.processed_data['Depth']
+        if 'Mag' in frame.columns:
+            frame['mag'] = frame['Mag']
+        if 'Depth' in frame.columns:
+            frame['depth'] = frame['Depth']
         
         # Fill missing values
-        self.processed_data['mag'].fillna(self.processed_data['mag'].median(), inplace=True)
-        self.processed_data['depth'].fillna(self.processed_data['depth'].median(), inplace=True)
+        frame['mag'] = frame['mag'].fillna(frame['mag'].median() if mag_median is None else mag_median)
+        frame['depth'] = frame['depth'].fillna(frame['depth'].median() if depth_median is None else depth_median)
         
         # Add derived columns
-        self.processed_data['year'] = self.processed_data['time'].dt.year
-        self.processed_data['month'] = self.processed_data['time'].dt.month
-        self.processed_data['day'] = self.processed_data['time'].dt.day
+        frame['year'] = frame['time'].dt.year
+        frame['month'] = frame['time'].dt.month
+        frame['day'] = frame['time'].dt.day
         
         # Add magnitude categories
-        self.processed_data['magnitude_category'] = pd.cut(
-            self.processed_data['mag'],
+        frame['magnitude_category'] = pd.cut(
+            frame['mag'],
             bins=[0, 4, 6, 7, 10],
             labels=['Minor', 'Moderate', 'Strong', 'Major'],
             include_lowest=True
         )
         
         # Extract country from place
-        def extract_country(place):
-            if not isinstance(place, str):
-                return None
-            if ',' in place:
-                return place.split(',')[-1].strip()
-            
-            # Manual mapping for known named earthquakes
-            place_lower = place.lower()
-            if "assam" in place_lower or "tibet" in place_lower:
-                return "India"
-            elif "ecuador" in place_lower:
-                return "Ecuador"
-            elif "valdivia" in place_lower or "chilean" in place_lower:
-                return "Chile"
-            elif "sumatra" in place_lower or "andaman" in place_lower:
-                return "Indonesia"
-            
-            return None  # Or "Unknown"
-        self.processed_data['country'] = self.processed_data['Place'].apply(extract_country)
+        frame['country'] = extract_country(frame['Place'], self.named_event_table)
 
         
         # Filter out invalid coordinates
-        self.processed_data = self.processed_data[
-            (self.processed_data['Latitude'].between(-90, 90)) &
-            (self.processed_data['Longitude'].between(-180, 180))
+        return frame[
+            (frame['Latitude'].between(-90, 90)) &
+            (frame['Longitude'].between(-180, 180))
         ]
+
+    def _finish_preprocessing(self):
+        """Time-sort the preprocessed rows and apply the compact schema if enabled."""
+        # Keep rows in time order so date windows resolve to a contiguous slice
+        self.processed_data = self.processed_data.sort_values(
+            'time', kind='stable', na_position='last'
+        ).reset_index(drop=True)
+
+        if self.compact_schema:
+            compacted = compact_frame(self.processed_data)
+            self.memory_report = memory_report(self.processed_data, compacted)
+            print_memory_report(self.memory_report)
+            self.processed_data = compacted
+            # The raw frame is not used after preprocessing; keep only the compact copy
+            self.earthquake_data = None
         
         print(f"Preprocessed {len(self.processed_data)} earthquake records")
-    
+
+    def _load_streaming(self, main_file: str):
+        """
+        Serve the catalog from the column store a streaming ingest writes,
+        ingesting the CSV first unless the store already holds this version.
+        """
+        store_dir = self.streamed_store_path
+        if self.use_cache and os.path.exists(os.path.join(store_dir, STORE_MANIFEST)):
+            self._report_progress("Mapping streamed catalog")
+            if self._open_column_store(store_dir, self.dataset_version):
+                return
+
+        self._report_progress("Ingesting CSV in chunks")
+        cube_cells = self._ingest_streaming(main_file, store_dir)
+        if cube_cells is None:
+            return
+        self._report_progress("Mapping streamed catalog")
+        self.processed_data, _ = read_column_store(store_dir)
+        print(f"Preprocessed {len(self.processed_data)} earthquake records")
+        self._build_indexes(cube_cells)
+        write_store_indexes(store_dir, self._index_state())
+
+    def _ingest_streaming(self, main_file: str, store_dir: str) -> Optional[pd.DataFrame]:
+        """
+        Preprocess the catalog chunk by chunk into a temporary Parquet file,
+        so only one chunk of raw rows is in memory at a time. A first pass
+        finds the column dtypes and the fill medians; the second preprocesses
+        each chunk and folds it into aggregate-cube cells keyed by country
+        name. The rows are then sorted and written to the column store at
+        store_dir one column at a time. Returns the cells for _build_indexes,
+        or None if no rows were ingested.
+        """
+        dtypes, medians = scan_csv(main_file, ['Mag', 'Depth'], self.chunk_rows)
+        store_path = os.path.join(self.cache_dir, f"ingest.{os.getpid()}.parquet")
+
+        try:
+            rows, cube_cells = ingest_csv(
+                main_file, store_path, dtypes,
+                lambda chunk: self._preprocess_frame(chunk, medians.get('Mag'), medians.get('Depth')),
+                self.chunk_rows,
+                # Aggregate the magnitudes and depths exactly as they will be stored
+                cube_dtype='float32' if self.compact_schema else 'float64'
+            )
+            if not rows:
+                self.earthquake_data = pd.DataFrame()
+                return None
+
+            self._report_progress("Sorting ingested catalog")
+            write_store_columns(sorted_columns(store_path, self.compact_schema), store_dir, self.dataset_version)
+        finally:
+            if os.path.exists(store_path):
+                os.remove(store_path)
+        return cube_cells
+
+    def _build_indexes(self, cube_cells: Optional[pd.DataFrame] = None):
+        """
+        Build the lookup structures used by the query methods. Aggregate-cube
+        cells keyed by country name (from a streaming ingest) are reused
+        instead of aggregating the rows again.
+        """
+        if self.processed_data is None or self.processed_data.empty:
+            return
+
+        self._report_progress("Building indexes")
+        self._install_indexes(self.processed_data, self._compute_indexes(self.processed_data, cube_cells))
+
+    def _compute_indexes(self, frame: pd.DataFrame, cube_cells: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Compute every lookup structure for a time-sorted processed frame without
+        touching the live ones.
+        """
+        times = frame['time']
+        time_ns = _to_epoch_ns(times)
+        country_index = CountryIndex(frame['country'])
+
+        if cube_cells is not None:
+            cube_cells = cube_cells.assign(
+                country=pd.Index(country_index.names).get_indexer(cube_cells['country']).astype(np.int32)
+            )
+            aggregate_cube = AggregateCube(cube_cells[CELL_COLUMNS])
+        else:
+            aggregate_cube = AggregateCube.from_rows(
+                month_keys(time_ns),
+                country_index.codes,
+                frame['mag'].to_numpy(),
+                frame['depth'].to_numpy()
+            )
+
+        return {
+            '_time_ns': time_ns,
+            '_timed_rows': int(times.notna().sum()),
+            'country_index': country_index,
+            'aggregate_cube': aggregate_cube,
+            'metadata': CatalogMetadata(frame['year'], country_index.codes, country_index.names),
+            'spatial_index': SpatialIndex(frame['Latitude'].to_numpy(), frame['Longitude'].to_numpy()),
+            'top_events': TopEventIndex(frame['mag'].to_numpy(), country_index.codes, frame['year']),
+            'id_index': IdIndex(frame['ID'])
+        }
+
+    def _install_indexes(self, frame: pd.DataFrame, indexes: Dict):
+        """Swap in a processed frame together with the indexes computed for it."""
+        self.processed_data = frame
+        for name, value in indexes.items():
+            setattr(self, name, value)
+        self._time_series_memo.clear()
+
+    def _index_state(self) -> Dict:
+        """The lookup structures as one object, for publishing alongside the frame."""
+        state = {name: getattr(self, name) for name in INDEX_ATTRIBUTES}
+        state['format'] = INDEX_FORMAT
+        return state
+
+    def _install_index_state(self, state: Optional[Dict]) -> bool:
+        """Install published lookup structures; False if there are none or they are from another format."""
+        if not state or state.get('format') != INDEX_FORMAT:
+            return False
+        self._install_indexes(self.processed_data, {name: state[name] for name in INDEX_ATTRIBUTES})
+        return True
+
+    def _snapshot(self) -> 'DataProcessor':
+        """A copy sharing this processor's settings, to be filled with a new catalog and indexes."""
+        snapshot = copy.copy(self)
+        snapshot.earthquake_data = None
+        snapshot.memory_report = None
+        snapshot._time_series_memo = SingleFlightCache()
+        return snapshot
+
+    def appended(self, new_rows: pd.DataFrame) -> 'DataProcessor':
+        """
+        A new processor holding this catalog plus raw catalog rows (same
+        columns as the CSV), built without reprocessing the catalog. Only the
+        new rows are preprocessed and sorted; they are placed into the time
+        order by binary search, every column is written once into the merged
+        frame, the indexes are shifted and extended with the new rows alone,
+        and the dataset version changes so version-keyed caches miss. This processor is not
+        modified, so requests still using it are unaffected; publish the
+        result with DatasetLoader.append_events. Returns self if no row is added.
+        """
+        if new_rows is None or new_rows.empty:
+            return self
+
+        snapshot = self._snapshot()
+        if self.processed_data is None or self.processed_data.empty:
+            # Nothing loaded yet: the new rows are the whole catalog
+            snapshot.earthquake_data = new_rows.copy()
+            snapshot._preprocess_data()
+            snapshot._build_indexes()
+            snapshot.dataset_version = self._appended_version(new_rows)
+            return snapshot
+
+        # Fill gaps with the catalog's medians, which filling itself does not move
+        new = self._preprocess_frame(
+            new_rows.copy(),
+            float(self.processed_data['mag'].median()),
+            float(self.processed_data['depth'].median())
+        )
+        if new.empty:
+            return self
+        if self.compact_schema:
+            new = compact_frame(new)
+        new = new.sort_values('time', kind='stable', na_position='last').reset_index(drop=True)
+
+        # Merge the two time-sorted runs: each new timed row goes after the old rows
+        # with the same or an earlier time, and untimed rows go last
+        old_count, old_timed = len(self.processed_data), self._timed_rows
+        new_ns = _to_epoch_ns(new['time'])
+        new_timed = int(new['time'].notna().sum())
+        positions = np.concatenate([
+            np.searchsorted(self._time_ns[:old_timed], new_ns[:new_timed], side='right') + np.arange(new_timed),
+            old_count + np.arange(new_timed, len(new))
+        ])
+        kept = np.delete(np.arange(old_count + len(new)), positions)
+        frame = insert_rows(self.processed_data, new, positions)
+
+        time_ns = np.empty(len(frame), dtype=np.int64)
+        time_ns[kept] = self._time_ns
+        time_ns[positions] = new_ns
+
+        # Every index is shifted to the new row positions and extended with the new rows alone
+        country_index, code_map = self.country_index.inserted(new['country'], kept, positions)
+        new_codes = country_index.codes[positions]
+        mags = frame['mag'].to_numpy()
+        old_cells = self.aggregate_cube.cells.assign(
+            country=code_map[self.aggregate_cube.cells['country'].to_numpy()]
+        )
+        new_cells = aggregate_cells(month_keys(new_ns), new_codes, mags[positions],
+                                    frame['depth'].to_numpy()[positions])
+
+        indexes = {
+            '_time_ns': time_ns,
+            '_timed_rows': old_timed + new_timed,
+            'country_index': country_index,
+            'aggregate_cube': AggregateCube(merge_cells([old_cells, new_cells])),
+            'metadata': self.metadata.inserted(new['year'], new_codes, code_map, country_index.names),
+            'spatial_index': self.spatial_index.inserted(frame['Latitude'].to_numpy()[positions],
+                                                         frame['Longitude'].to_numpy()[positions],
+                                                         kept, positions),
+            'top_events': self.top_events.inserted(mags, country_index.codes, frame['year'],
+                                                   code_map, kept, positions),
+            'id_index': self.id_index.inserted(new['ID'], kept, positions)
+        }
+        snapshot._install_indexes(frame, indexes)
+        snapshot.dataset_version = self._appended_version(new_rows)
+        print(f"Appended {len(new)} earthquake records")
+        return snapshot
+
+    def _appended_version(self, new_rows: pd.DataFrame) -> str:
+        """Dataset version after appending rows to the current catalog."""
+        digest = hashlib.sha256(pd.util.hash_pandas_object(new_rows, index=False).to_numpy().tobytes())
+        return fingerprint_token({'parent': self.dataset_version, 'appended': digest.hexdigest()})
+
+    def _time_slice(self, start_date=None, end_date=None) -> Tuple[int, int]:
+        """Resolve inclusive date bounds to a [lo, hi) row slice by binary search."""
+        timed = self._time_ns[:self._timed_rows]
+        lo, hi = 0, self._timed_rows
+        if start_date:
+            lo = int(np.searchsorted(timed, _bound_to_ns(start_date), side='left'))
+        if end_date:
+            hi = int(np.searchsorted(timed, _bound_to_ns(end_date), side='right'))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def year_bounds(start_year: int, end_year: Optional[int] = None) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """UTC bounds covering whole calendar years, inclusive at both ends."""
+        end_year = start_year if end_year is None else end_year
+        start = pd.Timestamp(year=int(start_year), month=1, day=1, tz='UTC')
+        end = pd.Timestamp(year=int(end_year) + 1, month=1, day=1, tz='UTC') - pd.Timedelta(1, 'ns')
+        return start, end
+
+    def _select_rows(self,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     magnitude_range: Optional[Tuple[float, float]] = None,
+                     country: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Return the sorted row positions matching all filters, or None when no
+        filter applies. Date bounds resolve to a time slice and the country
+        to its index entry; the magnitude predicate only runs on those rows.
+        """
+        data = self.processed_data
+        has_window = bool(start_date) or bool(end_date)
+        lo, hi = self._time_slice(start_date, end_date) if has_window else (0, len(data))
+
+        # Filter by country
+        rows = None
+        if country and country != 'all':
+            rows = self.country_index.rows(country)
+            if has_window:
+                rows = rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)]
+
+        # Filter by magnitude range
+        if magnitude_range:
+            mag = data['mag'].to_numpy()
+            if rows is None:
+                in_range = (mag[lo:hi] >= magnitude_range[0]) & (mag[lo:hi] <= magnitude_range[1])
+                return lo + np.flatnonzero(in_range)
+            selected = mag[rows]
+            rows = rows[(selected >= magnitude_range[0]) & (selected <= magnitude_range[1])]
+
+        if rows is None and has_window:
+            return np.arange(lo, hi)
+        return rows
+
     def get_filtered_data(self, 
                          start_date: Optional[str] = None,
                          end_date: Optional[str] = None,
                          magnitude_range: Optional[Tuple[float, float]] = None,
-                         country: Optional[str] = None) -> pd.DataFrame:
-        """Get filtered earthquake data based on criteria."""
+                         country: Optional[str] = None,
+                         copy: bool = True) -> pd.DataFrame:
+        """
+        Get filtered earthquake data based on criteria.
+
+        Only the selected rows are materialized. With copy=False and no filters
+        the processed frame itself is returned, so the result must be treated
+        as read-only.
+        """
         if self.processed_data is None or self.processed_data.empty:
             return pd.DataFrame()
-        
-        data = self.processed_data.copy()
-        
-        # Filter by date range
-        if start_date:
-            data = data[data['time'] >= pd.to_datetime(start_date)]
-        if end_date:
-            data = data[data['time'] <= pd.to_datetime(end_date)]
-        
-        # Filter by magnitude range
-        if magnitude_range:
-            data = data[data['mag'].between(magnitude_range[0], magnitude_range[1])]
-        
-        # Filter by country
-        if country and country != 'all':
-            data = data[data['country'].str.contains(country, case=False, na=False)]
-        
-        return data
+
+        rows = self._select_rows(start_date, end_date, magnitude_range, country)
+        if rows is None:
+            return self.processed_data.copy() if copy else self.processed_data
+        return self.processed_data.take(rows)
+
+    def get_filtered_view(self,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None,
+                          magnitude_range: Optional[Tuple[float, float]] = None,
+                          country: Optional[str] = None) -> FilteredView:
+        """Get a read-only view of the filtered rows that gathers columns on demand."""
+        if self.processed_data is None or self.processed_data.empty:
+            return FilteredView(pd.DataFrame(), np.empty(0, dtype=np.int64))
+
+        rows = self._select_rows(start_date, end_date, magnitude_range, country)
+        return FilteredView(self.processed_data, rows)
+
+    def get_event(self, event_id: str) -> Optional[pd.Series]:
+        """Look up a single event by ID, or None if it is not in the catalog."""
+        if self.id_index is None:
+            return None
+        row = self.id_index.lookup([event_id], self.processed_data['ID'])[0]
+        if row < 0:
+            return None
+        return self.processed_data.iloc[row]
+
+    def get_events(self, event_ids: List[str]) -> pd.DataFrame:
+        """Look up several events by ID, in the given order; unknown IDs are skipped."""
+        if self.id_index is None:
+            return pd.DataFrame()
+
+        rows = self.id_index.lookup(event_ids, self.processed_data['ID'])
+        return self.processed_data.take(rows[rows >= 0])
+
+    def get_events_within_radius(self, lat: float, lon: float, radius_km: float) -> pd.DataFrame:
+        """
+        Events whose epicentre lies within radius_km of a point (great-circle
+        distance), nearest first, with a 'distance_km' column.
+        """
+        if self.spatial_index is None:
+            return pd.DataFrame()
+
+        rows, distances = self.spatial_index.within_radius(lat, lon, radius_km)
+        return self.processed_data.take(rows).assign(distance_km=distances)
+
+    def get_nearest_events(self, lat: float, lon: float, k: int = 50,
+                           max_distance_km: Optional[float] = None) -> pd.DataFrame:
+        """
+        The k events nearest to a point, nearest first, with a 'distance_km'
+        column, optionally limited to those within max_distance_km.
+        """
+        if self.spatial_index is None:
+            return pd.DataFrame()
+
+        rows, distances = self.spatial_index.nearest(lat, lon, k, max_distance_km)
+        return self.processed_data.take(rows).assign(distance_km=distances)
     
     def get_countries(self) -> List[str]:
         """Get list of unique countries in the dataset."""
-        if self.processed_data is None or self.processed_data.empty:
-            return []
-        
-        countries = self.processed_data['country'].dropna().unique()
-        return sorted([c.strip() for c in countries if c.strip()])
+        return sorted([c.strip() for c in self.metadata.countries if c.strip()])
     
     def get_significant_earthquakes(self) -> List[Dict]:
         """Get list of significant earthquakes for impact analysis."""
         if self.processed_data is None or self.processed_data.empty:
             return []
         
-        # Get earthquakes with magnitude >= 6.0
-        significant = self.processed_data[
-            self.processed_data['mag'] >= 6.0
-        ].copy()
-        
-        # Sort by magnitude
-        significant = significant.sort_values('mag', ascending=False)
+        # The 100 largest earthquakes with magnitude >= 6.0
+        rows = self.top_events.top(100, min_mag=6.0)
         
         # Convert to list of dictionaries
-        return significant.head(100).to_dict('records')
+        return self.processed_data.take(rows).to_dict('records')
+
+    @staticmethod
+    def _whole_years(start_date=None, end_date=None) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """Inclusive (start_year, end_year) if the bounds cover whole UTC years, else None."""
+        year_lo, year_hi = None, None
+        if start_date:
+            start = pd.Timestamp(_bound_to_ns(start_date))
+            if start != pd.Timestamp(year=start.year, month=1, day=1):
+                return None
+            year_lo = start.year
+        if end_date:
+            end = pd.Timestamp(_bound_to_ns(end_date)) + pd.Timedelta(1, 'ns')
+            if end != pd.Timestamp(year=end.year, month=1, day=1):
+                return None
+            year_hi = end.year - 1
+        return year_lo, year_hi
+
+    def get_top_events(self,
+                       k: int = 10,
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       magnitude_range: Optional[Tuple[float, float]] = None,
+                       country: Optional[str] = None) -> pd.DataFrame:
+        """
+        The k largest events matching the filters, largest first.
+
+        Whole-year windows are answered from the per-(country, year) top-k
+        index; other filters select the matching rows and partially order
+        them with argpartition, so the catalog is never fully sorted.
+        """
+        if self.processed_data is None or self.processed_data.empty:
+            return pd.DataFrame()
+
+        years = self._whole_years(start_date, end_date)
+        if years is not None and not magnitude_range:
+            codes = None
+            if country and country != 'all':
+                codes = self.country_index.lookup_codes(country)
+            rows = self.top_events.top(k, codes, *years)
+        else:
+            rows = self._select_rows(start_date, end_date, magnitude_range, country)
+            if rows is None:
+                rows = self.top_events.top(k)
+            else:
+                rows = top_k_positions(rows, self.top_events.mags, k)
+
+        return self.processed_data.take(rows)
     
+    def _aggregate_rows(self, rows: Optional[np.ndarray], bands: Optional[List[int]]) -> pd.DataFrame:
+        """Per-month totals computed directly from raw rows."""
+        if rows is None:
+            rows = np.arange(len(self.processed_data))
+        partial = AggregateCube.from_rows(
+            month_keys(self._time_ns[rows]),
+            self.country_index.codes[rows],
+            self.processed_data['mag'].to_numpy()[rows],
+            self.processed_data['depth'].to_numpy()[rows]
+        )
+        return partial.by_month(bands=bands)
+
     def get_time_series_data(self, 
                             magnitude_filter: str = 'all',
                             start_date: Optional[str] = None,
                             end_date: Optional[str] = None,
                             country: Optional[str] = None) -> pd.DataFrame:
-        """Get time series data for plotting."""
-        data = self.get_filtered_data(start_date, end_date, country=country)
-        
-        if data.empty:
+        """
+        Get time series data for plotting.
+
+        Results are memoized per (filter, window, country, dataset version);
+        concurrent requests for the same inputs share one computation, and
+        every caller gets its own copy.
+        """
+        key = (
+            magnitude_filter,
+            _bound_to_ns(start_date) if start_date else None,
+            _bound_to_ns(end_date) if end_date else None,
+            country,
+            self.dataset_version
+        )
+        time_series = self._time_series_memo.get_or_compute(
+            key, lambda: self._compute_time_series_data(magnitude_filter, start_date, end_date, country)
+        )
+        return time_series.copy()
+
+    def _compute_time_series_data(self,
+                                  magnitude_filter: str = 'all',
+                                  start_date: Optional[str] = None,
+                                  end_date: Optional[str] = None,
+                                  country: Optional[str] = None) -> pd.DataFrame:
+        """
+        Whole months inside the window are answered from the aggregate cube;
+        only the partial months at either edge are aggregated from raw rows.
+        """
+        if self.processed_data is None or self.processed_data.empty:
             return pd.DataFrame()
-        
-        # Apply magnitude filter
-        if magnitude_filter == 'minor':
-            data = data[data['mag'] < 4.0]
-        elif magnitude_filter == 'moderate':
-            data = data[data['mag'].between(4.0, 5.9)]
-        elif magnitude_filter == 'strong':
-            data = data[data['mag'].between(6.0, 6.9)]
-        elif magnitude_filter == 'major':
-            data = data[data['mag'] >= 7.0]
-        
-        # Group by year and month
-        data['year_month'] = data['time'].dt.to_period('M')
-        time_series = data.groupby('year_month').agg({
-            'ID': 'count',
-            'mag': ['mean', 'max'],
-            'depth': 'mean'
-        }).reset_index()
-        
-        time_series.columns = ['year_month', 'count', 'avg_magnitude', 'max_magnitude', 'avg_depth']
-        time_series['date'] = time_series['year_month'].dt.to_timestamp()
+
+        band = BAND_CODES.get(magnitude_filter)
+        bands = None if magnitude_filter == 'all' or band is None else [band]
+        codes = None
+        if country and country != 'all':
+            codes = self.country_index.lookup_codes(country)
+
+        # Split the window into whole months (cube) and partial edge months (raw rows)
+        full_lo, full_hi = None, None
+        edges = []
+        if start_date:
+            start_ns = _bound_to_ns(start_date)
+            month = int(month_keys(np.array([start_ns]))[0])
+            if start_ns == month_start_ns(month):
+                full_lo = month
+            else:
+                full_lo = month + 1
+                edges.append((start_ns, month_start_ns(month + 1) - 1))
+        if end_date:
+            end_ns = _bound_to_ns(end_date)
+            month = int(month_keys(np.array([end_ns]))[0])
+            if end_ns == month_start_ns(month + 1) - 1:
+                full_hi = month
+            else:
+                full_hi = month - 1
+                edges.append((month_start_ns(month), end_ns))
+        if full_lo is not None and full_hi is not None and full_lo > full_hi:
+            # The window does not contain a whole month
+            edges = [(start_ns, end_ns)]
+            pieces = []
+        else:
+            pieces = [self.aggregate_cube.by_month(full_lo, full_hi, codes, bands)]
+
+        for edge_start, edge_end in edges:
+            rows = self._select_rows(pd.Timestamp(edge_start), pd.Timestamp(edge_end), country=country)
+            if len(rows):
+                pieces.append(self._aggregate_rows(rows, bands))
+
+        months = combine_months(pieces)
+        if months.empty:
+            return pd.DataFrame()
+
+        dates = pd.Series(months['month_key'].to_numpy().astype('M8[M]').astype('M8[ns]'))
+        time_series = pd.DataFrame({
+            'year_month': dates.dt.to_period('M'),
+            'count': months['count'].astype(np.int64),
+            'avg_magnitude': months['mag_sum'] / months['count'],
+            'max_magnitude': months['mag_max'],
+            'avg_depth': months['depth_sum'] / months['count'],
+            'date': dates
+        })
         
         return time_series
     
@@ -190,9 +810,7 @@ class DataProcessor:
         if self.processed_data is None or self.processed_data.empty:
             return {}
         
-        country_data = self.processed_data[
-            self.processed_data['country'].str.contains(country, case=False, na=False)
-        ]
+        country_data = FilteredView(self.processed_data, self.country_index.rows(country))
         
         if country_data.empty:
             return {}
@@ -213,13 +831,14 @@ class DataProcessor:
         if self.processed_data is None or self.processed_data.empty:
             return pd.DataFrame()
         
-        # Group by country
-        risk_data = self.processed_data.groupby('country').agg({
-            'ID': 'count',
-            'mag': ['mean', 'max']
-        }).reset_index()
-        
-        risk_data.columns = ['country', 'count', 'avg_magnitude', 'max_magnitude']
+        # Per-country totals come straight from the aggregate cube
+        totals = self.aggregate_cube.by_country()
+        risk_data = pd.DataFrame({
+            'country': self.country_index.names[totals['country'].to_numpy()],
+            'count': totals['count'].astype(np.int64),
+            'avg_magnitude': totals['mag_sum'] / totals['count'],
+            'max_magnitude': totals['mag_max']
+        }).sort_values('country').reset_index(drop=True)
         
         # Select the metric to display
         if metric == 'count':
@@ -0,0 +1,295 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.data_processor import DataProcessor
+from src.shared_catalog import SharedCatalog
+
+# Loader states reported by DatasetLoader.status
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DatasetLoader:
+    """
+    Builds the DataProcessor on a background thread so the server can accept
+    requests (health checks, the page shell, loading placeholders) while the
+    catalog is read and indexed. Callers either poll the status or wait on
+    the readiness event.
+
+    The published processor is a snapshot: it is fully built before it is
+    published through the single data_processor reference and never changed
+    afterwards. A reload builds a new one off the request path and swaps the
+    reference, so a request that picked up the old snapshot finishes on it
+    and no request sees a half-built dataset.
+
+    With several worker processes one loader reloads for all of them: it
+    republishes each new snapshot as a shared catalog (republish), and the
+    others attach to it instead of loading (follow).
+    """
+
+    def __init__(self, **processor_options):
+        self.processor_options = processor_options
+        self.data_processor: Optional[DataProcessor] = None
+        self.ready = threading.Event()
+        self.stage = "Waiting to start"
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.reloads = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._append_lock = threading.Lock()
+        # Held while a snapshot is swapped in and its listeners run, so publishes never interleave
+        self._publish_lock = threading.Lock()
+        self._listeners: List[Callable] = []
+        self._watcher = None
+        self._watch_pid = None
+        # Set by follow: file whose touch asks the publishing process to reload
+        self.reload_request_path = None
+        # Set by republish: manifest of the shared catalog holding the latest snapshot
+        self._republish_path = None
+        self._republished: Optional[SharedCatalog] = None
+
+    def start(self) -> 'DatasetLoader':
+        """Start the first load; calling it again is a no-op."""
+        if self.data_processor is None:
+            self._start_load()
+        return self
+
+    def reload(self) -> bool:
+        """Rebuild the dataset in the background and swap it in; False if a load is already running."""
+        return self._start_load()
+
+    def request_reload(self) -> bool:
+        """
+        Reload, or, in a process following another's catalog, ask that
+        process to reload by touching the request file; every follower then
+        re-attaches. False if a reload is already running here.
+        """
+        if self.reload_request_path is None:
+            return self.reload()
+        os.makedirs(os.path.dirname(self.reload_request_path) or ".", exist_ok=True)
+        with open(self.reload_request_path, 'w') as f:
+            f.write(str(time.time()))
+        return True
+
+    def republish(self, manifest_path: str):
+        """
+        Publish every later snapshot (reloads and appends) as a shared catalog
+        at manifest_path for processes following it, removing the previous
+        block. Processes forked before the first reload share the current
+        snapshot's pages, so it is not published.
+        """
+        self._republish_path = manifest_path
+        if os.path.exists(manifest_path):
+            # Left by an earlier run; its block may be gone
+            os.remove(manifest_path)
+        self.on_publish(self._republish)
+
+    def _republish(self, old: Optional[DataProcessor], new: DataProcessor):
+        if old is None or self._republish_path is None:
+            return
+        catalog = new.publish_shared_catalog(self._republish_path)
+        if catalog is None:
+            return
+        previous, self._republished = self._republished, catalog
+        if previous is not None:
+            # Followers that attached to it keep their mapping until they re-attach
+            previous.unlink()
+
+    def unpublish(self):
+        """Remove the block and manifest written by republish, e.g. when the server exits."""
+        if self._republished is not None:
+            self._republished.unlink()
+            self._republished = None
+        if self._republish_path and os.path.exists(self._republish_path):
+            os.remove(self._republish_path)
+
+    def follow(self, manifest_path: str, request_path: str, interval: float):
+        """
+        Serve the catalog another process republishes at manifest_path instead
+        of loading it: keep the current snapshot until the manifest changes,
+        then attach to the new block, which costs no parsing. Reload requests
+        are passed on through request_path. Called in each forked worker.
+        """
+        # A thread of the parent may have held these at the fork; it does not exist here to release them
+        self._lock = threading.Lock()
+        self._append_lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        # Only the parent republishes, and only it may remove its blocks
+        self._republish_path = None
+        self._republished = None
+        self.processor_options = {'shared_catalog': manifest_path}
+        self.reload_request_path = request_path
+        self._start_watcher(interval, lambda: manifest_path)
+
+    def append_events(self, new_rows: pd.DataFrame) -> int:
+        """
+        Add raw catalog rows to the published dataset. A new snapshot is built
+        from the current one (see DataProcessor.appended) and published like
+        a reload, so requests never see a half-merged catalog and caches of
+        the old version are evicted. Appends run one at a time. The rows live
+        only in memory, so a later reload from the source drops them unless
+        the source has them too. If a reload is published while the snapshot
+        is built, the rows are appended again to the reloaded dataset rather
+        than overwriting it. Returns the number of rows added.
+        """
+        with self._append_lock:
+            while True:
+                processor = self.wait()
+                if processor is None:
+                    print("No dataset loaded to append to")
+                    return 0
+                snapshot = processor.appended(new_rows)
+                if snapshot is processor:
+                    return 0
+                if self._publish(snapshot, base=processor):
+                    before = 0 if processor.processed_data is None else len(processor.processed_data)
+                    return len(snapshot.processed_data) - before
+
+    def on_publish(self, listener: Callable[[Optional[DataProcessor], DataProcessor], None]):
+        """Call listener(old, new) after each new snapshot is published, e.g. to evict caches."""
+        self._listeners.append(listener)
+
+    def _start_load(self) -> bool:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self.started_at = time.monotonic()
+            self.finished_at = None
+            self.error = None
+            self._thread = threading.Thread(target=self._load, name="dataset-loader", daemon=True)
+            self._thread.start()
+            return True
+
+    def _progress(self, stage: str):
+        self.stage = stage
+
+    def _load(self):
+        try:
+            processor = DataProcessor(progress=self._progress, **self.processor_options)
+            self._publish(processor)
+        except Exception as e:
+            print(f"Error loading dataset: {e}")
+            self.error = str(e)
+            self.stage = "Failed"
+        finally:
+            self.finished_at = time.monotonic()
+            # Set even on failure so waiters are released
+            self.ready.set()
+
+    def _publish(self, processor: DataProcessor, base: Optional[DataProcessor] = None) -> bool:
+        """
+        Swap in a new snapshot. With base, only if base is still the published
+        one (the snapshot was derived from it); False if another was published
+        since.
+        """
+        with self._publish_lock:
+            old = self.data_processor
+            if base is not None and old is not base:
+                return False
+            has_data = processor.processed_data is not None and not processor.processed_data.empty
+            if old is not None and not has_data:
+                # A reload that found no usable rows (e.g. a CSV caught mid-copy) keeps serving the old snapshot
+                self.error = "Reloaded dataset has no records; keeping the current one"
+                self.stage = "Ready"
+                print(self.error)
+                return True
+
+            self.data_processor = processor
+            if old is not None:
+                self.reloads += 1
+                print(f"Dataset reloaded: version {old.dataset_version} -> {processor.dataset_version}")
+            self.stage = "Ready"
+            for listener in self._listeners:
+                try:
+                    listener(old, processor)
+                except Exception as e:
+                    print(f"Error in dataset publish listener: {e}")
+            return True
+
+    def watch(self, interval: float, request_path: Optional[str] = None, watch_source: bool = True):
+        """
+        Poll the published dataset's source file every interval seconds and
+        reload once a change has settled (the same size and mtime on two
+        polls in a row, so a file being copied is not read half-written).
+        With request_path, also reload whenever that file is touched (see
+        request_reload); watch_source=False watches only the request file.
+        Threads do not survive a fork, so a forked worker calls this again.
+        """
+        source = self._source_path if watch_source else None
+        self._start_watcher(interval, source, request_path)
+
+    def _source_path(self) -> Optional[str]:
+        processor = self.data_processor
+        return processor.source_path if processor is not None else None
+
+    def _start_watcher(self, interval: float, source: Optional[Callable[[], Optional[str]]],
+                       request_path: Optional[str] = None):
+        if interval <= 0 or self._watch_pid == os.getpid():
+            return
+        self._watch_pid = os.getpid()
+        self._watcher = threading.Thread(target=self._watch, args=(interval, source, request_path),
+                                         name="dataset-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval: float, source: Optional[Callable[[], Optional[str]]],
+               request_path: Optional[str]):
+        self.ready.wait()
+        path = source() if source is not None else None
+        seen = pending = _file_signature(path) if path is not None else None
+        requested = _file_signature(request_path) if request_path is not None else None
+        while True:
+            time.sleep(interval)
+            if request_path is not None:
+                signature = _file_signature(request_path)
+                if signature is not None and signature != requested and self.reload():
+                    requested = signature
+
+            path = source() if source is not None else None
+            if path is None:
+                continue
+            signature = _file_signature(path)
+            if signature is not None and signature != seen:
+                if signature == pending and self.reload():
+                    seen = signature
+                pending = signature
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[DataProcessor]:
+        """The current processor, waiting up to timeout seconds (forever if None) for the first load."""
+        self.ready.wait(timeout)
+        return self.data_processor
+
+    def status(self) -> Dict:
+        """Loading state, current stage and elapsed time, plus the record count once ready."""
+        processor = self.data_processor
+        if processor is not None:
+            state = READY
+        else:
+            state = LOADING if not self.ready.is_set() else FAILED
+
+        end = self.finished_at or time.monotonic()
+        processed = processor.processed_data if processor is not None else None
+        return {
+            'state': state,
+            'stage': self.stage,
+            'reloading': processor is not None and self._thread is not None and self._thread.is_alive(),
+            'reloads': self.reloads,
+            'elapsed_seconds': round(end - self.started_at, 2) if self.started_at else 0.0,
+            'records': 0 if processed is None else len(processed),
+            'dataset_version': processor.dataset_version if processor is not None else None,
+            'error': self.error
+        }
@@ -0,0 +1,45 @@
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+class FilteredView:
+    """
+    Read-only selection over the processed earthquake frame.
+
+    Holds the frame and the row positions that matched a filter, and only
+    gathers the columns a caller asks for. With no positions the view covers
+    every row and columns are returned without copying, so callers must not
+    modify what they get back.
+    """
+
+    def __init__(self, frame: pd.DataFrame, positions: Optional[np.ndarray] = None):
+        self.frame = frame
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.frame) if self.positions is None else len(self.positions)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.frame.columns
+
+    def __getitem__(self, columns: Union[str, List[str]]) -> Union[pd.Series, pd.DataFrame]:
+        """Gather one column (Series) or a list of columns (DataFrame) for the selected rows."""
+        if self.positions is None:
+            return self.frame[columns]
+        if isinstance(columns, str):
+            return self.frame[columns].take(self.positions)
+        # Gather rows and columns in one step so only the requested columns are copied
+        return self.frame.iloc[self.positions, self.frame.columns.get_indexer(columns)]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize all columns of the selected rows."""
+        if self.positions is None:
+            return self.frame
+        return self.frame.take(self.positions)
@@ -0,0 +1,65 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def hash_ids(ids) -> np.ndarray:
+    """64-bit hashes of event IDs, the same in every process."""
+    return pd.util.hash_array(np.asarray(ids, dtype=object))
+
+
+class IdIndex:
+    """
+    Hash index from event ID to row position, kept as two flat arrays: the
+    sorted 64-bit hashes of the IDs and the row each hash came from. Unlike a dict or pd.Index it holds no Python
+    object per row, so it can be shared between processes as is. The IDs
+    themselves stay in the frame and confirm each match, so a hash collision
+    can never return the wrong event.
+    """
+
+    def __init__(self, ids: pd.Series):
+        rows = np.flatnonzero(ids.notna().to_numpy())
+        hashes = hash_ids(ids.to_numpy(dtype=object)[rows])
+        order = np.lexsort((rows, hashes))
+        self.hashes = hashes[order]
+        self.rows = rows[order]
+
+    def inserted(self, ids: pd.Series, kept: np.ndarray, positions: np.ndarray) -> 'IdIndex':
+        """
+        The index of a frame made by inserting rows into the indexed one, where
+        old row i moved to kept[i] and the inserted rows, with the IDs given,
+        sit at positions. Only the new IDs are hashed and sorted.
+        """
+        present = ids.notna().to_numpy()
+        hashes = hash_ids(ids.to_numpy(dtype=object)[present])
+        rows = np.asarray(positions, dtype=np.int64)[present]
+        order = np.argsort(hashes, kind='stable')
+        at = np.searchsorted(self.hashes, hashes[order], side='right')
+
+        index = IdIndex.__new__(IdIndex)
+        index.hashes = np.insert(self.hashes, at, hashes[order])
+        index.rows = np.insert(kept[self.rows], at, rows[order])
+        return index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def lookup(self, event_ids: Iterable[str], ids: pd.Series) -> np.ndarray:
+        """
+        Row of the first occurrence of each event ID in ids (the indexed
+        column), or -1 where the ID is not in the catalog.
+        """
+        queries = np.asarray(list(event_ids), dtype=object)
+        result = np.full(len(queries), -1, dtype=np.int64)
+        if not len(queries):
+            return result
+
+        hashes = hash_ids(queries)
+        starts = np.searchsorted(self.hashes, hashes, side='left')
+        ends = np.searchsorted(self.hashes, hashes, side='right')
+        for i in np.flatnonzero(ends > starts):
+            matches = [row for row in self.rows[starts[i]:ends[i]] if ids.iloc[row] == queries[i]]
+            if matches:
+                result[i] = min(matches)
+        return result
@@ -0,0 +1,193 @@
+import json
+import mmap
+import os
+import signal
+import tempfile
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import decode_frame, decode_objects, encode_frame, encode_objects, untrusted_reason
+
+# Manifest a loader writes next to the processed-catalog cache; workers read it to attach
+MANIFEST_FILENAME = "shared_catalog.json"
+
+# Environment variable naming the manifest a worker should attach to instead of loading
+MANIFEST_ENV = "EARTHQUAKE_SHARED_CATALOG"
+
+# tmpfs mount backed by shared memory on Linux; elsewhere the block is a temporary file
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# Every array starts on a cache-line boundary inside the shared block
+ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class SharedCatalog:
+    """
+    A processed catalog published once into a single shared, memory-mapped
+    block. The loader process writes the block; worker processes map it
+    read-only and get a frame whose columns are views of the mapping, so the
+    rows exist once on the machine however many workers serve them. Columns
+    are stored as flat arrays (see src.columnar), and the lookup indexes can
+    be published alongside so workers do not rebuild them either.
+    """
+
+    def __init__(self, block_path: str, manifest: Dict, owner: bool = False, untrusted: Optional[str] = None):
+        self.block_path = block_path
+        self.manifest = manifest
+        self.owner = owner
+        # Why the indexes must not be unpickled, if the manifest or block could be another user's
+        self.untrusted = untrusted
+        self._mapping = None
+
+    @property
+    def dataset_version(self) -> Optional[str]:
+        return self.manifest.get('dataset_version')
+
+    @classmethod
+    def publish(cls, frame: pd.DataFrame, manifest_path: str,
+                dataset_version: Optional[str] = None, indexes=None) -> 'SharedCatalog':
+        """
+        Write a frame, and optionally an object holding its indexes, into a
+        new shared block plus the manifest workers attach with.
+        """
+        specs, arrays = encode_frame(frame)
+
+        # (layout, array) pairs in block order; each layout gets its offset below
+        segments = []
+        for spec in specs:
+            spec['arrays'] = {}
+            for part, values in arrays[spec['name']].items():
+                spec['arrays'][part] = {'dtype': values.dtype.str, 'length': len(values)}
+                segments.append((spec['arrays'][part], values))
+
+        index_layout = None
+        if indexes is not None:
+            header, buffers = encode_objects(indexes)
+            index_layout = {
+                'header': {'dtype': '|u1', 'length': len(header)},
+                'buffers': [{'dtype': '|u1', 'length': len(buffer)} for buffer in buffers]
+            }
+            segments.append((index_layout['header'], np.frombuffer(header, dtype=np.uint8)))
+            segments.extend(zip(index_layout['buffers'], buffers))
+
+        size = 0
+        for layout, values in segments:
+            size = _aligned(size)
+            layout['offset'] = size
+            size += values.nbytes
+
+        block_dir = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir()
+        fd, block_path = tempfile.mkstemp(prefix="earthquake_catalog.", suffix=".bin", dir=block_dir)
+        with os.fdopen(fd, 'wb') as f:
+            for layout, values in segments:
+                f.seek(layout['offset'])
+                f.write(np.ascontiguousarray(values).tobytes())
+            f.truncate(max(size, 1))
+
+        manifest = {
+            'block': block_path,
+            'size': size,
+            'rows': len(frame),
+            'dataset_version': dataset_version,
+            'columns': specs,
+            'indexes': index_layout
+        }
+        # Write then rename so a worker never reads a partial manifest
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        # Only this user may write it, whatever the umask, or workers will not trust its indexes
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, manifest_path)
+        print(f"Published {len(frame)} earthquake records ({size} bytes) to {block_path}")
+        return cls(block_path, manifest, owner=True)
+
+    @classmethod
+    def attach(cls, manifest_path: str) -> 'SharedCatalog':
+        """Attach to a catalog published by another process."""
+        with open(manifest_path) as f:
+            untrusted = untrusted_reason(f.fileno(), manifest_path)
+            manifest = json.load(f)
+        return cls(manifest['block'], manifest, untrusted=untrusted)
+
+    def _view(self, layout: Dict) -> np.ndarray:
+        if self._mapping is None:
+            with open(self.block_path, 'rb') as f:
+                self.untrusted = self.untrusted or untrusted_reason(f.fileno(), self.block_path)
+                self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return np.frombuffer(self._mapping, dtype=layout['dtype'], count=layout['length'], offset=layout['offset'])
+
+    def frame(self) -> pd.DataFrame:
+        """The catalog as a frame over read-only views of the shared block."""
+        arrays = {
+            spec['name']: {part: self._view(layout) for part, layout in spec['arrays'].items()}
+            for spec in self.manifest['columns']
+        }
+        return decode_frame(self.manifest['columns'], arrays)
+
+    def indexes(self):
+        """
+        The published index object, its arrays viewing the shared block, or
+        None if none was published. The index header is unpickled, so this is
+        a trust boundary: anyone who could write the block or the manifest
+        (which places the header) could run code in every worker. Raises
+        PermissionError unless both belong to this user and nobody else can
+        write them.
+        """
+        layout = self.manifest.get('indexes')
+        if not layout:
+            return None
+        header = self._view(layout['header'])
+        if self.untrusted:
+            raise PermissionError(f"Not unpickling the shared indexes: {self.untrusted}")
+        return decode_objects(header.tobytes(),
+                              [self._view(buffer) for buffer in layout['buffers']])
+
+    def unlink(self):
+        """
+        Remove the block; only the publishing process does this. Workers that
+        already mapped it keep their mapping until they exit.
+        """
+        if self.owner and os.path.exists(self.block_path):
+            os.remove(self.block_path)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve_shared_catalog(manifest_path: Optional[str] = None):
+    """
+    Loader entry point: load and preprocess the catalog, publish it, and keep
+    the block alive until interrupted. Workers started with MANIFEST_ENV set
+    to the printed manifest path attach instead of loading.
+    """
+    from src.data_processor import DataProcessor
+
+    data_processor = DataProcessor()
+    manifest_path = os.path.abspath(manifest_path or os.path.join(data_processor.cache_dir, MANIFEST_FILENAME))
+    catalog = data_processor.publish_shared_catalog(manifest_path)
+    if catalog is None:
+        return
+
+    print(f"Serving shared catalog; start workers with {MANIFEST_ENV}={manifest_path}")
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        catalog.unlink()
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+
+if __name__ == "__main__":
+    serve_shared_catalog()
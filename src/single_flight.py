@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# Default number of memoized results kept per cache
+DEFAULT_MAX_ENTRIES = 256
+
+
+class SingleFlightCache:
+    """
+    Thread-safe LRU memo where concurrent callers asking for the same key share
+    one computation: the first caller computes, the others wait for its result.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        """Return the memoized result for key, computing it at most once at a time."""
+        while True:
+            with self._lock:
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    return self._results[key]
+
+                done = self._in_flight.get(key)
+                if done is None:
+                    done = self._in_flight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                # Another thread is computing this key; if it failed, retry ourselves
+                done.wait()
+                continue
+
+            try:
+                result = compute()
+                with self._lock:
+                    self._results[key] = result
+                    while len(self._results) > self.max_entries:
+                        self._results.popitem(last=False)
+                return result
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+                done.set()
+
+    def clear(self):
+        """Forget every memoized result."""
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,131 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Mean Earth radius used to convert haversine distances to kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+# Rebuild the tree once the points scanned beside it exceed this share of it
+REBUILD_RATIO = 0.1
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points, all in degrees."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Nearest-neighbour index over event epicentres using great-circle distance.
+    Uses scikit-learn's BallTree with the haversine metric when available and
+    falls back to a vectorized numpy scan otherwise. Query results are row
+    positions into the indexed frame, ordered by distance.
+
+    Points added by inserted() after the tree was built are scanned linearly
+    alongside it until they outgrow REBUILD_RATIO of the tree.
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        self.positions = np.flatnonzero(valid).astype(np.int64)
+        self.lats = lats[valid]
+        self.lons = lons[valid]
+        self.tree = None
+        # The tree covers the first tree_size points; the rest are scanned
+        self.tree_size = 0
+
+        if len(self.positions):
+            try:
+                from sklearn.neighbors import BallTree
+
+                self.tree = BallTree(np.radians(np.column_stack([self.lats, self.lons])), metric='haversine')
+                self.tree_size = len(self.positions)
+            except ImportError:
+                print("scikit-learn is not installed, spatial queries use a linear scan")
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def inserted(self, lats: np.ndarray, lons: np.ndarray, kept: np.ndarray,
+                 positions: np.ndarray) -> 'SpatialIndex':
+        """
+        The index of a frame made by inserting rows into the indexed one, where
+        old row i moved to kept[i] and the inserted rows, with the coordinates
+        given, sit at positions. The tree is shared with this index unless the
+        scanned points would outgrow REBUILD_RATIO of it.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        index = SpatialIndex.__new__(SpatialIndex)
+        index.positions = np.concatenate([kept[self.positions], np.asarray(positions, dtype=np.int64)[valid]])
+        index.lats = np.concatenate([self.lats, lats[valid]])
+        index.lons = np.concatenate([self.lons, lons[valid]])
+        index.tree, index.tree_size = self.tree, self.tree_size
+
+        if self.tree is not None and len(index.positions) - self.tree_size > REBUILD_RATIO * self.tree_size:
+            from sklearn.neighbors import BallTree
+
+            index.tree = BallTree(np.radians(np.column_stack([index.lats, index.lons])), metric='haversine')
+            index.tree_size = len(index.positions)
+        return index
+
+    def _scan(self, lat: float, lon: float) -> np.ndarray:
+        """Distances (km) to the points the tree does not cover."""
+        return haversine_km(lat, lon, self.lats[self.tree_size:], self.lons[self.tree_size:])
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Row positions and distances (km) of every event within radius_km, nearest first."""
+        if not len(self.positions):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        indices, distances = np.empty(0, dtype=np.int64), np.empty(0)
+        if self.tree is not None:
+            found, found_distances = self.tree.query_radius(
+                np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM,
+                return_distance=True, sort_results=True
+            )
+            indices, distances = found[0], found_distances[0] * EARTH_RADIUS_KM
+
+        if self.tree_size < len(self.positions):
+            scanned = self._scan(lat, lon)
+            inside = np.flatnonzero(scanned <= radius_km)
+            indices = np.concatenate([indices, self.tree_size + inside])
+            distances = np.concatenate([distances, scanned[inside]])
+            order = np.argsort(distances, kind='stable')
+            indices, distances = indices[order], distances[order]
+        return self.positions[indices], distances
+
+    def nearest(self, lat: float, lon: float, k: int,
+                max_distance_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row positions and distances (km) of the k events nearest to a point,
+        optionally limited to those within max_distance_km.
+        """
+        k = min(int(k), len(self.positions))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        indices, distances = np.empty(0, dtype=np.int64), np.empty(0)
+        if self.tree is not None:
+            found_distances, found = self.tree.query(np.radians([[lat, lon]]), k=min(k, self.tree_size))
+            indices, distances = found[0], found_distances[0] * EARTH_RADIUS_KM
+
+        if self.tree_size < len(self.positions):
+            scanned = self._scan(lat, lon)
+            nearest = np.argpartition(scanned, min(k, len(scanned)) - 1)[:k]
+            indices = np.concatenate([indices, self.tree_size + nearest])
+            distances = np.concatenate([distances, scanned[nearest]])
+            order = np.argsort(distances, kind='stable')[:k]
+            indices, distances = indices[order], distances[order]
+
+        if max_distance_km is not None:
+            keep = distances <= max_distance_km
+            indices, distances = indices[keep], distances[keep]
+        return self.positions[indices], distances
@@ -0,0 +1,169 @@
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.aggregate_cube import aggregate_cells, merge_cells, month_keys
+from src.compact_schema import REDUNDANT_COLUMNS, compact_frame
+
+# Rows read per chunk; the raw rows in memory during ingest scale with this, not with the file size
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Values are counted on a grid of this many steps per unit to find medians without
+# holding a column in memory. Catalog magnitudes and depths are reported to far
+# coarser precision, so the median is exact.
+MEDIAN_STEPS_PER_UNIT = 10_000
+
+# Derived columns that are integers unless a chunk has rows without a time
+INTEGER_DATE_COLUMNS = ['year', 'month', 'day']
+
+
+class StreamingMedian:
+    """Median of a column seen chunk by chunk, from counts of quantized values."""
+
+    def __init__(self, steps_per_unit: int = MEDIAN_STEPS_PER_UNIT):
+        self.steps_per_unit = steps_per_unit
+        self.counts = pd.Series(dtype=np.int64)
+
+    def add(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().to_numpy(dtype=np.float64)
+        if not len(values):
+            return
+        quantized = pd.Series(np.round(values * self.steps_per_unit).astype(np.int64)).value_counts()
+        self.counts = self.counts.add(quantized, fill_value=0).astype(np.int64)
+
+    def median(self) -> float:
+        """Median of every value added, like Series.median; NaN if there were none."""
+        total = int(self.counts.sum())
+        if not total:
+            return np.nan
+        counts = self.counts.sort_index()
+        cumulative = counts.cumsum().to_numpy()
+        keys = counts.index.to_numpy()
+        lower = keys[np.searchsorted(cumulative, (total + 1) // 2)]
+        upper = keys[np.searchsorted(cumulative, total // 2 + 1)]
+        return (lower + upper) / 2 / self.steps_per_unit
+
+
+def _unify_dtype(current: Optional[str], chunk_dtype) -> str:
+    """Widest dtype a CSV column takes across chunks: object > float > int > bool."""
+    kind = 'object' if chunk_dtype == object else (
+        'float64' if pd.api.types.is_float_dtype(chunk_dtype) else (
+            'int64' if pd.api.types.is_integer_dtype(chunk_dtype) else (
+                'bool' if pd.api.types.is_bool_dtype(chunk_dtype) else 'object')))
+    rank = ['bool', 'int64', 'float64', 'object']
+    if current is None:
+        return kind
+    if 'bool' in (current, kind) and current != kind:
+        return 'object'
+    return max(current, kind, key=rank.index)
+
+
+def scan_csv(path: str, median_columns: List[str],
+             chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    First ingest pass: the dtype every column must be read with so all chunks
+    agree, and the medians of the given columns.
+    """
+    dtypes: Dict[str, str] = {}
+    medians = {column: StreamingMedian() for column in median_columns}
+
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        for column in chunk.columns:
+            dtypes[column] = _unify_dtype(dtypes.get(column), chunk[column].dtype)
+        for column, median in medians.items():
+            if column in chunk.columns:
+                median.add(chunk[column])
+
+    return dtypes, {column: median.median() for column, median in medians.items()}
+
+
+def _arrow_schema(frame: pd.DataFrame):
+    """Parquet schema for every chunk: strings stay strings and date parts may be null."""
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    for i, field in enumerate(schema):
+        if frame[field.name].dtype == object:
+            schema = schema.set(i, pa.field(field.name, pa.string()))
+        elif field.name in INTEGER_DATE_COLUMNS:
+            schema = schema.set(i, pa.field(field.name, pa.float64()))
+        elif pd.api.types.is_datetime64_any_dtype(frame[field.name]):
+            schema = schema.set(i, pa.field(field.name, pa.timestamp('ns', tz=str(frame[field.name].dt.tz or 'UTC'))))
+    return schema
+
+
+def ingest_csv(path: str, store_path: str, dtypes: Dict[str, str],
+               preprocess_chunk: Callable[[pd.DataFrame], pd.DataFrame],
+               chunk_rows: int = DEFAULT_CHUNK_ROWS,
+               cube_dtype: str = 'float64') -> Tuple[int, Optional[pd.DataFrame]]:
+    """
+    Second ingest pass: read the CSV chunk by chunk, preprocess each chunk on
+    its own, append it to a Parquet file and fold it into aggregate-cube cells
+    keyed by country name. Returns the number of rows written and the cells.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    schema = None
+    cells = None
+    rows_written = 0
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype=dtypes):
+            processed = preprocess_chunk(chunk)
+            if processed.empty:
+                continue
+
+            if writer is None:
+                schema = _arrow_schema(processed)
+                writer = pq.ParquetWriter(store_path, schema)
+            writer.write_table(pa.Table.from_pandas(processed, schema=schema, preserve_index=False))
+            rows_written += len(processed)
+
+            times = processed['time']
+            if times.dt.tz is not None:
+                times = times.dt.tz_convert(None)
+            chunk_cells = aggregate_cells(
+                month_keys(times.to_numpy(dtype='datetime64[ns]').view(np.int64)),
+                processed['country'].to_numpy(dtype=object),
+                processed['mag'].to_numpy(dtype=cube_dtype),
+                processed['depth'].to_numpy(dtype=cube_dtype)
+            )
+            cells = chunk_cells if cells is None else merge_cells([cells, chunk_cells])
+            print(f"Ingested {rows_written} earthquake records")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows_written, cells
+
+
+def sorted_columns(store_path: str, compact_schema: bool = False) -> Iterator[pd.Series]:
+    """
+    Third ingest pass: the ingested rows sorted by time (rows without a time
+    last), one column at a time and compacted like compact_frame when
+    compact_schema is set. Only the time column's sort order and the column
+    being yielded are in memory. Integer date parts are restored where no
+    time is missing.
+    """
+    import pyarrow.parquet as pq
+
+    store = pq.ParquetFile(store_path)
+    times = store.read(columns=['time']).column('time').to_pandas()
+    order = times.sort_values(kind='stable', na_position='last').index.to_numpy()
+    del times
+
+    for name in store.schema_arrow.names:
+        if compact_schema and name in REDUNDANT_COLUMNS:
+            continue
+        column = store.read(columns=[name]).column(name).to_pandas().take(order).reset_index(drop=True)
+        column.name = name
+        if name in INTEGER_DATE_COLUMNS and column.notna().all():
+            column = column.astype(np.int32)
+        if compact_schema:
+            column = compact_frame(column.to_frame())[name]
+        yield column
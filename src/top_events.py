@@ -0,0 +1,142 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Year code for rows without a time; never matched by a year filter
+NO_YEAR = -1
+
+# Rebuild the orderings once the inserted events kept beside them exceed this share of them
+REBUILD_RATIO = 0.1
+
+
+def top_k_positions(positions: np.ndarray, mags: np.ndarray, k: int) -> np.ndarray:
+    """
+    The k positions with the largest magnitude, largest first (ties in row
+    order), selected with argpartition so only the k winners are sorted.
+    Positions with a missing magnitude are ignored.
+    """
+    positions = np.asarray(positions)
+    values = mags[positions]
+    keep = ~np.isnan(values)
+    positions, values = positions[keep], values[keep]
+
+    if k < len(positions):
+        winners = np.argpartition(-values, k - 1)[:k]
+        # Pull in every row tied with the k-th magnitude so ties resolve by row order
+        threshold = values[winners].min()
+        winners = np.flatnonzero(values >= threshold)
+        positions, values = positions[winners], values[winners]
+
+    order = np.lexsort((positions, -values))[:k]
+    return positions[order]
+
+
+class TopEventIndex:
+    """
+    Magnitude-ordered event positions, overall and within every
+    (country, year) group, so "largest events" queries never sort the catalog.
+    Events added by inserted() are kept unordered beside the orderings and
+    joined to each query's candidates until they outgrow REBUILD_RATIO.
+    """
+
+    def __init__(self, mags: np.ndarray, country_codes: np.ndarray, years: pd.Series):
+        self.mags = np.asarray(mags, dtype=np.float64)
+        years = pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(dtype=np.float64)
+        self.years = np.where(np.isnan(years), NO_YEAR, years).astype(np.int32)
+        self.codes = np.asarray(country_codes, dtype=np.int32)
+
+        rated = np.flatnonzero(~np.isnan(self.mags))
+        # All rated events, largest first; stable so ties keep row order
+        self.order = rated[np.argsort(-self.mags[rated], kind='stable')]
+
+        # The same events grouped by (country, year), largest first within each group
+        self.group_order = rated[np.lexsort((-self.mags[rated], self.years[rated], self.codes[rated]))]
+        group_codes = self.codes[self.group_order]
+        group_years = self.years[self.group_order]
+        boundaries = np.flatnonzero((np.diff(group_codes) != 0) | (np.diff(group_years) != 0)) + 1
+        self.group_starts = np.concatenate([[0], boundaries]).astype(np.int64)
+        self.group_ends = np.concatenate([boundaries, [len(self.group_order)]]).astype(np.int64)
+        self.group_codes = group_codes[self.group_starts]
+        self.group_years = group_years[self.group_starts]
+        # Rated events not in the orderings, in row order
+        self.extra = np.empty(0, dtype=np.int64)
+
+    def inserted(self, mags: np.ndarray, country_codes: np.ndarray, years: pd.Series,
+                 code_map: np.ndarray, kept: np.ndarray, positions: np.ndarray) -> 'TopEventIndex':
+        """
+        The index of a frame made by inserting rows into the indexed one, where
+        old row i moved to kept[i] and the inserted rows sit at positions. The
+        magnitudes, country codes and years are those of the whole new frame;
+        code_map takes this index's codes to the new ones. The orderings are
+        shifted rather than sorted again until the inserted events outgrow
+        REBUILD_RATIO of them.
+        """
+        mags = np.asarray(mags, dtype=np.float64)
+        rated = positions[~np.isnan(mags[positions])]
+        extra = np.sort(np.concatenate([kept[self.extra], rated]))
+        if len(extra) > REBUILD_RATIO * len(self.order):
+            return TopEventIndex(mags, country_codes, years)
+
+        index = TopEventIndex.__new__(TopEventIndex)
+        index.mags = mags
+        years = pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(dtype=np.float64)
+        index.years = np.where(np.isnan(years), NO_YEAR, years).astype(np.int32)
+        index.codes = np.asarray(country_codes, dtype=np.int32)
+        # Insertion keeps row order, so the shifted orderings stay sorted
+        index.order = kept[self.order]
+        index.group_order = kept[self.group_order]
+        index.group_starts, index.group_ends = self.group_starts, self.group_ends
+        index.group_codes = code_map[self.group_codes]
+        index.group_years = self.group_years
+        index.extra = extra
+        return index
+
+    def top(self, k: int, codes: Optional[np.ndarray] = None,
+            year_lo: Optional[int] = None, year_hi: Optional[int] = None,
+            min_mag: Optional[float] = None) -> np.ndarray:
+        """
+        Row positions of the k largest events, optionally restricted to a set
+        of country codes, an inclusive year range and a minimum magnitude.
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        if codes is None and year_lo is None and year_hi is None:
+            positions = self.order[:k]
+            if len(self.extra):
+                positions = top_k_positions(np.concatenate([positions, self.extra]), self.mags, k)
+        else:
+            # The overall top k is among the top k of each matching group
+            selected = np.ones(len(self.group_starts), dtype=bool)
+            if codes is not None:
+                selected &= np.isin(self.group_codes, codes)
+            if year_lo is not None or year_hi is not None:
+                selected &= self.group_years != NO_YEAR
+            if year_lo is not None:
+                selected &= self.group_years >= year_lo
+            if year_hi is not None:
+                selected &= self.group_years <= year_hi
+
+            starts = self.group_starts[selected]
+            lengths = np.minimum(self.group_ends[selected] - starts, k)
+            offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            candidates = self.group_order[np.repeat(starts, lengths) + offsets]
+
+            if len(self.extra):
+                matching = np.ones(len(self.extra), dtype=bool)
+                if codes is not None:
+                    matching &= np.isin(self.codes[self.extra], codes)
+                extra_years = self.years[self.extra]
+                if year_lo is not None or year_hi is not None:
+                    matching &= extra_years != NO_YEAR
+                if year_lo is not None:
+                    matching &= extra_years >= year_lo
+                if year_hi is not None:
+                    matching &= extra_years <= year_hi
+                candidates = np.concatenate([candidates, self.extra[matching]])
+            positions = top_k_positions(candidates, self.mags, k)
+
+        if min_mag is not None:
+            positions = positions[self.mags[positions] >= min_mag]
+        return positions
@@ -1,62 +1,144 @@
 #!/usr/bin/env python3
 """
 Test script to verify the earthquake data visualization app.
+
+Runs on the real catalog when it is in the working directory and on a small
+synthetic one otherwise.
 """
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+import plotly
+import pytest
+from dash import Patch, no_update
+
+import globals
+from callbacks import content_switch, country_focus_callbacks, map_callbacks, riskmap_callbacks
+from components.global_map_section import get_global_map
+from components.loading_section import get_loading_section
+from components.scatter_section import get_scatter_section
+from src.data_processor import DATASET_FILENAME, DataProcessor
+from test_data_processor import make_catalog, write_catalog
+from visualizations.plots.placeholder import create_loading_figure
+from visualizations.plots.time_series import create_time_series_plot
+from visualizations.plots.world_map import create_global_earthquake_map
+
+
+def load_data_processor() -> DataProcessor:
+    if os.path.exists(DATASET_FILENAME):
+        return DataProcessor()
+    return DataProcessor(write_catalog(tempfile.mkdtemp(), make_catalog(400, seed=4)), use_cache=False)
+
+
+@pytest.fixture(scope='module')
+def data_processor():
+    return load_data_processor()
 
-from src.data_processor import DataProcessor
-from src.visualizations import create_global_earthquake_map, create_time_series_plot
 
-def test_data_loading():
+def test_data_loading(data_processor):
     """Test if data loads correctly."""
     print("Testing data loading...")
-    
-    # Initialize data processor
-    data_processor = DataProcessor()
-    
-    # Check if data was loaded
-    if data_processor.processed_data is not None and not data_processor.processed_data.empty:
-        print(f"✅ Successfully loaded {len(data_processor.processed_data)} earthquake records")
-        print(f"Date range: {data_processor.processed_data['time'].min()} to {data_processor.processed_data['time'].max()}")
-        print(f"Magnitude range: {data_processor.processed_data['mag'].min():.1f} to {data_processor.processed_data['mag'].max():.1f}")
-        print(f"Countries found: {len(data_processor.get_countries())}")
-        return True
-    else:
-        print("❌ Failed to load earthquake data")
-        return False
+    data = data_processor.processed_data
+    assert data is not None and not data.empty, "Failed to load earthquake data"
+    print(f"✅ Successfully loaded {len(data)} earthquake records")
+    print(f"Date range: {data['time'].min()} to {data['time'].max()}")
+    print(f"Magnitude range: {data['mag'].min():.1f} to {data['mag'].max():.1f}")
+    print(f"Countries found: {len(data_processor.get_countries())}")
+    assert data_processor.get_countries()
+
 
-def test_visualizations():
+def test_visualizations(data_processor):
     """Test if visualizations can be created."""
     print("\nTesting visualizations...")
-    
-    data_processor = DataProcessor()
-    
-    try:
-        # Test global map
-        fig = create_global_earthquake_map(data_processor)
-        print("✅ Global earthquake map created successfully")
-        
-        # Test time series
-        fig = create_time_series_plot(data_processor)
-        print("✅ Time series plot created successfully")
-        
-        return True
-    except Exception as e:
-        print(f"❌ Visualization test failed: {e}")
-        return False
+    fig = create_global_earthquake_map(data_processor)
+    assert fig["data"]
+    print("✅ Global earthquake map created successfully")
+
+    fig = create_time_series_plot(data_processor)
+    assert fig["data"]
+    print("✅ Time series plot created successfully")
+
+
+def _render(component) -> str:
+    return json.dumps(component, cls=plotly.utils.PlotlyJSONEncoder)
+
+
+def _switch(monkeypatch, processor, trigger, active_view):
+    """Run the main-content callback as if trigger fired, with processor as the loaded dataset (None while loading)."""
+    monkeypatch.setattr(globals, 'data_loader', None)
+    monkeypatch.setattr(globals, 'data_processor', processor)
+    triggered = [{'prop_id': f"{trigger}.n_clicks", 'value': 1}] if trigger else []
+    monkeypatch.setattr(content_switch, 'callback_context', SimpleNamespace(triggered=triggered))
+    return content_switch.update_main_content(*[None] * len(globals.button_ids), False, active_view)
+
+
+def test_content_switch_readiness(monkeypatch, data_processor):
+    """The default view on first load, loading placeholders, and their rebuild once the dataset is ready."""
+    # Initial call, before any input fired
+    content, view = _switch(monkeypatch, None, None, None)
+    assert _render(content) == _render(get_global_map())
+    assert view == {'view': 'btn-map', 'placeholder': True}
+
+    # The poll's own initial call renders the default view instead of leaving the page empty
+    content, view = _switch(monkeypatch, None, 'dataset-status-poll', None)
+    assert _render(content) == _render(get_global_map())
+    assert view['view'] == 'btn-map'
+
+    # A data-backed view chosen while loading shows the loading section
+    content, view = _switch(monkeypatch, None, 'btn-scatter', None)
+    assert _render(content) == _render(get_loading_section())
+    assert view == {'view': 'btn-scatter', 'placeholder': True}
+
+    # Once loading finishes the poll rebuilds it with data
+    content, view = _switch(monkeypatch, data_processor, 'dataset-status-poll', view)
+    assert _render(content) == _render(get_scatter_section(data_processor))
+    assert view == {'view': 'btn-scatter', 'placeholder': False}
+
+    # A view built with data is left alone
+    assert _switch(monkeypatch, data_processor, 'dataset-status-poll', view) == (no_update, no_update)
+
+
+@pytest.mark.parametrize('module,update,inputs,trigger', [
+    (map_callbacks, map_callbacks.update_map, [2001], 'year-slider'),
+    (riskmap_callbacks, riskmap_callbacks.update_risk_map, [['fault']], 'toggle-faultlines'),
+    (country_focus_callbacks, country_focus_callbacks.update_country_focus_map, ['Chile', 'single', 2001, None],
+     'year-mode-toggle'),
+])
+def test_map_callbacks_patch_only_full_figures(monkeypatch, data_processor, module, update, inputs, trigger):
+    """A later trigger patches a full figure, but replaces the loading figure or an empty graph in full."""
+    monkeypatch.setattr(globals, 'data_loader', None)
+    monkeypatch.setattr(globals, 'data_processor', data_processor)
+    monkeypatch.setattr(module, 'ctx', SimpleNamespace(triggered_id=trigger,
+                                                       triggered_prop_ids={f"{trigger}.value": trigger}))
+    full = update(*inputs, None)
+    assert not isinstance(full, Patch) and full['data']
+    assert not isinstance(update(*inputs, create_loading_figure().to_dict()), Patch)
+    assert isinstance(update(*inputs, full), Patch)
+
+    # While loading the loading figure is shown whatever the trigger
+    monkeypatch.setattr(globals, 'data_processor', None)
+    assert update(*inputs, full)['layout']['annotations']
+
 
 def main():
     """Run all tests."""
     print("🌍 Earthquake Data Visualization - Test Suite")
     print("=" * 50)
-    
-    # Test data loading
-    data_ok = test_data_loading()
-    
-    # Test visualizations
-    viz_ok = test_visualizations()
-    
+
+    data_processor = load_data_processor()
+    results = []
+    for test in (test_data_loading, test_visualizations):
+        try:
+            test(data_processor)
+            results.append(True)
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            results.append(False)
+
     print("\n" + "=" * 50)
-    if data_ok and viz_ok:
+    if all(results):
         print("🎉 All tests passed! The app should work correctly.")
         print("\nTo run the app:")
         print("python app.py")
@@ -65,4 +147,4 @@ def main():
         print("❌ Some tests failed. Please check the errors above.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,97 @@
+"""
+Tests for appending events to a loaded catalog against rebuilding it from
+the combined rows.
+"""
+import threading
+
+import pandas as pd
+import pytest
+
+from src.data_processor import DataProcessor
+from test_data_processor import assert_same_time_series, make_catalog, write_catalog
+from test_dataset_loader import loaded, wait_for
+
+
+@pytest.mark.parametrize('compact_schema', [False, True])
+@pytest.mark.parametrize('new_rows', [20, 200])
+def test_appended_matches_rebuilt_catalog(tmp_path, compact_schema, new_rows):
+    # No missing magnitudes or depths, so the fill medians cannot differ between the two
+    base = make_catalog(500, seed=2, missing_values=False)
+    extra = make_catalog(new_rows, seed=3, missing_values=False, id_prefix='new')
+    # A country the catalog has not seen, times equal to existing ones and an ID already present
+    extra.loc[:4, 'Place'] = [f"{i} km E of Islet{i}, Atlantis" for i in range(5)]
+    extra.loc[6:9, 'Time'] = base.loc[20:23, 'Time'].to_numpy()
+    extra.loc[10, 'ID'] = base.loc[0, 'ID']
+
+    original = DataProcessor(write_catalog(tmp_path / 'base', base), use_cache=False, compact_schema=compact_schema)
+    rows_before = len(original.processed_data)
+    appended = original.appended(extra)
+    rebuilt = DataProcessor(write_catalog(tmp_path / 'all', pd.concat([base, extra], ignore_index=True)),
+                            use_cache=False, compact_schema=compact_schema)
+
+    # The original snapshot is left as it was
+    assert len(original.processed_data) == rows_before
+    assert 'Atlantis' not in original.get_countries()
+    assert appended.dataset_version != original.dataset_version
+
+    pd.testing.assert_frame_equal(appended.processed_data, rebuilt.processed_data)
+    assert appended.get_countries() == rebuilt.get_countries()
+    assert appended.metadata.years == rebuilt.metadata.years
+    assert appended.metadata.countries_between(2000, 2001) == rebuilt.metadata.countries_between(2000, 2001)
+    assert appended.metadata.countries_in_year(2002) == rebuilt.metadata.countries_in_year(2002)
+    # The cube, remapped to the new country codes
+    for country in [None] + rebuilt.get_countries():
+        assert_same_time_series(appended.get_time_series_data(country=country),
+                                rebuilt.get_time_series_data(country=country))
+    pd.testing.assert_frame_equal(appended.get_risk_map_data(), rebuilt.get_risk_map_data())
+    for args in [(15,), (5, '2001-01-01', '2001-12-31 23:59:59.999999999', None, 'Chile'), (8, '2000-05-01', '2001-05-01')]:
+        assert appended.get_top_events(*args)['ID'].tolist() == rebuilt.get_top_events(*args)['ID'].tolist()
+    ids = [extra.loc[3, 'ID'], base.loc[0, 'ID'], base.loc[7, 'ID'], 'missing']
+    assert appended.get_events(ids)['ID'].tolist() == rebuilt.get_events(ids)['ID'].tolist()
+    assert appended.get_event(base.loc[0, 'ID'])['time'] == rebuilt.get_event(base.loc[0, 'ID'])['time']
+    assert (appended.get_nearest_events(10, 20, 8)['ID'].tolist()
+            == rebuilt.get_nearest_events(10, 20, 8)['ID'].tolist())
+    assert (sorted(appended.get_events_within_radius(-20, -70, 1500)['ID'])
+            == sorted(rebuilt.get_events_within_radius(-20, -70, 1500)['ID']))
+
+
+def test_append_racing_a_reload_is_not_lost(tmp_path, monkeypatch):
+    catalog = make_catalog(300, seed=18, missing_values=False)
+    extra = make_catalog(10, seed=19, missing_values=False, id_prefix='new')
+    data_path = write_catalog(tmp_path, catalog)
+    loader = loaded(data_path)
+
+    # Hold the first append inside appended() until a reload has been published
+    building, release = threading.Event(), threading.Event()
+    bases = []
+    appended = DataProcessor.appended
+
+    def held(processor, new_rows):
+        bases.append(processor)
+        if len(bases) == 1:
+            building.set()
+            release.wait(10)
+        return appended(processor, new_rows)
+
+    monkeypatch.setattr(DataProcessor, 'appended', held)
+    added = []
+    appender = threading.Thread(target=lambda: added.append(loader.append_events(extra)))
+    appender.start()
+    assert building.wait(10)
+
+    write_catalog(tmp_path, catalog.iloc[:200])
+    assert loader.reload()
+    wait_for(lambda: loader.reloads == 1)
+    reloaded = loader.data_processor
+    release.set()
+    appender.join(10)
+
+    # The append was rebuilt on the reloaded snapshot instead of replacing it
+    assert bases[1] is reloaded
+    current = loader.data_processor
+    assert added == [len(current.processed_data) - len(reloaded.processed_data)] and added[0] > 0
+    assert current.dataset_version == reloaded._appended_version(extra)
+    ids = set(current.processed_data['ID'])
+    assert set(reloaded.processed_data['ID']) <= ids
+    assert {f"new{i:05d}" for i in range(10)} <= ids
+    assert 'ev00250' not in ids
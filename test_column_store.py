@@ -0,0 +1,63 @@
+"""
+Tests for the memory-mapped column store backend.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from src.column_store import INDEX_HEADER, STORE_MANIFEST, convert_csv, read_store_indexes
+from src.data_processor import DataProcessor
+from test_data_processor import assert_same_frame, count_csv_reads, make_catalog, write_catalog
+
+
+@pytest.mark.parametrize('compact_schema', [False, True])
+def test_column_store_round_trip(tmp_path, monkeypatch, compact_schema):
+    data_path = write_catalog(tmp_path, make_catalog(400, seed=10))
+    store_dir = str(tmp_path / 'store')
+    convert_csv(data_path, store_dir, compact_schema=compact_schema)
+    loaded = DataProcessor(data_path, use_cache=False, compact_schema=compact_schema)
+
+    reads = count_csv_reads(monkeypatch)
+    mapped = DataProcessor(column_store=store_dir)
+    assert reads == []
+    assert mapped.source_path == os.path.join(store_dir, STORE_MANIFEST)
+    assert mapped.dataset_version == loaded.dataset_version
+    assert_same_frame(mapped.processed_data, loaded.processed_data)
+    assert not mapped.processed_data['depth'].to_numpy().flags.writeable
+    # The stored indexes are mapped rather than rebuilt
+    assert not mapped.id_index.rows.flags.writeable
+    assert mapped.get_countries() == loaded.get_countries()
+    pd.testing.assert_frame_equal(mapped.get_time_series_data(country='pe'), loaded.get_time_series_data(country='pe'))
+    assert mapped.get_events(['ev00010', 'ev00011'])['ID'].tolist() == ['ev00010', 'ev00011']
+
+
+def test_rewriting_a_store_keeps_mapped_readers(tmp_path):
+    catalog = make_catalog(300, seed=11)
+    store_dir = str(tmp_path / 'store')
+    convert_csv(write_catalog(tmp_path / 'first', catalog), store_dir)
+    first = DataProcessor(column_store=store_dir)
+    expected = first.processed_data['mag'].to_numpy().copy()
+
+    convert_csv(write_catalog(tmp_path / 'second', catalog.iloc[:100]), store_dir)
+    second = DataProcessor(column_store=store_dir)
+    assert len(second.processed_data) < len(first.processed_data)
+    # The first reader's maps still see the files it opened
+    assert (first.processed_data['mag'].to_numpy() == expected).all()
+
+
+def test_stored_indexes_others_could_write_are_not_unpickled(tmp_path):
+    data_path = write_catalog(tmp_path, make_catalog(300, seed=10))
+    store_dir = str(tmp_path / 'store')
+    convert_csv(data_path, store_dir)
+    header_path = os.path.join(store_dir, INDEX_HEADER)
+    assert os.stat(header_path).st_mode & 0o022 == 0
+
+    os.chmod(header_path, 0o664)
+    mapped = DataProcessor(column_store=store_dir)
+    with pytest.raises(PermissionError):
+        read_store_indexes(store_dir, {'indexes': []})
+    # The rows are still mapped; the indexes are rebuilt instead
+    assert not mapped.processed_data['mag'].to_numpy().flags.writeable
+    assert mapped.id_index.rows.flags.writeable
+    assert mapped.get_events(['ev00010'])['ID'].tolist() == ['ev00010']
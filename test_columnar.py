@@ -0,0 +1,101 @@
+"""
+Tests for the flat-array column encoding and the shared-memory catalog
+built on it.
+"""
+import os
+
+import numpy as np
+import pytest
+import pandas as pd
+
+from src.columnar import decode_frame, decode_objects, encode_frame, encode_objects
+from src.data_processor import DataProcessor
+from src.id_index import IdIndex
+from src.shared_catalog import SharedCatalog
+from test_data_processor import assert_same_frame, make_catalog, write_catalog
+
+
+def test_columnar_round_trip():
+    frame = pd.DataFrame({
+        'float': [1.5, np.nan, 3.0, 4.25],
+        'int': np.array([1, 2, 3, 4], dtype=np.int16),
+        'time': pd.to_datetime(['2001-01-01T00:00:00Z', None, '2001-02-03T04:05:06.789Z', '1999-12-31T23:59:59Z'], format='ISO8601'),
+        'naive': pd.to_datetime(['2001-01-01', '2002-01-01', None, '2003-01-01']),
+        'category': pd.Categorical(['Minor', 'Major', None, 'Minor'], categories=['Minor', 'Moderate', 'Major'],
+                                   ordered=True),
+        'repeated': ['us', 'us', None, 'us'],
+        'distinct': ['a, Chile', None, 'ünïcode, Peru', ''],
+        'missing': [None] * 4
+    })
+    specs, arrays = encode_frame(frame)
+    assert {spec['name']: spec['kind'] for spec in specs}['repeated'] == 'dictionary'
+    assert {spec['name']: spec['kind'] for spec in specs}['distinct'] == 'text'
+
+    decoded = decode_frame(specs, arrays)
+    assert list(decoded.columns) == list(frame.columns)
+    for column in ['float', 'int', 'time', 'naive', 'category']:
+        pd.testing.assert_series_equal(decoded[column], frame[column])
+    for column in ['repeated', 'distinct', 'missing']:
+        values = decoded[column].astype(object)
+        assert values.where(values.notna(), None).tolist() == frame[column].tolist()
+    # Columns are views of the encoded arrays, not copies
+    assert np.shares_memory(decoded['float'].to_numpy(), arrays['float']['values'])
+
+
+def test_index_objects_round_trip():
+    ids = pd.Series(['b', 'a', None, 'c', 'a'], dtype=object)
+    header, buffers = encode_objects({'id_index': IdIndex(ids)})
+    index = decode_objects(header, buffers)['id_index']
+    assert index.lookup(['a', 'b', 'c', 'd'], ids).tolist() == [1, 0, 3, -1]
+    assert any(np.shares_memory(index.rows, buffer) for buffer in buffers)
+
+
+def test_shared_catalog_round_trip(tmp_path):
+    loaded = DataProcessor(write_catalog(tmp_path, make_catalog(400, seed=9)), use_cache=False, compact_schema=True)
+    manifest_path = str(tmp_path / 'shared.json')
+    catalog = loaded.publish_shared_catalog(manifest_path)
+    try:
+        attached = DataProcessor(shared_catalog=manifest_path)
+        assert attached.dataset_version == loaded.dataset_version
+        assert_same_frame(attached.processed_data, loaded.processed_data)
+        # Rows and indexes are read-only views of the block, not rebuilt
+        assert not attached.processed_data['mag'].to_numpy().flags.writeable
+        assert not attached.country_index.codes.flags.writeable
+        assert attached.get_countries() == loaded.get_countries()
+        pd.testing.assert_frame_equal(attached.get_risk_map_data(), loaded.get_risk_map_data())
+        assert attached.get_top_events(10)['ID'].tolist() == loaded.get_top_events(10)['ID'].tolist()
+        assert attached.get_nearest_events(0, 0, 5)['ID'].tolist() == loaded.get_nearest_events(0, 0, 5)['ID'].tolist()
+    finally:
+        catalog.unlink()
+    assert not os.path.exists(catalog.block_path)
+
+
+@pytest.mark.parametrize('target', ['manifest', 'block'])
+def test_shared_indexes_others_could_write_are_not_unpickled(tmp_path, target):
+    loaded = DataProcessor(write_catalog(tmp_path, make_catalog(300, seed=9)), use_cache=False)
+    manifest_path = str(tmp_path / 'shared.json')
+    catalog = loaded.publish_shared_catalog(manifest_path)
+    try:
+        os.chmod(manifest_path if target == 'manifest' else catalog.block_path, 0o666)
+        with pytest.raises(PermissionError):
+            SharedCatalog.attach(manifest_path).indexes()
+        # The rows are still served; the indexes are rebuilt instead
+        attached = DataProcessor(shared_catalog=manifest_path)
+        assert_same_frame(attached.processed_data, loaded.processed_data)
+        assert attached.country_index.codes.flags.writeable
+        assert attached.get_countries() == loaded.get_countries()
+    finally:
+        catalog.unlink()
+
+
+@pytest.mark.skipif(not hasattr(os, 'chown') or os.geteuid() != 0, reason="needs root to hand the block to another user")
+def test_shared_indexes_of_another_user_are_not_unpickled(tmp_path):
+    loaded = DataProcessor(write_catalog(tmp_path, make_catalog(300, seed=9)), use_cache=False)
+    manifest_path = str(tmp_path / 'shared.json')
+    catalog = loaded.publish_shared_catalog(manifest_path)
+    try:
+        os.chown(catalog.block_path, 12345, 12345)
+        with pytest.raises(PermissionError, match="another user"):
+            SharedCatalog.attach(manifest_path).indexes()
+    finally:
+        catalog.unlink()
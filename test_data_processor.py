@@ -0,0 +1,306 @@
+"""
+Behaviour tests for DataProcessor's loading and query paths, checked against
+plain pandas over the processed frame (what the original implementation
+computed) on small synthetic catalogs.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.data_processor
+from src.compact_schema import COMPACT_DTYPES, REDUNDANT_COLUMNS
+from src.country_extraction import extract_country
+from src.country_index import CountryIndex
+from src.data_processor import DATASET_FILENAME, DataProcessor
+
+COUNTRIES = ['Chile', 'Japan', 'Peru', 'Indonesia', 'Alaska']
+
+
+def make_catalog(rows: int, seed: int, missing_values: bool = True, id_prefix: str = 'ev') -> pd.DataFrame:
+    """
+    Raw rows with the CSV's columns over 2000-2002. Magnitudes are on a
+    0.1 grid so many tie. Some rows have no time or place; with
+    missing_values some also lack a magnitude or depth.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2000-01-01', tz='UTC') + pd.to_timedelta(rng.integers(0, 3 * 365 * 86400, rows), unit='s')
+    frame = pd.DataFrame({
+        'Time': times.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'Place': [f"{rng.integers(1, 300)} km N of Town{i}, {rng.choice(COUNTRIES)}" for i in range(rows)],
+        'Latitude': rng.uniform(-60, 60, rows).round(4),
+        'Longitude': rng.uniform(-180, 180, rows).round(4),
+        'Depth': rng.uniform(5, 600, rows).round(1),
+        'Mag': rng.choice(np.arange(35, 90) / 10, rows),
+        'MagType': 'mw',
+        'nst': np.nan,
+        'gap': np.nan,
+        'dmin': np.nan,
+        'rms': 1.0,
+        'net': 'us',
+        'ID': [f"{id_prefix}{i:05d}" for i in range(rows)],
+        'updated': '2023-05-01T00:00:00.000Z',
+        'Type': 'earthquake'
+    })
+    frame.loc[::53, 'Time'] = np.nan
+    frame.loc[::61, 'Place'] = np.nan
+    if missing_values:
+        frame.loc[::37, 'Mag'] = np.nan
+        frame.loc[::41, 'Depth'] = np.nan
+        # Out of range, dropped by preprocessing
+        frame.loc[5, 'Latitude'] = 95.0
+    # Events on both edges of a month
+    frame.loc[1, 'Time'] = '2001-02-01T00:00:00.000Z'
+    frame.loc[2, 'Time'] = '2001-02-28T23:59:59.999Z'
+    return frame
+
+
+def write_catalog(directory, frame: pd.DataFrame) -> str:
+    os.makedirs(directory, exist_ok=True)
+    frame.to_csv(os.path.join(directory, DATASET_FILENAME), index=False)
+    return str(directory)
+
+
+def count_csv_reads(monkeypatch) -> list:
+    """Record every pd.read_csv call made from here on; returns the list of calls."""
+    calls = []
+    read_csv = pd.read_csv
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(pd, 'read_csv', counted)
+    return calls
+
+
+def assert_same_frame(actual: pd.DataFrame, expected: pd.DataFrame):
+    """
+    assert_frame_equal where text columns compare by value: readers differ in
+    whether a missing value is None or NaN, and stores may keep text as
+    Arrow-backed strings or dictionary-encoded categoricals.
+    """
+    def text(column):
+        return (column.dtype == object or isinstance(column.dtype, pd.StringDtype)
+                or (isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.dtype == object))
+
+    def normalized(column):
+        return column.astype(object).where(column.notna(), None)
+
+    assert list(actual.columns) == list(expected.columns)
+    for name in expected.columns:
+        if actual[name].dtype != expected[name].dtype and text(actual[name]) and text(expected[name]):
+            pd.testing.assert_series_equal(normalized(actual[name]), normalized(expected[name]))
+        elif expected[name].dtype == object:
+            pd.testing.assert_series_equal(normalized(actual[name]), normalized(expected[name]))
+        else:
+            pd.testing.assert_series_equal(actual[name], expected[name])
+
+
+@pytest.fixture(scope='module')
+def processor(tmp_path_factory):
+    return DataProcessor(write_catalog(tmp_path_factory.mktemp('catalog'), make_catalog(600, seed=1)),
+                         use_cache=False)
+
+
+def select(frame: pd.DataFrame, start_date=None, end_date=None, country=None) -> pd.DataFrame:
+    """Rows in an inclusive date window (naive bounds are UTC) whose country contains a pattern."""
+    if start_date:
+        frame = frame[frame['time'] >= pd.Timestamp(start_date, tz='UTC')]
+    if end_date:
+        frame = frame[frame['time'] <= pd.Timestamp(end_date, tz='UTC')]
+    if country and country != 'all':
+        frame = frame[frame['country'].str.contains(country, case=False, na=False)]
+    return frame
+
+
+@pytest.mark.parametrize('compact_schema', [False, True])
+def test_cache_round_trip(tmp_path, monkeypatch, compact_schema):
+    data_path = write_catalog(tmp_path, make_catalog(300, seed=5))
+    cold = DataProcessor(data_path, compact_schema=compact_schema)
+    assert os.path.exists(cold.cache_path)
+
+    reads = count_csv_reads(monkeypatch)
+    warm = DataProcessor(data_path, compact_schema=compact_schema)
+    assert reads == []
+    assert warm.dataset_version == cold.dataset_version
+    assert_same_frame(warm.processed_data, cold.processed_data)
+
+
+def test_cache_invalidated_by_source_change(tmp_path, monkeypatch):
+    catalog = make_catalog(300, seed=5)
+    data_path = write_catalog(tmp_path, catalog)
+    cold = DataProcessor(data_path)
+
+    write_catalog(tmp_path, catalog.iloc[:-10])
+    reads = count_csv_reads(monkeypatch)
+    changed = DataProcessor(data_path)
+    assert len(reads) == 1
+    assert changed.dataset_version != cold.dataset_version
+    assert len(changed.processed_data) < len(cold.processed_data)
+
+
+def test_cache_invalidated_by_preprocess_version(tmp_path, monkeypatch):
+    data_path = write_catalog(tmp_path, make_catalog(300, seed=5))
+    cold = DataProcessor(data_path)
+
+    monkeypatch.setattr(src.data_processor, 'PREPROCESS_VERSION', src.data_processor.PREPROCESS_VERSION + 1)
+    reads = count_csv_reads(monkeypatch)
+    rebuilt = DataProcessor(data_path)
+    assert len(reads) == 1
+    assert rebuilt.dataset_version != cold.dataset_version
+    assert_same_frame(rebuilt.processed_data, cold.processed_data)
+
+
+def extract_country_per_row(place):
+    """The per-row extraction extract_country replaced."""
+    if not isinstance(place, str):
+        return None
+    if ',' in place:
+        return place.split(',')[-1].strip()
+    place_lower = place.lower()
+    if "assam" in place_lower or "tibet" in place_lower:
+        return "India"
+    elif "ecuador" in place_lower:
+        return "Ecuador"
+    elif "valdivia" in place_lower or "chilean" in place_lower:
+        return "Chile"
+    elif "sumatra" in place_lower or "andaman" in place_lower:
+        return "Indonesia"
+    return None
+
+
+@pytest.mark.parametrize('places', [
+    ["12 km SSW of Ovalle, Chile", "Kuril Islands", " near coast,  Peru ", "a, b, Japan", "trailing comma,",
+     "1960 Valdivia Earthquake", "Great CHILEAN quake", "Sumatra-Andaman Islands", "Tibet earthquake near Assam",
+     "Andaman Sea, then Ecuador", "ecuador and sumatra", "Offshore Valdivia, Sumatra", "", None, np.nan, 7.5],
+    [np.nan, np.nan],
+    [],
+])
+def test_extract_country_matches_per_row(places):
+    # An all-missing column reads as float64
+    series = pd.Series(places, index=np.arange(len(places)) * 3, dtype=None if places else float)
+    actual = extract_country(series)
+    assert actual.index.equals(series.index)
+    assert actual.tolist() == [extract_country_per_row(place) for place in series]
+
+
+@pytest.mark.parametrize('untimed_rows', [True, False])
+def test_compact_schema_keeps_values(tmp_path, untimed_rows):
+    catalog = make_catalog(400, seed=6)
+    if not untimed_rows:
+        catalog = catalog[catalog['Time'].notna()]
+    data_path = write_catalog(tmp_path, catalog)
+    full = DataProcessor(data_path, use_cache=False).processed_data
+    compact_processor = DataProcessor(data_path, use_cache=False, compact_schema=True)
+    compact = compact_processor.processed_data
+
+    assert not set(REDUNDANT_COLUMNS) & set(compact.columns)
+    assert list(compact.columns) == [c for c in full.columns if c not in REDUNDANT_COLUMNS]
+    for column, dtype in COMPACT_DTYPES.items():
+        if untimed_rows and column in ('year', 'month', 'day'):
+            # Rows without a time keep a missing year, month and day
+            dtype = 'float32'
+        assert compact[column].dtype == dtype, column
+    for column in ['mag', 'depth', 'Latitude', 'Longitude', 'year', 'month', 'day']:
+        np.testing.assert_allclose(compact[column].to_numpy(dtype=float), full[column].to_numpy(dtype=float),
+                                   rtol=1e-6)
+    for column in ['country', 'magnitude_category', 'net', 'ID']:
+        assert compact[column].astype(object).where(compact[column].notna(), None).tolist() == \
+            full[column].astype(object).where(full[column].notna(), None).tolist()
+    assert (compact['time'] == full['time']).sum() == full['time'].notna().sum()
+
+    report = compact_processor.memory_report
+    assert list(report.index) == list(full.columns) + ['total']
+    assert (report.loc[REDUNDANT_COLUMNS, 'after_bytes'] == 0).all()
+    assert report.loc['total'].tolist() == report.drop('total').sum().tolist()
+    assert report.loc['total', 'after_bytes'] == compact.memory_usage(index=False, deep=True).sum()
+    assert report.loc['total', 'after_bytes'] < report.loc['total', 'before_bytes']
+
+
+def test_country_index_matches_scan():
+    countries = pd.Series(['Chile', None, 'Peru', 'chile', 'Papua New Guinea', 'Chile', None, 'Japan', ' Peru'] * 7,
+                          dtype=object)
+    index = CountryIndex(countries)
+    for query in ['Chile', 'CHILE', 'pe', 'a', 'Ch.le', '^P', 'nowhere', '(']:
+        try:
+            expected = countries.str.contains(query, case=False, na=False)
+        except Exception:
+            # Not a valid pattern; the index falls back to a literal search
+            expected = countries.str.contains(query, case=False, na=False, regex=False)
+        assert index.rows(query).tolist() == np.flatnonzero(expected).tolist(), query
+    for query in ['chile', ' PERU ', 'Papua New Guinea', 'Pap']:
+        expected = countries.map(lambda name: isinstance(name, str) and name.strip().casefold() == query.strip().casefold())
+        assert index.rows(query, exact=True).tolist() == np.flatnonzero(expected).tolist(), query
+
+
+@pytest.mark.parametrize('country', ['Chile', 'pe', 'nowhere'])
+@pytest.mark.parametrize('start_date,end_date', [(None, None), ('2001-01-15', '2001-09-10')])
+def test_country_filter_matches_scan(processor, country, start_date, end_date):
+    expected = select(processor.processed_data, start_date, end_date, country)
+    actual = processor.get_filtered_data(start_date, end_date, country=country)
+    assert actual['ID'].tolist() == expected['ID'].tolist()
+
+
+def reference_time_series(frame: pd.DataFrame, magnitude_filter='all', start_date=None, end_date=None,
+                          country=None) -> pd.DataFrame:
+    data = select(frame, start_date, end_date, country)
+    if magnitude_filter == 'minor':
+        data = data[data['mag'] < 4.0]
+    elif magnitude_filter == 'moderate':
+        data = data[data['mag'].between(4.0, 5.9)]
+    elif magnitude_filter == 'strong':
+        data = data[data['mag'].between(6.0, 6.9)]
+    elif magnitude_filter == 'major':
+        data = data[data['mag'] >= 7.0]
+    data = data.assign(year_month=data['time'].dt.tz_localize(None).dt.to_period('M'))
+    series = data.groupby('year_month').agg({'ID': 'count', 'mag': ['mean', 'max'], 'depth': 'mean'}).reset_index()
+    series.columns = ['year_month', 'count', 'avg_magnitude', 'max_magnitude', 'avg_depth']
+    return series
+
+
+def assert_same_time_series(actual: pd.DataFrame, expected: pd.DataFrame):
+    if expected.empty:
+        assert actual.empty
+        return
+    assert actual['year_month'].astype(str).tolist() == expected['year_month'].astype(str).tolist()
+    assert actual['count'].tolist() == expected['count'].tolist()
+    for column in ['avg_magnitude', 'max_magnitude', 'avg_depth']:
+        np.testing.assert_allclose(actual[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-9)
+
+
+WINDOWS = [
+    (None, None),
+    # Whole months only: answered from the cube
+    ('2001-01-01', '2001-03-31 23:59:59.999999999'),
+    # Partial months at both edges
+    ('2001-01-15', '2001-03-10'),
+    # Starts on a month boundary, ends inside a month
+    ('2001-02-01', '2001-04-17 06:00'),
+    # Inside one month
+    ('2001-02-03 12:00', '2001-02-20'),
+    ('2000-06-10', None),
+    (None, '2001-11-05 08:00'),
+]
+
+
+@pytest.mark.parametrize('start_date,end_date', WINDOWS)
+@pytest.mark.parametrize('country', [None, 'Chile', 'pe'])
+@pytest.mark.parametrize('magnitude_filter', ['all', 'minor', 'strong', 'major'])
+def test_time_series_matches_pandas(processor, start_date, end_date, country, magnitude_filter):
+    actual = processor._compute_time_series_data(magnitude_filter, start_date, end_date, country)
+    expected = reference_time_series(processor.processed_data, magnitude_filter, start_date, end_date, country)
+    assert_same_time_series(actual, expected)
+
+
+@pytest.mark.parametrize('metric', ['count', 'avg_magnitude', 'max_magnitude'])
+def test_risk_map_matches_pandas(processor, metric):
+    expected = processor.processed_data.groupby('country').agg({'ID': 'count', 'mag': ['mean', 'max']}).reset_index()
+    expected.columns = ['country', 'count', 'avg_magnitude', 'max_magnitude']
+    actual = processor.get_risk_map_data(metric)
+    assert actual['country'].tolist() == expected['country'].tolist()
+    assert actual['count'].tolist() == expected['count'].tolist()
+    np.testing.assert_allclose(actual['value'].to_numpy(dtype=float), expected[metric].to_numpy(dtype=float),
+                               rtol=1e-9)
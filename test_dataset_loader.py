@@ -0,0 +1,140 @@
+"""
+Tests for DatasetLoader: background loading and readiness, hot reload, and
+one loader reloading for the processes following it.
+"""
+import os
+import threading
+import time
+
+import globals
+import src.dataset_loader
+from src.dataset_loader import FAILED, LOADING, READY, DatasetLoader
+from test_data_processor import make_catalog, write_catalog
+
+
+def wait_for(condition, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def loaded(data_path: str) -> DatasetLoader:
+    loader = DatasetLoader(data_path=data_path, use_cache=False).start()
+    assert loader.wait(30) is not None
+    return loader
+
+
+def test_background_load_gates_readiness(tmp_path, monkeypatch):
+    data_path = write_catalog(tmp_path, make_catalog(200, seed=14))
+    # Hold the load until released, to observe the loading state
+    release = threading.Event()
+    processor_class = src.dataset_loader.DataProcessor
+
+    def held(*args, **kwargs):
+        release.wait(10)
+        return processor_class(*args, **kwargs)
+
+    monkeypatch.setattr(src.dataset_loader, 'DataProcessor', held)
+    loader = DatasetLoader(data_path=data_path, use_cache=False)
+    monkeypatch.setattr(globals, 'data_loader', loader)
+
+    loader.start()
+    assert loader.status()['state'] == LOADING
+    assert loader.wait(0.05) is None
+    assert globals.get_data_processor() is None
+    # Starting again while loading is a no-op
+    assert loader.start().reload() is False
+
+    release.set()
+    processor = globals.get_data_processor(timeout=30)
+    assert processor is not None
+    status = loader.status()
+    assert (status['state'], status['records'], status['error']) == (READY, len(processor.processed_data), None)
+    assert status['dataset_version'] == processor.dataset_version
+
+
+def test_failed_load_releases_waiters(tmp_path, monkeypatch):
+    def failing(*args, **kwargs):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(src.dataset_loader, 'DataProcessor', failing)
+    loader = DatasetLoader(data_path=str(tmp_path)).start()
+    assert loader.wait(30) is None
+    status = loader.status()
+    assert (status['state'], status['error']) == (FAILED, "disk on fire")
+
+
+def test_reload_swaps_snapshots(tmp_path):
+    catalog = make_catalog(300, seed=15)
+    data_path = write_catalog(tmp_path, catalog)
+    loader = loaded(data_path)
+    published = []
+    loader.on_publish(lambda old, new: published.append((old, new)))
+    old = loader.data_processor
+    rows = len(old.processed_data)
+
+    write_catalog(tmp_path, catalog.iloc[:150])
+    assert loader.reload()
+    wait_for(lambda: loader.reloads == 1)
+    new = loader.data_processor
+    assert published == [(old, new)]
+    assert new.dataset_version != old.dataset_version
+    assert len(new.processed_data) < rows
+    # A request still holding the old snapshot keeps its rows
+    assert len(old.processed_data) == rows
+
+    # A reload finding no rows keeps serving the current snapshot
+    write_catalog(tmp_path, catalog.iloc[:0])
+    assert loader.reload()
+    wait_for(lambda: not loader.status()['reloading'] and loader.error is not None)
+    assert loader.data_processor is new
+    assert loader.status()['state'] == READY
+
+
+def test_watch_reloads_once_the_source_settles(tmp_path):
+    catalog = make_catalog(300, seed=16)
+    data_path = write_catalog(tmp_path, catalog)
+    loader = loaded(data_path)
+    loader.watch(0.05)
+    time.sleep(0.2)
+    assert loader.reloads == 0
+
+    write_catalog(tmp_path, catalog.iloc[:200])
+    wait_for(lambda: loader.reloads == 1)
+    assert len(loader.data_processor.processed_data) < 300
+
+
+def test_followers_attach_to_republished_snapshots(tmp_path):
+    catalog = make_catalog(300, seed=17)
+    data_path = write_catalog(tmp_path, catalog)
+    manifest_path = str(tmp_path / 'reloaded.json')
+    request_path = str(tmp_path / 'reload_request')
+
+    # The publishing process, and a follower that starts from the same snapshot (as a forked worker would)
+    master = loaded(data_path)
+    master.republish(manifest_path)
+    master.watch(0.05, request_path=request_path)
+    follower = loaded(data_path)
+    follower.follow(manifest_path, request_path, 0.05)
+    # Nothing is republished until a reload
+    assert not os.path.exists(manifest_path)
+
+    write_catalog(tmp_path, catalog.iloc[:200])
+    wait_for(lambda: master.reloads == 1)
+    wait_for(lambda: follower.data_processor.dataset_version == master.data_processor.dataset_version)
+    first_block = master._republished.block_path
+    assert follower.data_processor.shared_catalog.block_path == first_block
+    assert len(follower.data_processor.processed_data) == len(master.data_processor.processed_data)
+
+    # A follower's reload request is carried out by the master, once
+    assert follower.request_reload()
+    wait_for(lambda: master.reloads == 2)
+    wait_for(lambda: follower.data_processor.shared_catalog.block_path == master._republished.block_path)
+    assert not os.path.exists(first_block)
+    # The follower does not republish
+    assert follower._republished is None
+
+    master.unpublish()
+    assert not os.path.exists(manifest_path)
+    assert not os.path.exists(follower.data_processor.shared_catalog.block_path)
@@ -0,0 +1,109 @@
+"""
+Tests for the figure cache: LRU eviction under the byte budget, per-version
+eviction, disk persistence and the decorated builders' cache keys.
+"""
+import inspect
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from visualizations import figure_cache as figure_cache_module
+from visualizations.figure_cache import FigureCache, cached_figure
+from visualizations.plots.time_series import create_time_series_plot
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_lru_eviction_under_byte_budget():
+    cache = FigureCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    # Reading a makes b the least recently used
+    assert cache.get('a') == b'1234'
+    cache.put('c', b'1234')
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    assert cache.get('c') == b'1234'
+
+    # Larger than the whole budget: never stored, nothing evicted for it
+    cache.put('huge', b'x' * 11)
+    assert cache.get('huge') is None
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 8, 1)
+    assert (stats['hits'], stats['misses']) == (3, 2)
+
+
+def test_evict_version(tmp_path):
+    cache = FigureCache(cache_dir=str(tmp_path))
+    cache.put('old-1', b'1', 'v1')
+    cache.put('old-2', b'2', 'v1')
+    cache.put('new', b'3', 'v2')
+    assert cache.evict_version('v1') == 2
+    assert cache.get('old-1', 'v1') is None
+    assert cache.get('new', 'v2') == b'3'
+    assert not (tmp_path / 'v1').exists()
+
+
+def test_disk_layer_survives_restart(tmp_path):
+    FigureCache(cache_dir=str(tmp_path)).put('key', b'figure', 'v1')
+    restarted = FigureCache(cache_dir=str(tmp_path))
+    assert restarted.get('key', 'v1') == b'figure'
+    # Files live under their dataset version
+    assert FigureCache(cache_dir=str(tmp_path)).get('key', 'v2') is None
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = FigureCache()
+    monkeypatch.setattr(figure_cache_module, 'figure_cache', cache)
+    return cache
+
+
+def test_cached_builder_keys(fresh_cache):
+    calls = []
+
+    @cached_figure
+    def build(data_processor, start_date=None, bands=()):
+        calls.append((start_date, bands))
+        return go.Figure(go.Scatter(x=[1, 2], y=[3, 4]))
+
+    v1 = SimpleNamespace(dataset_version='v1')
+    first = build(v1, pd.Timestamp('2001-01-01'), bands=[1, 2])
+    # Equal after normalization: a datetime and the same Timestamp, a tuple and the same list
+    build(v1, datetime(2001, 1, 1), (1, 2))
+    assert len(calls) == 1
+    assert first['data'][0]['y'] == [3, 4]
+
+    # Callers get their own copy
+    first['data'][0]['y'].append(5)
+    assert build(v1, pd.Timestamp('2001-01-01'), bands=[1, 2])['data'][0]['y'] == [3, 4]
+
+    build(v1, '2001-01-02', bands=[1, 2])
+    build(SimpleNamespace(dataset_version='v2'), pd.Timestamp('2001-01-01'), bands=[1, 2])
+    assert len(calls) == 3
+
+
+def test_decorated_builders_are_annotated_as_returning_dicts():
+    assert inspect.signature(create_time_series_plot).return_annotation is dict
+    assert create_time_series_plot.__annotations__['return'] is dict
+    assert inspect.signature(create_time_series_plot.uncached).return_annotation is go.Figure
+
+
+def test_app_configures_the_cache_from_the_environment(tmp_path):
+    script = ("import json, app; from visualizations.figure_cache import figure_cache; "
+              "print(json.dumps([figure_cache.cache_dir, figure_cache.max_bytes]))")
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': ROOT, 'EARTHQUAKE_FIGURE_CACHE_DIR': str(tmp_path / 'figures'),
+             'EARTHQUAKE_FIGURE_CACHE_MB': '8'}
+    ).stdout
+    # The dataset loader prints too, possibly after the settings
+    settings = next(line for line in output.splitlines() if line.startswith('['))
+    assert json.loads(settings) == [str(tmp_path / 'figures'), 8 * 2 ** 20]
@@ -0,0 +1,98 @@
+"""
+Tests for the production entry point: the health endpoints and gunicorn
+serving a small catalog.
+"""
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import globals
+from app import app
+from src.dataset_loader import DatasetLoader
+from test_data_processor import make_catalog, write_catalog
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_json(url: str):
+    """Status code and JSON body of a GET, including error responses."""
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def gunicorn(directory, **environment):
+    """Run gunicorn with the repository's config in directory; yields the base URL."""
+    port = free_port()
+    log = open(os.path.join(directory, 'gunicorn.log'), 'w')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), '--chdir', str(directory),
+         '--pythonpath', ROOT, '-b', f'127.0.0.1:{port}', 'wsgi:server'],
+        env={**os.environ, 'WEB_CONCURRENCY': '2', 'EARTHQUAKE_THREADS': '2', **environment},
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.terminate()
+        server.wait(30)
+        log.close()
+
+
+def wait_ready(base_url: str, timeout: float = 60, consecutive: int = 8):
+    """Poll /readyz until it answers 200 several times in a row, so every worker is ready; the last status."""
+    deadline = time.monotonic() + timeout
+    ready, status = 0, None
+    while time.monotonic() < deadline and ready < consecutive:
+        try:
+            code, status = get_json(f'{base_url}/readyz')
+        except (urllib.error.URLError, ConnectionError):
+            code = None
+        ready = ready + 1 if code == 200 else 0
+        time.sleep(0.1)
+    assert ready >= consecutive, f"not ready: {status}"
+    return status
+
+
+def test_health_endpoints(tmp_path, monkeypatch):
+    client = app.server.test_client()
+    loader = DatasetLoader(data_path=write_catalog(tmp_path, make_catalog(200, seed=12)), use_cache=False)
+    monkeypatch.setattr(globals, 'data_loader', loader)
+
+    # Before loading starts: alive but not ready
+    assert client.get('/healthz').status_code == 200
+    assert client.get('/readyz').status_code == 503
+
+    loader.start().wait(30)
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.json['records'] == len(loader.data_processor.processed_data)
+    assert client.get('/healthz').json['dataset']['state'] == 'ready'
+
+
+@pytest.mark.parametrize('preload', ['1', '0'])
+def test_gunicorn_serves_catalog(tmp_path, preload):
+    write_catalog(tmp_path, make_catalog(300, seed=13))
+    # Without preloading each worker loads the catalog itself after the fork
+    with gunicorn(tmp_path, EARTHQUAKE_PRELOAD=preload) as base_url:
+        status = wait_ready(base_url)
+        assert status['records'] > 0
+        code, health = get_json(f'{base_url}/healthz')
+        assert code == 200 and health['status'] == 'ok'
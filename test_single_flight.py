@@ -0,0 +1,90 @@
+"""
+Tests for SingleFlightCache under concurrency and the time-series memo
+built on it.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.single_flight import SingleFlightCache
+from src.data_processor import DataProcessor
+from test_data_processor import make_catalog, write_catalog
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = SingleFlightCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        started.set()
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(cache.get_or_compute, 'key', compute) for _ in range(8)]
+        assert started.wait(5)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_waiters_retry_after_a_failed_computation():
+    cache = SingleFlightCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            raise RuntimeError("first computation fails")
+        return 'value'
+
+    with ThreadPoolExecutor(4) as pool:
+        owner = pool.submit(cache.get_or_compute, 'key', compute)
+        assert started.wait(5)
+        waiters = [pool.submit(cache.get_or_compute, 'key', compute) for _ in range(3)]
+        release.set()
+        with pytest.raises(RuntimeError):
+            owner.result(5)
+        assert [waiter.result(5) for waiter in waiters] == ['value'] * 3
+
+    # One failure, then one computation shared by the waiters
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = SingleFlightCache(max_entries=2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: None)
+    cache.get_or_compute('c', lambda: 3)
+    assert cache.get_or_compute('a', lambda: 'recomputed') == 1
+    assert cache.get_or_compute('b', lambda: 'recomputed') == 'recomputed'
+
+
+def test_time_series_memo(tmp_path, monkeypatch):
+    processor = DataProcessor(write_catalog(tmp_path, make_catalog(300, seed=7)), use_cache=False)
+    calls = []
+    compute = processor._compute_time_series_data
+
+    def counted(*args):
+        calls.append(args)
+        return compute(*args)
+
+    monkeypatch.setattr(processor, '_compute_time_series_data', counted)
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda _: processor.get_time_series_data('strong', '2001-01-01', None, 'Chile'),
+                                range(6)))
+    assert len(calls) == 1
+
+    # The count and magnitude plots each get their own copy
+    results[0]['count'] = 0
+    assert processor.get_time_series_data('strong', '2001-01-01', None, 'Chile').equals(results[1])
+    assert len(calls) == 1
@@ -0,0 +1,95 @@
+"""
+Tests for the haversine spatial index against a brute-force scan.
+"""
+import builtins
+import math
+
+import numpy as np
+import pytest
+
+from src.spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+QUERIES = [(0.0, 0.0), (-33.4, -70.6), (35.7, 139.7), (89.0, 10.0), (-10.0, 179.9), (5.0, -179.5)]
+
+
+def brute_force_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    distances = []
+    for other_lat, other_lon in zip(lats, lons):
+        phi1, phi2 = math.radians(lat), math.radians(other_lat)
+        a = (math.sin((phi2 - phi1) / 2) ** 2
+             + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(other_lon - lon) / 2) ** 2)
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return np.array(distances)
+
+
+def make_points(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(-90, 90, count)
+    lons = rng.uniform(-180, 180, count)
+    lats[::17] = np.nan
+    return lats, lons
+
+
+@pytest.fixture(params=['tree', 'scan'])
+def build_index(request, monkeypatch):
+    if request.param == 'scan':
+        import_module = builtins.__import__
+
+        def without_sklearn(name, *args, **kwargs):
+            if name.startswith('sklearn'):
+                raise ImportError(name)
+            return import_module(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, '__import__', without_sklearn)
+    return SpatialIndex
+
+
+def assert_matches_brute_force(index: SpatialIndex, lats: np.ndarray, lons: np.ndarray):
+    valid = ~np.isnan(lats)
+    for lat, lon in QUERIES:
+        distances = np.full(len(lats), np.inf)
+        distances[valid] = brute_force_km(lat, lon, lats[valid], lons[valid])
+
+        for radius in (0.0, 500.0, 3000.0):
+            positions, found = index.within_radius(lat, lon, radius)
+            expected = np.flatnonzero(distances <= radius)
+            assert sorted(positions.tolist()) == expected.tolist()
+            np.testing.assert_allclose(found, distances[positions], rtol=1e-9, atol=1e-6)
+            assert np.all(np.diff(found) >= 0)
+
+        for k in (1, 7, 1000):
+            positions, found = index.nearest(lat, lon, k)
+            expected = np.sort(distances[valid])[:k]
+            np.testing.assert_allclose(found, expected, rtol=1e-9, atol=1e-6)
+            np.testing.assert_allclose(distances[positions], found, rtol=1e-9, atol=1e-6)
+
+        positions, found = index.nearest(lat, lon, 50, max_distance_km=2000)
+        assert np.all(found <= 2000)
+        assert len(positions) == min(50, int((distances <= 2000).sum()))
+
+
+def test_queries_match_brute_force(build_index):
+    lats, lons = make_points(400, seed=0)
+    index = build_index(lats, lons)
+    assert len(index) == int((~np.isnan(lats)).sum())
+    assert_matches_brute_force(index, lats, lons)
+
+
+@pytest.mark.parametrize('added', [10, 200])
+def test_inserted_points_match_brute_force(build_index, added):
+    lats, lons = make_points(400, seed=1)
+    new_lats, new_lons = make_points(added, seed=2)
+    positions = np.sort(np.random.default_rng(3).choice(len(lats) + added, added, replace=False))
+    kept = np.delete(np.arange(len(lats) + added), positions)
+
+    all_lats, all_lons = np.empty(len(lats) + added), np.empty(len(lats) + added)
+    all_lats[kept], all_lons[kept] = lats, lons
+    all_lats[positions], all_lons[positions] = new_lats, new_lons
+    assert_matches_brute_force(build_index(lats, lons).inserted(new_lats, new_lons, kept, positions),
+                               all_lats, all_lons)
+
+
+def test_empty_index():
+    index = SpatialIndex(np.array([np.nan]), np.array([np.nan]))
+    assert index.within_radius(0, 0, 100)[0].tolist() == []
+    assert index.nearest(0, 0, 5)[0].tolist() == []
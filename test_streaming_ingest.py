@@ -0,0 +1,40 @@
+"""
+Tests for the chunked streaming ingest against the in-memory load of the
+same catalog.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_processor import DataProcessor
+from test_data_processor import assert_same_frame, count_csv_reads, make_catalog, write_catalog
+
+
+@pytest.mark.parametrize('compact_schema', [False, True])
+def test_streamed_catalog_matches_in_memory_load(tmp_path, monkeypatch, compact_schema):
+    # Missing magnitudes and depths too, so the whole-file medians must be used in every chunk
+    data_path = write_catalog(tmp_path, make_catalog(700, seed=8))
+    loaded = DataProcessor(data_path, use_cache=False, compact_schema=compact_schema)
+    streamed = DataProcessor(data_path, compact_schema=compact_schema, streaming=True, chunk_rows=64)
+
+    assert_same_frame(streamed.processed_data, loaded.processed_data)
+    assert streamed.get_countries() == loaded.get_countries()
+    # Cube sums may round differently, having been added chunk by chunk
+    pd.testing.assert_frame_equal(streamed.get_risk_map_data(), loaded.get_risk_map_data())
+    pd.testing.assert_frame_equal(streamed.get_time_series_data(country='Chile'),
+                                  loaded.get_time_series_data(country='Chile'))
+    assert (streamed.get_top_events(20, '2001-01-01', '2001-12-31 23:59:59.999999999')['ID'].tolist()
+            == loaded.get_top_events(20, '2001-01-01', '2001-12-31 23:59:59.999999999')['ID'].tolist())
+    assert (streamed.get_nearest_events(0, 0, 10)['ID'].tolist()
+            == loaded.get_nearest_events(0, 0, 10)['ID'].tolist())
+
+    # The rows are served from a memory-mapped store, not held in memory
+    assert not streamed.processed_data['mag'].to_numpy().flags.writeable
+
+    # A warm start maps the store, with its indexes, without reading the CSV
+    reads = count_csv_reads(monkeypatch)
+    warm = DataProcessor(data_path, compact_schema=compact_schema, streaming=True, chunk_rows=64)
+    assert reads == []
+    assert warm.dataset_version == streamed.dataset_version
+    assert_same_frame(warm.processed_data, streamed.processed_data)
+    np.testing.assert_array_equal(warm.country_index.codes, streamed.country_index.codes)
@@ -0,0 +1,47 @@
+"""
+Tests for largest-event queries against a stable sort of the matching rows,
+with tie-heavy magnitudes so row order decides between equal events.
+"""
+import numpy as np
+import pytest
+
+from src.data_processor import DataProcessor
+from src.top_events import top_k_positions
+from test_data_processor import make_catalog, select, write_catalog
+
+
+@pytest.fixture(scope='module')
+def processor(tmp_path_factory):
+    return DataProcessor(write_catalog(tmp_path_factory.mktemp('catalog'), make_catalog(600, seed=1)),
+                         use_cache=False)
+
+
+def test_top_k_positions_breaks_ties_by_row_order():
+    rng = np.random.default_rng(0)
+    mags = rng.choice([5.0, 5.5, 6.0, np.nan], 200)
+    positions = rng.permutation(200)[:150]
+    rated = [p for p in positions if not np.isnan(mags[p])]
+    for k in (1, 5, 37, 150, 300):
+        expected = sorted(rated, key=lambda p: (-mags[p], p))[:k]
+        assert top_k_positions(positions, mags, k).tolist() == expected
+
+
+@pytest.mark.parametrize('start_date,end_date,magnitude_range,country', [
+    (None, None, None, None),
+    # Whole years: answered from the per-(country, year) index
+    ('2001-01-01', '2001-12-31 23:59:59.999999999', None, None),
+    ('2000-01-01', '2001-12-31 23:59:59.999999999', None, 'Chile'),
+    ('2000-01-01', '2002-12-31 23:59:59.999999999', None, 'pe'),
+    # Partial years and magnitude ranges select rows first
+    ('2001-03-05', '2002-02-10', None, 'pe'),
+    (None, None, (5.0, 6.5), None),
+    ('2000-01-01', '2001-12-31 23:59:59.999999999', (6.0, 9.0), 'Japan'),
+])
+@pytest.mark.parametrize('k', [1, 12, 1000])
+def test_top_events_match_stable_sort(processor, start_date, end_date, magnitude_range, country, k):
+    expected = select(processor.processed_data, start_date, end_date, country)
+    if magnitude_range:
+        expected = expected[expected['mag'].between(*magnitude_range)]
+    expected = expected.sort_values('mag', ascending=False, kind='stable').head(k)
+    actual = processor.get_top_events(k, start_date, end_date, magnitude_range, country)
+    assert actual['ID'].tolist() == expected['ID'].tolist()
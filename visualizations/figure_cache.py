@@ -0,0 +1,222 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+
+# Default memory budget for serialized figures
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_argument(value):
+    """Turn a builder argument into a JSON-stable value for the cache key."""
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [normalize_argument(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): normalize_argument(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    return value
+
+
+class FigureCache:
+    """
+    LRU cache of serialized plotly figures under a byte budget, optionally
+    persisted to a directory so warm views survive a restart. Entries may be
+    tagged with the dataset version they were built from, so every entry of
+    a replaced dataset can be evicted at once.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, cache_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_bytes: Optional[int] = None, cache_dir: Optional[str] = None):
+        """Change the memory budget or enable disk persistence."""
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if cache_dir is not None:
+                self.cache_dir = cache_dir
+            self._evict()
+
+    def _version_dir(self, version: Optional[str]) -> str:
+        # Entries of each dataset version share a directory so they can be removed together
+        return os.path.join(self.cache_dir, str(version)) if version is not None else self.cache_dir
+
+    def _disk_path(self, key: str, version: Optional[str] = None) -> str:
+        return os.path.join(self._version_dir(version), hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            key, payload = self._entries.popitem(last=False)
+            self._versions.pop(key, None)
+            self._bytes -= len(payload)
+            self.evictions += 1
+
+    def _store(self, key: str, payload: bytes, version: Optional[str] = None):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._versions[key] = version
+            self._bytes += len(payload)
+            self._evict()
+
+    def get(self, key: str, version: Optional[str] = None) -> Optional[bytes]:
+        """Serialized figure for key from memory or disk, or None on a miss."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key, version), 'rb') as f:
+                    payload = f.read()
+            except FileNotFoundError:
+                payload = None
+            except Exception as e:
+                print(f"Error reading figure cache: {e}")
+                payload = None
+            if payload is not None:
+                self._store(key, payload, version)
+                with self._lock:
+                    self.hits += 1
+                return payload
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, payload: bytes, version: Optional[str] = None):
+        """Store a serialized figure in memory and, if enabled, on disk."""
+        self._store(key, payload, version)
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self._version_dir(version), exist_ok=True)
+                path = self._disk_path(key, version)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                print(f"Error writing figure cache: {e}")
+
+    def evict_version(self, version: str) -> int:
+        """Drop every entry built from a dataset version, in memory and on disk; returns the count."""
+        with self._lock:
+            stale = [key for key, entry_version in self._versions.items() if entry_version == version]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key))
+                del self._versions[key]
+            self.evictions += len(stale)
+
+        if self.cache_dir and version is not None:
+            shutil.rmtree(self._version_dir(version), ignore_errors=True)
+        return len(stale)
+
+    def clear(self):
+        """Drop every in-memory entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+# Shared by every decorated builder in visualizations/plots
+figure_cache = FigureCache()
+
+
+def figure_cache_key(name: str, arguments: Dict, dataset_version) -> str:
+    """Cache key of a builder call: builder name, normalized arguments and dataset version."""
+    return json.dumps([name, normalize_argument(arguments), dataset_version], sort_keys=True, default=str)
+
+
+def _cached_builder(builder, serialize, return_type=None):
+    """
+    Cache the serialized result of a builder taking the data processor as its
+    first argument. The wrapper returns the deserialized result, annotated as
+    return_type when that differs from what the builder returns.
+    """
+    signature = inspect.signature(builder)
+
+    @functools.wraps(builder)
+    def wrapper(data_processor, *args, **kwargs):
+        bound = signature.bind(data_processor, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(list(bound.arguments.items())[1:])
+        version = getattr(data_processor, 'dataset_version', None)
+        key = figure_cache_key(builder.__qualname__, arguments, version)
+
+        payload = figure_cache.get(key, version)
+        if payload is None:
+            payload = serialize(builder(data_processor, *args, **kwargs)).encode()
+            figure_cache.put(key, payload, version)
+        return json.loads(payload)
+
+    wrapper.uncached = builder
+    if return_type is not None:
+        # What callers get back, not what the builder itself returns
+        wrapper.__annotations__ = {**builder.__annotations__, 'return': return_type}
+        wrapper.__signature__ = signature.replace(return_annotation=return_type)
+    return wrapper
+
+
+def cached_figure(builder: Callable[..., go.Figure]) -> Callable[..., dict]:
+    """
+    Cache a figure builder taking the data processor as its first argument.
+    The decorated builder returns the figure as a plotly JSON dict, not a
+    go.Figure: dcc.Graph accepts the dict directly, and rebuilding a
+    go.Figure would validate every trace again. Each call gets its own copy.
+    """
+    return _cached_builder(builder, lambda figure: pio.to_json(figure, validate=False), dict)
+
+
+def cached_data(builder: Callable) -> Callable:
+    """
+    Like cached_figure for builders returning plain data (e.g. the trace
+    arrays of a partial update); arrays come back as lists.
+    """
+    return _cached_builder(builder, to_json_plotly)
@@ -1,51 +1,229 @@
 import os
-import requests
 import json 
+import hashlib
+import threading
+import numpy as np
 from shapely.geometry import shape
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Country boundaries vendored from Natural Earth 1:110m admin-0 countries (public domain),
+# with feature names following the johan/world.geo.json naming used by country_centroids.json
+WORLD_GEOJSON_PATH = os.path.join(DATA_DIR, "world_countries.geojson")
+
+# Precomputed { country_name: [lat, lon] }, regenerated with build_country_centroids()
+CENTROIDS_PATH = os.path.join(DATA_DIR, "country_centroids.json")
+
+# SHA-256 of the world GeoJSON the centroids were computed from. Content, not
+# mtimes, decides staleness: git does not preserve mtimes, so a fresh clone
+# would otherwise look out of date.
+CENTROIDS_SOURCE_PATH = os.path.join(DATA_DIR, "country_centroids.sha256")
+
+# Process-wide parsed geometry, shared by every map render
+_geometry_cache = {}
+_geometry_lock = threading.RLock()
+
+def _cached(key, build):
+    """Return the cached value for key, building it once under a lock."""
+    value = _geometry_cache.get(key)
+    if value is None:
+        with _geometry_lock:
+            value = _geometry_cache.get(key)
+            if value is None:
+                value = build()
+                if value is not None:
+                    _geometry_cache[key] = value
+    return value
+
 def get_world_geojson():
-    """Get world GeoJSON data for country boundaries."""
-    try:
-        url = 'https://raw.githubusercontent.com/johan/world.geo.json/master/countries.geo.json'
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error fetching GeoJSON: {e}")
-        return None
+    """Get world GeoJSON data for country boundaries, parsed once per process."""
+    return _cached('world', lambda: _load_geojson(WORLD_GEOJSON_PATH, "world GeoJSON"))
+
+def get_world_outline() -> tuple:
+    """
+    Pre-flattened lon/lat arrays of every country's exterior ring, NaN-separated,
+    built once from the world GeoJSON. Returns (None, None) if it is unavailable.
+    """
+    def build():
+        geojson = get_world_geojson()
+        if not geojson:
+            return None
+        lons, lats = flatten_polygon_rings(geojson)
+        lons.setflags(write=False)
+        lats.setflags(write=False)
+        return lons, lats
+
+    return _cached('world_outline', build) or (None, None)
+
+def flatten_polygon_rings(geojson) -> tuple:
+    """
+    Flatten the exterior ring of every Polygon/MultiPolygon feature into one
+    pair of lon/lat arrays, with NaN separating the rings, so all outlines can
+    be drawn as a single trace.
+    """
+    rings = []
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            rings.append(geometry['coordinates'][0])
+        elif geometry['type'] == 'MultiPolygon':
+            rings.extend(polygon[0] for polygon in geometry['coordinates'])
+
+    if not rings:
+        return np.empty(0), np.empty(0)
+
+    separator = np.array([[np.nan, np.nan]])
+    coords = np.concatenate([part for ring in rings
+                             for part in (np.asarray(ring, dtype=float)[:, :2], separator)])
+    return coords[:, 0], coords[:, 1]
+
+def flatten_line_strings(geojson, group_by: str = None) -> dict:
+    """
+    Flatten every LineString / MultiLineString part into NaN-separated lon/lat
+    arrays, grouped by the given feature property (a single '' group otherwise).
+    Returns { group: (lons, lats) }.
+    """
+    groups = {}
+    for feature in geojson['features']:
+        geometry = feature['geometry']
+        if not geometry:
+            continue
+        if geometry['type'] == 'LineString':
+            lines = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiLineString':
+            lines = geometry['coordinates']
+        else:
+            continue
+        group = (feature.get('properties') or {}).get(group_by) or '' if group_by else ''
+        groups.setdefault(group, []).extend(lines)
+
+    separator = np.array([[np.nan, np.nan]])
+    flattened = {}
+    for group, lines in groups.items():
+        coords = np.concatenate([part for line in lines
+                                 for part in (np.asarray(line, dtype=float)[:, :2], separator)])
+        flattened[group] = (coords[:, 0], coords[:, 1])
+    return flattened
 
 # Fault line data sourced from the United States Geological Survey (USGS):
 # https://github.com/fraxen/tectonicplates (Public domain)
-def get_fault_lines_geojson(path: str = "data/fault_lines.geojson"): 
+FAULT_LINES_PATH = os.path.join(DATA_DIR, "fault_lines.geojson")
+
+def _load_geojson(path, label):
     try:
         with open(path, 'r') as f:
             return json.load(f)
     except Exception as e:
-        print(f"Error loading fault lines: {e}")
+        print(f"Error loading {label}: {e}")
         return None
 
-def get_all_country_centroids() -> dict:
+def get_fault_lines_geojson(path: str = FAULT_LINES_PATH):
+    """Get the plate boundary GeoJSON, parsed once per process."""
+    return _cached(('fault_lines', path), lambda: _load_geojson(path, "fault lines"))
+
+def get_fault_line_segments(path: str = FAULT_LINES_PATH) -> dict:
     """
-    Returns a dictionary of { country_name: (lat, lon) } using the world GeoJSON.
+    Pre-flattened fault lines grouped by plate boundary type
+    ({ type: (lons, lats) }, '' for untyped boundaries), built once per process.
+    """
+    def build():
+        geojson = get_fault_lines_geojson(path)
+        if not geojson:
+            return None
+        segments = flatten_line_strings(geojson, group_by='Type')
+        for lons, lats in segments.values():
+            lons.setflags(write=False)
+            lats.setflags(write=False)
+        return segments
+
+    return _cached(('fault_line_segments', path), build) or {}
+
+def compute_country_centroids(geojson, names=None) -> dict:
+    """
+    Compute { country_name: (lat, lon) } centroids with shapely, optionally
+    only for the given names. Pure computation, nothing is written to disk.
     """
-    geojson = get_world_geojson()
     centroids = {}
 
     for feature in geojson['features']:
         country_name = feature['properties'].get('name')
         geometry = feature['geometry']
-        if country_name and geometry:
+        if country_name and geometry and (names is None or country_name in names):
             try:
                 geom_shape = shape(geometry)
                 centroid = geom_shape.centroid
                 centroids[country_name] = (centroid.y, centroid.x)  # lat, lon
             except Exception as e:
                 print(f"Failed to get centroid for {country_name}: {e}")
-    
-    os.makedirs("data", exist_ok=True)
-    
-    # Save once for future fast use
-    with open("data/country_centroids.json", "w") as f:
+
+    return centroids
+
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _centroids_are_current() -> bool:
+    """True if the centroid file was computed from the current world GeoJSON."""
+    if not os.path.exists(WORLD_GEOJSON_PATH):
+        return True
+    try:
+        with open(CENTROIDS_SOURCE_PATH, 'r') as f:
+            return f.read().strip() == _file_sha256(WORLD_GEOJSON_PATH)
+    except OSError:
+        return False
+
+def _load_country_centroids():
+    geojson = get_world_geojson()
+
+    # A centroid file computed from other boundaries is ignored
+    centroids = {}
+    try:
+        if _centroids_are_current():
+            with open(CENTROIDS_PATH, 'r') as f:
+                centroids = {name: tuple(latlon) for name, latlon in json.load(f).items()}
+        else:
+            print("Country centroids do not match the world GeoJSON, recomputing in memory")
+    except Exception as e:
+        print(f"Error loading country centroids: {e}")
+
+    if geojson:
+        missing = {feature['properties'].get('name') for feature in geojson['features']} - set(centroids)
+        missing.discard(None)
+        if missing:
+            centroids.update(compute_country_centroids(geojson, missing))
+
+    return centroids
+
+def get_all_country_centroids() -> dict:
+    """
+    Returns a dictionary of { country_name: (lat, lon) }, loaded once per process
+    from data/country_centroids.json. Countries missing from the file are
+    computed from the world GeoJSON in memory; the file itself is only written
+    by build_country_centroids().
+    """
+    return _cached('centroids', _load_country_centroids)
+
+def build_country_centroids(path: str = None) -> dict:
+    """Recompute every country centroid from the world GeoJSON and save them to disk."""
+    path = path or CENTROIDS_PATH
+    geojson = get_world_geojson()
+    if not geojson:
+        return {}
+
+    centroids = compute_country_centroids(geojson)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
         json.dump(centroids, f)
-        
+    os.replace(tmp_path, path)
+    if path == CENTROIDS_PATH:
+        with open(CENTROIDS_SOURCE_PATH, "w") as f:
+            f.write(_file_sha256(WORLD_GEOJSON_PATH) + "\n")
+    print(f"Wrote {len(centroids)} country centroids to {path}")
+
+    with _geometry_lock:
+        _geometry_cache.pop('centroids', None)
     return centroids
+
+if __name__ == "__main__":
+    build_country_centroids()
@@ -1,9 +1,47 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from dash import Patch
 from typing import Optional, Tuple
 from src.country_centers import get_country_center , get_country_zoom
+from ..figure_cache import cached_figure
 
+# Largest marker diameter in pixels, as px.scatter_mapbox's size_max
+FOCUS_SIZE_MAX = 20
+
+def _country_data(data_processor, country, start_date, end_date):
+    return data_processor.get_filtered_view(
+        start_date=start_date,
+        end_date=end_date,
+        country=country
+    )
+
+def _empty_annotations(country, country_data) -> list:
+    if not country_data.empty:
+        return []
+    return [dict(
+        text=f"No earthquake data available for {country} in the selected range. ",
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color="gray")
+    )]
+
+def country_focus_trace_data(country_data) -> dict:
+    """Data arrays of the epicentre trace, the only part that depends on the date range."""
+    mags = country_data['mag'].to_numpy(dtype=np.float64)
+    max_mag = mags.max() if len(mags) else 1.0
+    return dict(
+        lat=country_data['Latitude'].to_numpy(),
+        lon=country_data['Longitude'].to_numpy(),
+        hovertext=country_data['Place'].to_numpy(),
+        customdata=np.column_stack([country_data['time'].to_numpy(dtype=object), mags]),
+        marker_size=mags,
+        marker_color=country_data['depth'].to_numpy(),
+        marker_sizeref=2.0 * max_mag / FOCUS_SIZE_MAX ** 2
+    )
+
+@cached_figure
 def create_country_focus_view(
     data_processor,
     country: str,
@@ -12,25 +50,11 @@ def create_country_focus_view(
 ) -> go.Figure:
     """
     Create detailed map view for a specific country.
+    Returned as a plotly JSON dict (see cached_figure).
     """
 
     # Get country-specific filtered data
-    country_data = data_processor.get_filtered_data(
-        start_date=start_date,
-        end_date=end_date,
-        country=country
-    )
-
-    if country_data.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text=f"No earthquake data available for {country} in the selected range. ",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(title=f"Earthquake Map - {country}", height=500)
-        return fig
+    country_data = _country_data(data_processor, country, start_date, end_date)
 
     center_coords = get_country_center(country)
     if center_coords is None:
@@ -39,29 +63,68 @@ def create_country_focus_view(
     else:
         zoom_level = get_country_zoom(country)
 
-    fig = px.scatter_mapbox(
-        country_data,
-        lat="Latitude",
-        lon="Longitude",
-        size="mag",
-        color="depth",
-        hover_name="Place",
-        hover_data=["time", "mag", "depth"],
-        color_continuous_scale="Viridis",
-        size_max=20,
-        zoom=zoom_level,
-        height=500,
-        center={"lat": center_coords[0], "lon": center_coords[1]} if center_coords else {"lat": 0, "lon": 0},
-        title=f"Earthquake Epicentres - {country}"
-    )
+    # The map is drawn even without data so date changes can patch the trace in place
+    trace = country_focus_trace_data(country_data)
+    fig = go.Figure(go.Scattermapbox(
+        lat=trace['lat'],
+        lon=trace['lon'],
+        hovertext=trace['hovertext'],
+        customdata=trace['customdata'],
+        mode='markers',
+        marker=dict(
+            size=trace['marker_size'],
+            sizemode='area',
+            sizeref=trace['marker_sizeref'],
+            color=trace['marker_color'],
+            coloraxis='coloraxis'
+        ),
+        hovertemplate=("<b>%{hovertext}</b><br><br>mag=%{customdata[1]}<br>Latitude=%{lat}"
+                       "<br>Longitude=%{lon}<br>time=%{customdata[0]}<br>depth=%{marker.color}<extra></extra>"),
+        name='',
+        showlegend=False
+    ))
 
     fig.update_layout(
-        mapbox_style="carto-positron",
+        mapbox=dict(
+            style="carto-positron",
+            center={"lat": center_coords[0], "lon": center_coords[1]},
+            zoom=zoom_level
+        ),
+        coloraxis=dict(
+            colorscale=px.colors.sequential.Viridis,
+            colorbar=dict(title=dict(text="depth"))
+        ),
+        annotations=_empty_annotations(country, country_data),
+        title=f"Earthquake Epicentres - {country}",
+        height=500,
         margin={"r": 0, "t": 40, "l": 0, "b": 0},
     )
 
     return fig
 
+def patch_country_focus_view(
+    data_processor,
+    country: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+):
+    """
+    Partial update for a date range change of the same country: replaces the
+    epicentre data arrays and the no-data annotation of a figure built by
+    create_country_focus_view, leaving the map layout untouched.
+    """
+    country_data = _country_data(data_processor, country, start_date, end_date)
+    trace = country_focus_trace_data(country_data)
+
+    patched = Patch()
+    for key in ('lat', 'lon', 'hovertext', 'customdata'):
+        patched['data'][0][key] = trace[key]
+    patched['data'][0]['marker']['size'] = trace['marker_size']
+    patched['data'][0]['marker']['sizeref'] = trace['marker_sizeref']
+    patched['data'][0]['marker']['color'] = trace['marker_color']
+    patched['layout']['annotations'] = _empty_annotations(country, country_data)
+    return patched
+
 
 def create_country_barcharts(
     data_processor,
@@ -75,11 +138,7 @@ def create_country_barcharts(
     2. Earthquake count by year
     """
 
-    df = data_processor.get_filtered_data(
-        start_date=start_date,
-        end_date=end_date,
-        country=country
-    )
+    df = _country_data(data_processor, country, start_date, end_date)
 
     if df.empty:
         return go.Figure(), go.Figure()
@@ -93,8 +152,7 @@ def create_country_barcharts(
         else:
             return 'High (≥6.5)'
 
-    df['mag_class'] = df['mag'].apply(classify_magnitude)
-    mag_counts = df['mag_class'].value_counts().reindex(['Low (<5.0)', 'Medium (5.0–6.5)', 'High (≥6.5)'], fill_value=0)
+    mag_counts = df['mag'].apply(classify_magnitude).value_counts().reindex(['Low (<5.0)', 'Medium (5.0–6.5)', 'High (≥6.5)'], fill_value=0)
 
     mag_bar = go.Figure(go.Bar(
         x=mag_counts.index,
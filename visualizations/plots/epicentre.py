@@ -1,6 +1,10 @@
 import numpy as np
 import plotly.graph_objects as go
 
+# Nearby events shown around an epicentre: at most this many, within ~5° of arc
+NEARBY_EVENTS = 50
+NEARBY_RADIUS_KM = 5 * 111.32
+
 def create_epicentre_impact(data_processor,
                              earthquake_id: str,
                              radius: float = 0) -> go.Figure:
@@ -15,11 +19,9 @@ def create_epicentre_impact(data_processor,
         fig.update_layout(title="Epicentre Impact Analysis", height=500)
         return fig
 
-    earthquake = data_processor.processed_data[
-        data_processor.processed_data['ID'] == earthquake_id
-    ]
+    eq = data_processor.get_event(earthquake_id)
 
-    if earthquake.empty:
+    if eq is None:
         fig = go.Figure()
         fig.add_annotation(
             text="Earthquake not found",
@@ -30,7 +32,6 @@ def create_epicentre_impact(data_processor,
         fig.update_layout(title="Epicentre Impact Analysis", height=500)
         return fig
 
-    eq = earthquake.iloc[0]
     lat_center = eq['Latitude']
     lon_center = eq['Longitude']
     mag = eq['mag']
@@ -76,11 +77,10 @@ def create_epicentre_impact(data_processor,
         hovertext=[f"<b>{eq['Place']}</b><br>Magnitude: {mag}<br>Depth: {eq['depth']}km<br>Time: {eq['time']}"]
     ))
 
-    # Nearby earthquakes within ~5° (approx)
-    nearby_data = data_processor.processed_data[
-        ((data_processor.processed_data['Latitude'] - lat_center)**2 +
-         (data_processor.processed_data['Longitude'] - lon_center)**2)**0.5 < 5
-    ].head(50)
+    # The nearest earthquakes within ~5° of arc, by great-circle distance
+    nearby_data = data_processor.get_nearest_events(
+        lat_center, lon_center, k=NEARBY_EVENTS, max_distance_km=NEARBY_RADIUS_KM
+    )
 
     if not nearby_data.empty:
         fig.add_trace(go.Scattermapbox(
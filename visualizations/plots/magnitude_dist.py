@@ -1,11 +1,14 @@
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import Optional
+from ..figure_cache import cached_figure
+@cached_figure
 def create_magnitude_distribution(data_processor, country: Optional[str] = None) -> go.Figure:
     """
     Create histogram showing magnitude distribution.
+    Returned as a plotly JSON dict (see cached_figure).
     """
-    data = data_processor.get_filtered_data(country=country)
+    data = data_processor.get_filtered_view(country=country)
     
     if data.empty:
         fig = go.Figure()
@@ -25,7 +28,7 @@ def create_magnitude_distribution(data_processor, country: Optional[str] = None)
     
     # Create histogram
     fig = px.histogram(
-        data,
+        data[['mag']],
         x='mag',
         nbins=50,
         title="Magnitude Distribution",
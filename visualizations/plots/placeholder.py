@@ -0,0 +1,29 @@
+import plotly.graph_objects as go
+
+LOADING_MESSAGE = "Loading earthquake catalog..."
+
+
+def create_loading_figure(message: str = LOADING_MESSAGE) -> go.Figure:
+    """Blank figure with a centred message, shown in place of a plot while the dataset loads."""
+    fig = go.Figure()
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[dict(
+            text=message,
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )],
+        margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+def has_trace(figure, index: int) -> bool:
+    """
+    Whether a graph's current figure already has trace index, i.e. is a full
+    figure a Patch can update rather than nothing yet or the loading figure.
+    """
+    return bool(figure) and len(figure.get('data') or []) > index
@@ -1,12 +1,32 @@
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from ..geo_utils import get_world_geojson, get_fault_lines_geojson, get_all_country_centroids
-from typing import Optional
+from dash import Patch
+from ..geo_utils import get_world_geojson, get_fault_line_segments, get_all_country_centroids
+from ..figure_cache import cached_figure
 
+# Legend name and dash style per plate boundary type in the fault line data
+FAULT_LINE_STYLES = {
+    '': dict(name='Fault Line', dash='dot'),
+    'subduction': dict(name='Subduction Zone', dash='dash')
+}
+
+# The fault line traces directly follow the choropleth, one per boundary type
+FAULT_TRACE_INDICES = list(range(1, 1 + len(FAULT_LINE_STYLES)))
+
+def patch_fault_line_visibility(show_fault_lines: bool):
+    """Partial update that only shows or hides the fault line traces of the risk map."""
+    patched = Patch()
+    for index in FAULT_TRACE_INDICES:
+        patched['data'][index]['visible'] = show_fault_lines
+    return patched
+
+@cached_figure
 def create_global_risk_map(data_processor, metric: str = 'count', top_n: int = 20, show_fault_lines: bool = False) -> go.Figure:
     """
     Enhanced global risk map showing earthquake activity by country, fault lines,
     and labeled high-risk zones.
+    Returned as a plotly JSON dict (see cached_figure).
     """
 
     # Fetch risk data
@@ -67,53 +87,36 @@ def create_global_risk_map(data_processor, metric: str = 'count', top_n: int = 2
             )
         )
 
-    # Overlay Fault Lines 
-    fault_geojson = get_fault_lines_geojson()
-    if show_fault_lines and fault_geojson:
-        for feature in fault_geojson['features']:
-            geometry = feature['geometry']
-            coords = geometry['coordinates']
-
-            if geometry['type'] == 'LineString':
-                lons, lats = zip(*coords)  # unpack as lon, lat
-                fig.add_trace(go.Scattergeo(
-                    lon=lons,
-                    lat=lats,
-                    mode='lines',
-                    line=dict(color='black', width=1.5, dash = 'dot'),
-                    name='Fault Line',
-                    hoverinfo='skip'
-                ))
-
-            elif geometry['type'] == 'MultiLineString':
-                for line in coords:
-                    lons, lats = zip(*line)
-                    fig.add_trace(go.Scattergeo(
-                        lon=lons,
-                        lat=lats,
-                        mode='lines',
-                        line=dict(color='black', width=1),
-                        name='Fault Line',
-                        hoverinfo='skip',
-                        showlegend=False
-                    ))
-
+    # Overlay Fault Lines, one trace per plate boundary type. The traces are always
+    # present and only hidden, so the toggle can flip their visibility in place
+    segments = get_fault_line_segments()
+    for boundary_type, style in FAULT_LINE_STYLES.items():
+        lons, lats = segments.get(boundary_type, ([], []))
+        fig.add_trace(go.Scattergeo(
+            lon=lons,
+            lat=lats,
+            mode='lines',
+            line=dict(color='black', width=1.5, dash=style['dash']),
+            name=style['name'],
+            hoverinfo='skip',
+            visible=show_fault_lines
+        ))
 
-    # Annotate High-Risk Countries (top N)
+    # Annotate High-Risk Countries (top N) in a single text trace
     top_countries = risk_data.nlargest(top_n, 'value')
     centroids = get_all_country_centroids()
+    located = top_countries[top_countries['country'].isin(centroids.keys())]
 
-    for _, row in top_countries.iterrows():
-         centroid = centroids.get(row['country'])
-         if centroid:
-            fig.add_trace(go.Scattergeo(
-                lon=[centroid[1]],
-                lat=[centroid[0]],
-                text=[f"{row['country']}<br>{metric.title()}: {row['value']:.2f}"],
-                mode='text',
-                showlegend=False,
-                textfont=dict(color="black", size=10)
-            ))
+    if not located.empty:
+        lat_lon = np.array([centroids[country] for country in located['country']])
+        fig.add_trace(go.Scattergeo(
+            lon=lat_lon[:, 1],
+            lat=lat_lon[:, 0],
+            text=located['country'] + f"<br>{metric.title()}: " + located['value'].map('{:.2f}'.format),
+            mode='text',
+            showlegend=False,
+            textfont=dict(color="black", size=10)
+        ))
 
     # Final layout cleanup
     fig.update_layout(
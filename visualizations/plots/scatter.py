@@ -9,8 +9,10 @@ def create_scatter_plot(data_processor,
     """
     Create scatter plot showing depth vs magnitude relationship.
     """
-    # Get filtered data
-    data = data_processor.get_filtered_data(country=country_filter)
+    # Get filtered data; the year range resolves to a sorted time slice
+    start_date = data_processor.year_bounds(start_year)[0] if start_year else None
+    end_date = data_processor.year_bounds(end_year)[1] if end_year else None
+    data = data_processor.get_filtered_view(start_date, end_date, magnitude_range, country_filter)
     
     if data.empty:
         fig = go.Figure()
@@ -28,18 +30,9 @@ def create_scatter_plot(data_processor,
         )
         return fig, {'shallow': 0, 'intermediate': 0, 'deep': 0, 'total': 0}
     
-    # Apply magnitude range filter
-    if magnitude_range:
-        data = data[data['mag'].between(magnitude_range[0], magnitude_range[1])]
-    
-    # Apply year range filter
-    if start_year:
-        data = data[data['time'].dt.year >= start_year]
-    if end_year:    
-        data = data[data['time'].dt.year <= end_year]
     # Create scatter plot
     fig = px.scatter(
-        data,
+        data[['depth', 'mag', 'magnitude_category', 'Place', 'time', 'country']],
         x='depth',
         y='mag',
         color='magnitude_category',
@@ -63,10 +56,11 @@ def create_scatter_plot(data_processor,
     )
 
     # Count depth categories
-    shallow = data[data['depth'] <= 70].shape[0]
-    intermediate = data[(data['depth'] > 70) & (data['depth'] <= 300)].shape[0]
-    deep = data[data['depth'] > 300].shape[0]
-    total = data.shape[0]
+    depth = data['depth']
+    shallow = int((depth <= 70).sum())
+    intermediate = int(((depth > 70) & (depth <= 300)).sum())
+    deep = int((depth > 300).sum())
+    total = len(data)
 
     depth_counts = {
         'shallow': shallow,
@@ -1,7 +1,9 @@
 import plotly.graph_objects as go
 from typing import Optional
 import pandas as pd
+from ..figure_cache import cached_figure
 
+@cached_figure
 def create_count_time_series_plot(
     data_processor,
     magnitude_filter: str = 'all',
@@ -14,6 +16,7 @@ def create_count_time_series_plot(
 ) -> go.Figure:
     """
     Create time series plot showing earthquake count trends.
+    Returned as a plotly JSON dict (see cached_figure).
     """
     time_series_data = data_processor.get_time_series_data(
         magnitude_filter, start_date, end_date, country
@@ -124,6 +127,7 @@ def create_count_time_series_plot(
 
     return fig
 
+@cached_figure
 def create_magnitude_time_series_plot(
     data_processor,
     magnitude_filter: str = 'all',
@@ -135,6 +139,7 @@ def create_magnitude_time_series_plot(
 ) -> go.Figure:
     """
     Create time series plot showing magnitude trends.
+    Returned as a plotly JSON dict (see cached_figure).
     """
     time_series_data = data_processor.get_time_series_data(
         magnitude_filter, start_date, end_date, country
@@ -276,6 +281,7 @@ def create_magnitude_time_series_plot(
 
     return fig
 
+@cached_figure
 def create_time_series_plot(
     data_processor,
     magnitude_filter: str = 'all',
@@ -288,6 +294,7 @@ def create_time_series_plot(
 ) -> go.Figure:
     """
     Create enhanced time series plot showing earthquake trends.
+    Returned as a plotly JSON dict (see cached_figure).
     """
     time_series_data = data_processor.get_time_series_data(
         magnitude_filter, start_date, end_date, country
@@ -1,15 +1,98 @@
 import numpy as np
 import plotly.graph_objects as go
-from ..geo_utils import get_world_geojson
-from ..style_utils import get_magnitude_color
+from dash import Patch
+from ..geo_utils import get_world_outline
+from ..style_utils import get_magnitude_band, MAGNITUDE_COLORS, MAGNITUDE_LABELS
 from typing import Optional
+from ..figure_cache import cached_data, cached_figure
+
+# Unit circle shared by every impact radius outline
+CIRCLE_POINTS = 100
+_CIRCLE_ANGLES = np.linspace(0, 2*np.pi, CIRCLE_POINTS)
+_UNIT_COS = np.cos(_CIRCLE_ANGLES)
+_UNIT_SIN = np.sin(_CIRCLE_ANGLES)
+
+def impact_circle_coordinates(lats: np.ndarray, lons: np.ndarray, radii: np.ndarray):
+    """
+    Broadcast the unit circle over all epicentres at once. Returns lon and lat
+    arrays of shape (n, CIRCLE_POINTS + 1); the last column is NaN so that
+    raveled rows draw as separate circles within one trace.
+    """
+    lat_radius = radii / 111.32
+    lon_radius = radii / (111.32 * np.cos(np.radians(lats)))
+    separator = np.full((len(lats), 1), np.nan)
+    circle_lats = np.hstack([lats[:, None] + lat_radius[:, None] * _UNIT_COS, separator])
+    circle_lons = np.hstack([lons[:, None] + lon_radius[:, None] * _UNIT_SIN, separator])
+    return circle_lons, circle_lats
+
+# Fixed trace layout, so year changes can patch the point traces in place:
+# background, land fill, boundaries, one circle trace per magnitude band, epicentres, legend
+CIRCLE_TRACE_START = 3
+EPICENTRE_TRACE = CIRCLE_TRACE_START + len(MAGNITUDE_COLORS)
+
+def _year_data(data_processor, selected_year: Optional[int] = None):
+    """Rows of the selected year as a view; the traces gather only the columns they draw."""
+    if selected_year:
+        start_date, end_date = data_processor.year_bounds(selected_year)
+        return data_processor.get_filtered_view(start_date, end_date)
+    return data_processor.get_filtered_view()
+
+def earthquake_trace_data(data) -> list:
+    """
+    Data arrays of the year-dependent traces, in trace order: one
+    {lon, lat} per magnitude band circle trace, then the epicentre trace.
+    """
+    lats = data['Latitude'].to_numpy(dtype=np.float64)
+    lons = data['Longitude'].to_numpy(dtype=np.float64)
+    mags = data['mag'].to_numpy(dtype=np.float64)
+    bands = get_magnitude_band(mags)
+
+    # Calculate impact radius using new formula: exp(magnitude * 0.666 + 1.6)
+    radii = np.exp(mags * 0.666 + 1.6)
+    circle_lons, circle_lats = impact_circle_coordinates(lats, lons, radii)
+
+    traces = [dict(lon=circle_lons[bands == band].ravel(), lat=circle_lats[bands == band].ravel())
+              for band in range(len(MAGNITUDE_COLORS))]
+
+    hover_text = ("<b>" + data['Place'].astype(str) + "</b><br>Magnitude: " + data['mag'].astype(str)
+                  + "<br>Impact Radius: ~" + radii.astype(np.int64).astype(str)
+                  + " km<br>Year: " + data['year'].astype(str))
+    traces.append(dict(lon=lons, lat=lats, text=hover_text.to_numpy(),
+                       marker_color=np.asarray(MAGNITUDE_COLORS)[bands]))
+    return traces
+
+@cached_data
+def year_trace_data(data_processor, selected_year: Optional[int] = None) -> list:
+    """earthquake_trace_data of one year, cached per (year, dataset version) for slider moves."""
+    return earthquake_trace_data(_year_data(data_processor, selected_year))
+
+def patch_global_earthquake_map(data_processor, selected_year: Optional[int] = None):
+    """
+    Partial update for a year change: replaces only the circle and epicentre
+    data arrays of a figure built by create_global_earthquake_map.
+    """
+    if data_processor.get_filtered_view().empty:
+        return create_global_earthquake_map(data_processor, selected_year)
+
+    patched = Patch()
+    for offset, trace in enumerate(year_trace_data(data_processor, selected_year)):
+        index = CIRCLE_TRACE_START + offset
+        patched['data'][index]['lon'] = trace['lon']
+        patched['data'][index]['lat'] = trace['lat']
+        if 'text' in trace:
+            patched['data'][index]['text'] = trace['text']
+            patched['data'][index]['marker']['color'] = trace['marker_color']
+    return patched
+
+@cached_figure
 def create_global_earthquake_map(data_processor, 
                                 selected_year: Optional[int] = None) -> go.Figure:
     """
     Create 2D global map showing earthquake locations with impact radius circles.
+    Returned as a plotly JSON dict (see cached_figure).
     """
     # Get filtered data
-    data = data_processor.get_filtered_data()
+    data = data_processor.get_filtered_view()
     
     if data.empty:
         fig = go.Figure()
@@ -23,11 +106,13 @@ def create_global_earthquake_map(data_processor,
         return fig
     
     # Filter by year if specified
-    if selected_year:
-        data = data[data['year'] == selected_year]
+    data = _year_data(data_processor, selected_year)
     
-    # Get world GeoJSON for country boundaries
-    geojson_data = get_world_geojson()
+    # Get pre-flattened country boundaries; the traces are kept even when
+    # the boundaries are unavailable so trace indices stay fixed
+    outline_lons, outline_lats = get_world_outline()
+    if outline_lons is None:
+        outline_lons, outline_lats = [], []
     
     # Create the base map with country boundaries
     fig = go.Figure()
@@ -46,134 +131,65 @@ def create_global_earthquake_map(data_processor,
         hoverinfo='skip'
     ))
     
-    if geojson_data:
-        # Add filled land areas to eliminate white gaps
-        for feature in geojson_data['features']:
-            coordinates = feature['geometry']['coordinates']
-            
-            if feature['geometry']['type'] == 'Polygon':
-                # Single polygon - add filled area first
-                lons = [coord[0] for coord in coordinates[0]]
-                lats = [coord[1] for coord in coordinates[0]]
-                
-                # Add filled land area
-                fig.add_trace(go.Scattergeo(
-                    lon=lons,
-                    lat=lats,
-                    mode='lines',
-                    line=dict(color='#34495e', width=0.8),
-                    fill='toself',
-                    fillcolor='#282a36',  # Dracula background color
-                    opacity=0.3,
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-                # Add boundary line on top
-                fig.add_trace(go.Scattergeo(
-                    lon=lons,
-                    lat=lats,
-                    mode='lines',
-                    line=dict(color='#34495e', width=0.8),
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
-                
-            elif feature['geometry']['type'] == 'MultiPolygon':
-                # Multiple polygons
-                for polygon in coordinates:
-                    lons = [coord[0] for coord in polygon[0]]
-                    lats = [coord[1] for coord in polygon[0]]
-                    
-                    # Add filled land area
-                    fig.add_trace(go.Scattergeo(
-                        lon=lons,
-                        lat=lats,
-                        mode='lines',
-                        line=dict(color='#34495e', width=0.8),
-                        fill='toself',
-                        fillcolor='#282a36',  # Dracula background color
-                        opacity=0.3,
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-                    
-                    # Add boundary line on top
-                    fig.add_trace(go.Scattergeo(
-                        lon=lons,
-                        lat=lats,
-                        mode='lines',
-                        line=dict(color='#34495e', width=0.8),
-                        showlegend=False,
-                        hoverinfo='skip'
-                    ))
-    
-    # # Define magnitude colors with Dracula theme palette
-    # def get_magnitude_color(mag):
-    #     if mag < 6.0:
-    #         return '#ffb86c'  # Dracula orange
-    #     elif mag < 6.5:
-    #         return '#ff79c6'  # Dracula pink
-    #     elif mag < 7.0:
-    #         return '#ff5555'  # Dracula red
-    #     elif mag < 7.5:
-    #         return '#bd93f9'  # Dracula purple
-    #     else:
-    #         return '#ff5555'  # Dracula red (brightest for highest magnitude)
-    
-    # Add earthquake points with impact radius circles
-    if not data.empty:
-        for _, eq in data.iterrows():
-            lat_center = eq['Latitude']
-            lon_center = eq['Longitude']
-            mag = eq['mag']
-            
-            # Calculate impact radius using new formula: exp(magnitude * 0.666 + 1.6)
-            radius = np.exp(mag * 0.666 + 1.6)
-            
-            # Generate circle coordinates with more points for smoother circles
-            angles = np.linspace(0, 2*np.pi, 100)
-            lat_circle = lat_center + (radius / 111.32) * np.cos(angles)
-            lon_circle = lon_center + (radius / (111.32 * np.cos(np.radians(lat_center)))) * np.sin(angles)
-            
-            # Get color based on magnitude
-            color = get_magnitude_color(mag)
-            
-            # Add impact circle with sophisticated styling
-            fig.add_trace(go.Scattergeo(
-                lon=lon_circle,
-                lat=lat_circle,
-                mode='lines',
-                line=dict(color=color, width=2),
-                fill='toself',
-                fillcolor=color,
-                opacity=0.2,
-                showlegend=False,
-                hoverinfo='skip'
-            ))
-            
-            # Add epicentre point with minimal styling - just enough to identify location
-            fig.add_trace(go.Scattergeo(
-                lon=[lon_center],
-                lat=[lat_center],
-                mode='markers',
-                marker=dict(
-                    size=2,  # Very small fixed size - just to identify epicenter
-                    color=color,
-                    opacity=0.9,
-                    line=dict(color='white', width=0.5),
-                    symbol='circle'
-                ),
-                text=f"<b>{eq['Place']}</b><br>Magnitude: {mag}<br>Impact Radius: ~{int(radius)} km<br>Year: {eq['year']}",
-                hoverinfo='text',
-                showlegend=False
-            ))
+    # All country outlines go into one filled trace and one boundary trace
+    # Add filled land area
+    fig.add_trace(go.Scattergeo(
+        lon=outline_lons,
+        lat=outline_lats,
+        mode='lines',
+        line=dict(color='#34495e', width=0.8),
+        fill='toself',
+        fillcolor='#282a36',  # Dracula background color
+        opacity=0.3,
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+
+    # Add boundary line on top
+    fig.add_trace(go.Scattergeo(
+        lon=outline_lons,
+        lat=outline_lats,
+        mode='lines',
+        line=dict(color='#34495e', width=0.8),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+
+    # Add earthquake impact circles, one trace per magnitude colour band
+    *circles, epicentres = earthquake_trace_data(data)
+
+    for color, circle in zip(MAGNITUDE_COLORS, circles):
+        fig.add_trace(go.Scattergeo(
+            lon=circle['lon'],
+            lat=circle['lat'],
+            mode='lines',
+            line=dict(color=color, width=2),
+            fill='toself',
+            fillcolor=color,
+            opacity=0.2,
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+
+    # Add all epicentre points with minimal styling - just enough to identify location
+    fig.add_trace(go.Scattergeo(
+        lon=epicentres['lon'],
+        lat=epicentres['lat'],
+        mode='markers',
+        marker=dict(
+            size=2,  # Very small fixed size - just to identify epicenter
+            color=epicentres['marker_color'],
+            opacity=0.9,
+            line=dict(color='white', width=0.5),
+            symbol='circle'
+        ),
+        text=epicentres['text'],
+        hoverinfo='text',
+        showlegend=False
+    ))
     
     # Add legend traces for magnitude color ranges
-    legend_colors = ['#fff7bc', '#fec44f', '#fe9929', '#d7301f', '#b30000']
-    legend_labels = ['< 6.0', '6.0-6.5', '6.5-7.0', '7.0-7.5', '≥ 7.5']
-    
-    for i, (color, label) in enumerate(zip(legend_colors, legend_labels)):
+    for i, (color, label) in enumerate(zip(MAGNITUDE_COLORS, MAGNITUDE_LABELS)):
         fig.add_trace(go.Scattergeo(
             lon=[None],  # Invisible trace for legend only
             lat=[None],
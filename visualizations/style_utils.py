@@ -1,5 +1,10 @@
 import numpy as np
 
+# Magnitude colour bands shared by the scalar and vectorized helpers
+MAGNITUDE_COLOR_BINS = [6.0, 6.5, 7.0, 7.5]
+MAGNITUDE_COLORS = ['#fff7bc', '#fec44f', '#fe9929', '#d7301f', '#b30000']
+MAGNITUDE_LABELS = ['< 6.0', '6.0-6.5', '6.5-7.0', '7.0-7.5', '≥ 7.5']
+
 def get_magnitude_color(mag):
     """
     Color scheme from light yellow (lower intensity) to bright red (higher intensity).
@@ -16,6 +21,16 @@ def get_magnitude_color(mag):
     else:
         return '#b30000'  # Bright red (highest intensity)
 
+def get_magnitude_band(mags) -> np.ndarray:
+    """
+    Vectorized colour band index for an array of magnitudes, matching
+    get_magnitude_color: MAGNITUDE_COLORS[band] is the colour of each magnitude.
+    """
+    mags = np.asarray(mags, dtype=np.float64)
+    bands = np.digitize(mags, MAGNITUDE_COLOR_BINS)
+    bands[np.isnan(mags)] = len(MAGNITUDE_COLORS) - 1
+    return bands
+
 def get_magnitude_color_old(mag):
     """Original color function for reference"""
     if mag < 6.0:
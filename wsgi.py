@@ -0,0 +1,21 @@
+"""
+WSGI entry point for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Importing app starts loading the dataset in a background thread. With
+preload_app (the default, see gunicorn.conf.py) the master waits for it, so
+the dataset and every index load once and the workers fork afterwards,
+sharing those pages; threads do not survive a fork, so the master must not
+fork mid-load. With EARTHQUAKE_PRELOAD=0 each worker loads on its own in
+the background and starts answering at once.
+"""
+import os
+
+import globals
+from app import app
+
+if os.environ.get("EARTHQUAKE_PRELOAD", "1") != "0":
+    globals.get_data_processor(timeout=None)
+
+server = app.server